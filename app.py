@@ -7,8 +7,11 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 
+from repositories.routing import RoutingSession
+
 # Instanciamos db aquí para que models.py pueda hacer `from app import db`
-db = SQLAlchemy()
+# (la sesión enruta lecturas a réplicas si SQLALCHEMY_READ_REPLICAS está configurado)
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 migrate = Migrate()
 jwt = JWTManager()
 
@@ -29,10 +32,85 @@ def create_app(config_object: dict | None = None) -> Flask:
                           os.getenv('DATABASE_URL', 'mysql+pymysql://root:@172.26.112.1/miniblog'))
     app.config.setdefault('SQLALCHEMY_TRACK_MODIFICATIONS', False)
 
+    # Réplicas de lectura: nombres de binds de SQLALCHEMY_BINDS a los que van las
+    # lecturas de los pedidos GET. El pool de cada bind se configura en su entrada
+    # ({'url': ..., 'pool_size': ...}); el del primario en SQLALCHEMY_ENGINE_OPTIONS.
+    # REPLICA_PIN_SECONDS: tras escribir, el usuario lee del primario ese tiempo
+    app.config.setdefault('SQLALCHEMY_BINDS', {})
+    app.config.setdefault('SQLALCHEMY_READ_REPLICAS', ())
+    app.config.setdefault('REPLICA_PIN_SECONDS', 5)
+
     # JWT: secret + expiración (24 horas)
     app.config.setdefault('JWT_SECRET_KEY', os.getenv('JWT_SECRET_KEY', 'cualquiercosa'))
     app.config.setdefault('JWT_ACCESS_TOKEN_EXPIRES', timedelta(hours=24))
 
+    # Revocación de tokens (usuarios desactivados o con rol cambiado): cada cuántos
+    # segundos cada worker relee la tabla revocacion, y capacidad del filtro de Bloom
+    app.config.setdefault('REVOCATION_SYNC_SECONDS', 5)
+    app.config.setdefault('REVOCATION_FILTER_CAPACITY', 10000)
+
+    # Estadísticas: si es True, /api/stats lee la tabla contador mantenida por eventos
+    # (ejecutar `flask rebuild-stats` una vez al activarlo)
+    app.config.setdefault('STATS_USE_COUNTERS', False)
+    # Días que se conservan los buckets horarios de la tabla contador (posts_last_week usa 7)
+    app.config.setdefault('STATS_BUCKET_RETENTION_DAYS', 8)
+
+    # Caché de categorías: TTL en segundos y backend opcional (None = memoria del proceso)
+    app.config.setdefault('CATEGORY_CACHE_TTL', 300)
+    app.config.setdefault('CATEGORY_CACHE_BACKEND', None)
+
+    # Búsqueda de texto: 'auto' usa FTS5 en SQLite y un índice en memoria en otros motores
+    app.config.setdefault('SEARCH_BACKEND', 'auto')
+    # Índice en memoria: cada cuántos segundos un worker relee los cambios de los demás
+    app.config.setdefault('SEARCH_SYNC_SECONDS', 5)
+
+    # Máximo de posts aceptados por POST /api/posts/bulk
+    app.config.setdefault('POSTS_BULK_MAX_ITEMS', 1000)
+
+    # POST /api/batch: máximo de operaciones por batch y endpoints que se pueden
+    # pedir (solo GET; no incluye exportaciones streaming ni métricas)
+    app.config.setdefault('BATCH_MAX_OPERATIONS', 20)
+    app.config.setdefault('BATCH_ALLOWED_ENDPOINTS', (
+        'posts', 'post_detail', 'post_search', 'post_comments',
+        'categories', 'category_posts', 'users', 'user_detail', 'stats',
+    ))
+
+    # Comentarios embebidos en GET /api/posts/<id>?include=comments (el resto, con su next_cursor)
+    app.config.setdefault('POST_INCLUDE_COMMENTS_LIMIT', 20)
+
+    # Filas por lote que trae el cursor en las exportaciones NDJSON
+    app.config.setdefault('EXPORT_BATCH_SIZE', 500)
+
+    # Ingesta de comentarios: 'sync' (insert + commit por pedido) o 'buffered'
+    # (202 + escritura diferida en lotes, ver services/comment_ingestion.py)
+    app.config.setdefault('COMMENT_INGEST_MODE', 'sync')
+    app.config.setdefault('COMMENT_INGEST_BATCH_SIZE', 100)
+    app.config.setdefault('COMMENT_INGEST_FLUSH_MS', 200)
+    app.config.setdefault('COMMENT_INGEST_MAX_QUEUE', 10000)
+    app.config.setdefault('COMMENT_INGEST_DURABILITY', 'memory')  # memory | journal | journal_fsync
+    app.config.setdefault('COMMENT_INGEST_JOURNAL_DIR', None)  # None = <instance_path>/comment_journal
+
+    # Hashing de contraseñas: método/parámetros de werkzeug (al cambiarlos, los hashes
+    # viejos se regeneran en el próximo login) y pool de procesos dedicado
+    # (PASSWORD_HASH_WORKERS = 0 hashea en el hilo del pedido)
+    app.config.setdefault('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    app.config.setdefault('PASSWORD_HASH_WORKERS', 2)
+    app.config.setdefault('PASSWORD_HASH_MAX_PENDING', 16)
+    app.config.setdefault('PASSWORD_HASH_TIMEOUT', 5.0)
+
+    # JSON provider: 'auto' usa orjson si está instalado (misma salida que el de Flask)
+    app.config.setdefault('JSON_PROVIDER', 'auto')
+
+    # Métricas por endpoint en GET /api/metrics (formato Prometheus)
+    app.config.setdefault('METRICS_ENABLED', True)
+
+    # Compresión gzip de respuestas negociada por Accept-Encoding
+    app.config.setdefault('COMPRESS_ENABLED', True)
+    app.config.setdefault('COMPRESS_LEVEL', 6)
+    app.config.setdefault('COMPRESS_MIN_SIZE', 1024)  # bytes; no aplica a respuestas streaming
+    app.config.setdefault('COMPRESS_MIMETYPES', ('application/json', 'application/x-ndjson', 'text/plain'))
+    app.config.setdefault('COMPRESS_STREAM_FLUSH_BYTES', 16384)  # flush parcial en respuestas streaming
+
     # Permite pasar un diccionario de configuración al factory para tests u overrides
     if config_object:
         if isinstance(config_object, dict):
@@ -45,10 +123,73 @@ def create_app(config_object: dict | None = None) -> Flask:
     # Inicializar extensiones
     # ---------------------------
     db.init_app(app)
-    from models import Usuario, UserCredentials, Post, Comentario, Categoria, post_categoria
+    from models import Usuario, UserCredentials, Post, Comentario, Categoria, post_categoria, Revocacion
     migrate.init_app(app, db)
+
+    from repositories.routing import init_read_replicas
+    init_read_replicas(app, db)
     jwt.init_app(app)
 
+    from services.revocation import init_revocation
+    init_revocation(app, jwt)
+
+    if app.config['STATS_USE_COUNTERS']:
+        from repositories.stats_repository import init_stats_counters
+        init_stats_counters(app)
+
+    from repositories.comment_repository import register_comment_count_listeners
+    register_comment_count_listeners()
+
+    from services.category_service import init_category_cache
+    init_category_cache(app)
+
+    from repositories.search_index import init_search_index
+    init_search_index(app)
+
+    from services.comment_ingestion import init_comment_ingestion
+    init_comment_ingestion(app)
+
+    from services.password_hasher import init_password_hasher
+    init_password_hasher(app)
+
+    from services.json_provider import init_json_provider
+    init_json_provider(app)
+
+    # Antes de registrar otros before_request: el tiempo medido incluye la autorización
+    from services.metrics import init_metrics
+    init_metrics(app)
+
+    # Después de las métricas: el commit del pedido entra en su latencia y
+    # en su cantidad de consultas
+    from repositories.unit_of_work import init_unit_of_work
+    init_unit_of_work(app)
+
+    # Después de las métricas: sus after_request corren antes, y el tamaño
+    # registrado es el comprimido
+    from services.compression import init_compression
+    init_compression(app)
+
+    @app.cli.command('rebuild-stats')
+    def rebuild_stats():
+        """Recalcula la tabla contador a partir de los datos actuales."""
+        from repositories.stats_repository import StatsRepository
+        StatsRepository.rebuild_counters(app.config['STATS_BUCKET_RETENTION_DAYS'])
+        db.session.commit()
+
+    @app.cli.command('rebuild-comment-counts')
+    def rebuild_comment_counts():
+        """Recalcula Post.comment_count a partir de los comentarios visibles."""
+        from repositories.comment_repository import CommentRepository
+        CommentRepository.rebuild_comment_counts()
+        db.session.commit()
+
+    @app.cli.command('rebuild-search')
+    def rebuild_search():
+        """Reconstruye el índice de búsqueda de posts."""
+        from repositories.search_index import search_index
+        search_index().rebuild()
+        db.session.commit()
+
     # Importar modelos/vistas **después** de inicializar db para evitar ciclos
     # (models.py usa `from app import db` — por eso db debe existir primero)
     with app.app_context():
@@ -58,11 +199,14 @@ def create_app(config_object: dict | None = None) -> Flask:
             # Importar views; si dividís las vistas en un paquete, ajustá las importaciones
             from views import (
                 AuthRegisterView, AuthLoginView,
-                PostsAPI, PostDetailAPI,
+                PostsAPI, PostDetailAPI, PostSearchAPI, PostBulkAPI,
                 PostCommentsAPI, CommentDeleteAPI,
-                CategoriesAPI, CategoryDetailAPI,
+                CategoriesAPI, CategoryDetailAPI, CategoryPostsAPI,
                 UsersAPI, UserDetailAPI, UserRolePatchAPI,
-                StatsAPI
+                StatsAPI,
+                ExportPostsAPI, ExportCommentsAPI,
+                MetricsAPI,
+                BatchAPI
             )
         except Exception as exc:
             # Si views no está listo aún, evitamos que la app rompa en la importación
@@ -76,6 +220,8 @@ def create_app(config_object: dict | None = None) -> Flask:
             app.add_url_rule('/api/login', view_func=AuthLoginView.as_view('login'), methods=['POST'])
 
             app.add_url_rule('/api/posts', view_func=PostsAPI.as_view('posts'), methods=['GET', 'POST'])
+            app.add_url_rule('/api/posts/bulk', view_func=PostBulkAPI.as_view('posts_bulk'), methods=['POST'])
+            app.add_url_rule('/api/posts/search', view_func=PostSearchAPI.as_view('post_search'), methods=['GET'])
             app.add_url_rule('/api/posts/<int:post_id>', view_func=PostDetailAPI.as_view('post_detail'),
                              methods=['GET', 'PUT', 'DELETE'])
 
@@ -85,8 +231,10 @@ def create_app(config_object: dict | None = None) -> Flask:
                              methods=['DELETE'])
 
             app.add_url_rule('/api/categories', view_func=CategoriesAPI.as_view('categories'), methods=['GET', 'POST'])
-            app.add_url_rule('/api/categories/<int:cat_id>', view_func=CategoryDetailAPI.as_view('category_detail'),
+            app.add_url_rule('/api/categories/<int:category_id>', view_func=CategoryDetailAPI.as_view('category_detail'),
                              methods=['PUT', 'DELETE'])
+            app.add_url_rule('/api/categories/<int:category_id>/posts',
+                             view_func=CategoryPostsAPI.as_view('category_posts'), methods=['GET'])
 
             app.add_url_rule('/api/users', view_func=UsersAPI.as_view('users'), methods=['GET'])
             app.add_url_rule('/api/users/<int:user_id>', view_func=UserDetailAPI.as_view('user_detail'),
@@ -95,11 +243,23 @@ def create_app(config_object: dict | None = None) -> Flask:
                              methods=['PATCH'])
 
             app.add_url_rule('/api/stats', view_func=StatsAPI.as_view('stats'), methods=['GET'])
+
+            app.add_url_rule('/api/export/posts', view_func=ExportPostsAPI.as_view('export_posts'), methods=['GET'])
+            app.add_url_rule('/api/export/comments', view_func=ExportCommentsAPI.as_view('export_comments'),
+                             methods=['GET'])
+
+            app.add_url_rule('/api/metrics', view_func=MetricsAPI.as_view('metrics'), methods=['GET'])
+
+            app.add_url_rule('/api/batch', view_func=BatchAPI.as_view('batch'), methods=['POST'])
         except NameError:
             # Si views no exportó las clases (aún no implementadas), no registramos las rutas.
             # Esto permite que la app arranque sin todas las vistas implementadas.
             app.logger.debug("No se registraron algunas rutas: las vistas aún no están implementadas.")
 
+    # Tabla endpoint -> política de acceso; el token se verifica una vez por pedido
+    from decorators.auth_decorators import init_authorization
+    init_authorization(app)
+
     # ---------------------------
     # Errores JSON-friendly
     # ---------------------------
@@ -0,0 +1,104 @@
+"""
+Comprueba con EXPLAIN QUERY PLAN (SQLite) que las consultas de los
+repositories usan un índice y no recorren la tabla completa.
+
+    python -m benchmarks.explain_indexes
+
+Ejecuta cada método del repository, captura el SQL emitido y analiza su plan.
+Un paso "SCAN <tabla>" sin índice se reporta como falla (exit code 1), igual
+que un ORDER BY resuelto con un B-tree temporal (ordena todas las filas que
+pasan el filtro) o una consulta principal cuyo plan no contiene el texto
+esperado (p. ej. la cota del cursor).
+"""
+import re
+import sys
+
+from sqlalchemy import event
+
+from app import db
+from benchmarks.harness import build_app, seed
+
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+TEMP_SORT = "USE TEMP B-TREE FOR ORDER BY"
+
+
+def repository_calls():
+    """(nombre, función, texto esperado en el plan o None) de cada consulta a verificar."""
+    from models import Categoria
+    from repositories.comment_repository import CommentRepository
+    from repositories.post_repository import PostRepository
+    from repositories.user_repository import UserRepository
+
+    first_page, cursor = PostRepository.get_page(limit=5)
+    first_comments, comment_cursor = CommentRepository.get_page(1, limit=1)
+    first_users, user_cursor = UserRepository.get_page(limit=5)
+    first_by_email, email_cursor = UserRepository.get_page(limit=5, email="user")
+    first_by_role, role_cursor = UserRepository.get_page(limit=5, role="user")
+    return (
+        ("PostRepository.get_all", lambda: PostRepository.get_all(), None),
+        ("PostRepository.get_page", lambda: PostRepository.get_page(limit=5), None),
+        ("PostRepository.get_page(cursor)", lambda: PostRepository.get_page(limit=5, cursor=cursor),
+         "fecha_creacion<"),
+        ("PostRepository.get_page(categoria)", lambda: PostRepository.get_page(limit=5, categoria_id=1), None),
+        ("PostRepository.get_by_user", lambda: PostRepository.get_by_user(1), None),
+        ("PostRepository.get_posts_last_week", lambda: PostRepository.get_posts_last_week(), None),
+        ("CommentRepository.get_by_post", lambda: CommentRepository.get_by_post(1), None),
+        ("CommentRepository.get_page", lambda: CommentRepository.get_page(1, limit=5), None),
+        ("CommentRepository.get_page(cursor)",
+         lambda: CommentRepository.get_page(1, limit=5, cursor=comment_cursor), "fecha_creacion>"),
+        ("Categoria.posts", lambda: db.session.get(Categoria, 1).posts.all(), None),
+        ("UserRepository.get_page", lambda: UserRepository.get_page(limit=5), None),
+        ("UserRepository.get_page(cursor)", lambda: UserRepository.get_page(limit=5, cursor=user_cursor),
+         "username>"),
+        ("UserRepository.get_page(username)", lambda: UserRepository.get_page(limit=5, username="user00001"),
+         "username>"),
+        ("UserRepository.get_page(email)", lambda: UserRepository.get_page(limit=5, email="user00001"),
+         "email>"),
+        ("UserRepository.get_page(email, cursor)",
+         lambda: UserRepository.get_page(limit=5, email="user", cursor=email_cursor), "email>"),
+        ("UserRepository.get_page(role)", lambda: UserRepository.get_page(limit=5, role="admin"),
+         "ix_user_credentials_role_usuario"),
+        ("UserRepository.get_page(role, cursor)",
+         lambda: UserRepository.get_page(limit=5, role="user", cursor=role_cursor), "usuario_id>"),
+    )
+
+
+def capture(fn):
+    """Ejecuta fn y devuelve las sentencias (sql, parámetros) que emitió."""
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        db.session.expunge_all()
+        fn()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+    return captured
+
+
+def main() -> int:
+    app = build_app()
+    failed = False
+    with app.app_context():
+        seed(users=20, posts=200, comments_per_post=2, categories=5)
+        connection = db.session.connection().connection.driver_connection
+        for name, fn, expected in repository_calls():
+            for i, (statement, parameters) in enumerate(capture(fn)):
+                plan = [row[3] for row in connection.execute("EXPLAIN QUERY PLAN " + statement, parameters)]
+                scans = [step for step in plan if FULL_SCAN.match(step) or step == TEMP_SORT]
+                # El texto esperado se busca en la consulta principal, no en las de
+                # carga en lote (selectinload) que le siguen
+                missing = i == 0 and expected is not None and not any(expected in step for step in plan)
+                ok = not scans and not missing
+                failed = failed or not ok
+                status = "OK   " if ok else "FALLA"
+                print(f"{status} {name}: {' | '.join(plan)}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""
+Utilidades compartidas por los scripts de benchmarks/:
+app sobre SQLite, datos sintéticos, tokens JWT y conteo de consultas SQL.
+
+Los scripts se ejecutan desde la raíz del repo, por ejemplo:
+    python -m benchmarks.query_counts
+"""
+import random
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event, insert
+from werkzeug.security import generate_password_hash
+
+from app import create_app, db
+
+
+def build_app(uri: str = "sqlite://", **overrides):
+    """Crea la app con una base SQLite (en memoria por defecto) y sus tablas."""
+    config = {
+        "SQLALCHEMY_DATABASE_URI": uri,
+        "JWT_SECRET_KEY": "benchmarks",
+    }
+    config.update(overrides)
+    app = create_app(config)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def seed(users: int = 10, posts: int = 100, comments_per_post: int = 3,
+         categories: int = 5, categories_per_post: int = 2, seed_value: int = 1,
+         chunk_size: int = 20000) -> dict:
+    """
+    Inserta datos sintéticos con INSERTs masivos (executemany), sin pasar por el ORM.
+    Las filas se generan y se insertan de a chunk_size, así que la memoria no
+    crece con el volumen (sirve para millones de filas).
+    Debe llamarse dentro de un app_context. El usuario 1 es admin; todos los
+    usuarios tienen la contraseña "benchmark".
+    Devuelve la cantidad de filas insertadas por tabla.
+    """
+    from models import Usuario, UserCredentials, Post, Comentario, Categoria, post_categoria, make_excerpt
+
+    rnd = random.Random(seed_value)
+    now = datetime.utcnow()
+    # Un único hash para todos: generar uno por usuario dominaría el tiempo de carga
+    password_hash = generate_password_hash("benchmark")
+
+    def insert_chunks(table, rows) -> int:
+        total = 0
+        for chunk in _chunks(rows, chunk_size):
+            db.session.execute(insert(table), chunk)
+            total += len(chunk)
+        return total
+
+    counts = {}
+    counts["usuario"] = insert_chunks(Usuario, (
+        {"id": i, "username": f"user{i:07d}", "email": f"user{i:07d}@example.com",
+         "is_active": True, "created_at": now}
+        for i in range(1, users + 1)
+    ))
+    insert_chunks(UserCredentials, (
+        {"id": i, "usuario_id": i, "password_hash": password_hash,
+         "role": "admin" if i == 1 else "user"}
+        for i in range(1, users + 1)
+    ))
+    counts["categoria"] = insert_chunks(Categoria, (
+        {"id": i, "nombre": f"categoria-{i}"} for i in range(1, categories + 1)
+    ))
+
+    def post_rows():
+        for i in range(1, posts + 1):
+            created = now - timedelta(minutes=rnd.randint(0, 60 * 24 * 60))
+            contenido = f"Contenido sintético del post {i}. " * rnd.randint(1, 20)
+            yield {
+                "id": i, "titulo": f"Post {i}", "contenido": contenido, "excerpt": make_excerpt(contenido),
+                "fecha_creacion": created, "fecha_actualizacion": created,
+                "is_published": rnd.random() < 0.9, "usuario_id": rnd.randint(1, users),
+                "comment_count": comments_per_post,
+            }
+    counts["post"] = insert_chunks(Post, post_rows())
+
+    def link_rows():
+        if not categories:
+            return
+        for i in range(1, posts + 1):
+            for cat_id in rnd.sample(range(1, categories + 1), min(categories_per_post, categories)):
+                yield {"post_id": i, "categoria_id": cat_id}
+    counts["post_categoria"] = insert_chunks(post_categoria, link_rows())
+
+    counts["comentario"] = insert_chunks(Comentario, (
+        {"id": (i - 1) * comments_per_post + j, "contenido": f"Comentario {j} del post {i}",
+         "fecha_creacion": now, "is_visible": True,
+         "usuario_id": rnd.randint(1, users), "post_id": i}
+        for i in range(1, posts + 1) for j in range(1, comments_per_post + 1)
+    ))
+
+    db.session.commit()
+    return counts
+
+
+def _chunks(rows, size: int):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def auth_headers(user_id: int = 1, role: str = "admin") -> dict:
+    """Header Authorization con un token válido (requiere app_context)."""
+    token = create_access_token(identity=str(user_id), additional_claims={
+        "role": role, "is_active": True
+    })
+    return {"Authorization": f"Bearer {token}"}
+
+
+@contextmanager
+def count_queries():
+    """
+    Cuenta las sentencias SQL ejecutadas dentro del bloque.
+    Uso:
+        with count_queries() as counter:
+            client.get('/api/posts')
+        counter.count
+    """
+    counter = SimpleNamespace(count=0, statements=[])
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        counter.count += 1
+        counter.statements.append(statement)
+
+    engine = db.engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
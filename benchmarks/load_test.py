@@ -0,0 +1,300 @@
+"""
+Prueba de carga reproducible de todas las rutas registradas.
+
+    python -m benchmarks.load_test --posts 100000 --threads 8 --requests 300 \\
+        --output resultados.json
+    python -m benchmarks.load_test --output nuevo.json --compare resultados.json
+
+1. Crea la app con create_app sobre un SQLite en archivo (compartido entre hilos)
+   y la siembra con harness.seed (INSERTs masivos por chunks; escala a millones).
+2. Ejecuta, ruta por ruta, --requests pedidos repartidos entre --threads hilos
+   (cada hilo con su propio test client): primero lecturas, luego escrituras y
+   al final los borrados, sobre ids reservados para no chocar entre escenarios.
+3. Guarda en JSON throughput, p50/p90/p99, status y errores por ruta, junto con
+   el commit de git y los parámetros, para comparar ramas.
+Con --compare, falla (exit code 1) si alguna ruta empeora más que --max-regression.
+Las rutas registradas sin escenario se listan en "uncovered".
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Callable, NamedTuple, Optional
+
+from benchmarks.harness import auth_headers, build_app, seed
+
+
+class Scenario(NamedTuple):
+    method: str
+    endpoint: str
+    url: Callable  # (ctx, i) -> str
+    body: Optional[Callable] = None  # (ctx, i) -> dict
+    auth: bool = False
+
+
+def _pick(i: int, n: int, offset: int = 1) -> int:
+    """Id pseudoaleatorio y determinístico en [offset, offset + n)."""
+    return (i * 7919) % max(n, 1) + offset
+
+
+def _top(i: int, n: int) -> int:
+    """Ids reservados desde el final del rango (para borrados)."""
+    return max(n - i, 2)
+
+
+def _post_body(ctx, i):
+    return {"titulo": f"Carga {ctx.run}-{i}", "contenido": f"Contenido de la prueba de carga número {i}."}
+
+
+# Orden de ejecución: lecturas, escrituras, borrados
+SCENARIOS = (
+    Scenario("GET", "posts", lambda c, i: "/api/posts?limit=20"),
+    Scenario("GET", "post_detail", lambda c, i: f"/api/posts/{_pick(i, c.posts)}"),
+    Scenario("GET", "post_comments", lambda c, i: f"/api/posts/{_pick(i, c.posts)}/comments"),
+    Scenario("GET", "post_search", lambda c, i: f"/api/posts/search?q=post+{_pick(i, c.posts)}"),
+    Scenario("GET", "categories", lambda c, i: "/api/categories"),
+    Scenario("GET", "category_posts", lambda c, i: f"/api/categories/{_pick(i, c.categories)}/posts"),
+    Scenario("GET", "users", lambda c, i: "/api/users", auth=True),
+    Scenario("GET", "user_detail", lambda c, i: f"/api/users/{_pick(i, c.users)}", auth=True),
+    Scenario("GET", "stats", lambda c, i: "/api/stats", auth=True),
+    Scenario("GET", "metrics", lambda c, i: "/api/metrics", auth=True),
+    Scenario("GET", "export_posts", lambda c, i: f"/api/export/posts?after_id={max(c.posts - 200, 0)}", auth=True),
+    Scenario("GET", "export_comments",
+             lambda c, i: f"/api/export/comments?after_id={max(c.comments - 200, 0)}", auth=True),
+
+    # Solo lecturas, como la carga inicial de la página de un post
+    Scenario("POST", "batch", lambda c, i: "/api/batch", lambda c, i: {"operations": [
+        {"method": "GET", "path": f"/api/posts/{_pick(i, c.posts)}"},
+        {"method": "GET", "path": f"/api/posts/{_pick(i, c.posts)}/comments"},
+        {"method": "GET", "path": "/api/categories"},
+    ]}),
+    Scenario("POST", "login", lambda c, i: "/api/login",
+             lambda c, i: {"email": f"user{_pick(i, c.users):07d}@example.com", "password": "benchmark"}),
+    Scenario("POST", "register", lambda c, i: "/api/register",
+             lambda c, i: {"username": f"carga{c.run}{i}", "email": f"carga{c.run}{i}@example.com",
+                           "password": "benchmark"}),
+    Scenario("POST", "posts", lambda c, i: "/api/posts", _post_body, auth=True),
+    Scenario("POST", "posts_bulk", lambda c, i: "/api/posts/bulk",
+             lambda c, i: [_post_body(c, i * 20 + j) for j in range(20)], auth=True),
+    Scenario("PUT", "post_detail", lambda c, i: f"/api/posts/{_pick(i, c.posts)}",
+             lambda c, i: {"titulo": f"Editado {c.run}-{i}"}, auth=True),
+    Scenario("POST", "post_comments", lambda c, i: f"/api/posts/{_pick(i, c.posts)}/comments",
+             lambda c, i: {"contenido": f"Comentario de carga {i}"}, auth=True),
+    Scenario("POST", "categories", lambda c, i: "/api/categories",
+             lambda c, i: {"nombre": f"carga-{c.run}-{i}"}, auth=True),
+    Scenario("PUT", "category_detail", lambda c, i: f"/api/categories/{_pick(i, c.categories)}",
+             lambda c, i: {"nombre": f"renombrada-{c.run}-{i}"}, auth=True),
+    Scenario("PATCH", "user_role", lambda c, i: f"/api/users/{_pick(i, c.users - 1, 2)}/role",
+             lambda c, i: {"role": "moderator" if i % 2 else "user"}, auth=True),
+
+    Scenario("DELETE", "comment_delete", lambda c, i: f"/api/comments/{_top(i, c.comments)}", auth=True),
+    Scenario("DELETE", "post_detail", lambda c, i: f"/api/posts/{_top(i, c.posts)}", auth=True),
+    # Borra las categorías creadas por el escenario POST categories
+    Scenario("DELETE", "category_detail", lambda c, i: f"/api/categories/{c.categories + 1 + i}", auth=True),
+    Scenario("DELETE", "user_detail", lambda c, i: f"/api/users/{_top(i, c.users)}", auth=True),
+)
+
+
+def percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+def run_scenario(app, ctx, scenario: Scenario, requests: int, threads: int, warmup: int) -> dict:
+    headers = ctx.headers if scenario.auth else None
+    latencies = []
+    statuses = {}
+    errors = []
+    lock = threading.Lock()
+    counter = iter(range(requests))
+
+    def call(client, i):
+        body = scenario.body(ctx, i) if scenario.body else None
+        start = time.perf_counter()
+        response = client.open(scenario.url(ctx, i), method=scenario.method, headers=headers, json=body)
+        response.get_data()  # consume respuestas streaming
+        return time.perf_counter() - start, response.status_code
+
+    def worker():
+        client = app.test_client()
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            try:
+                elapsed, status = call(client, i)
+            except Exception as exc:  # se registra y se sigue: un error no corta la corrida
+                with lock:
+                    errors.append(repr(exc))
+                continue
+            with lock:
+                latencies.append(elapsed * 1000)
+                statuses[status] = statuses.get(status, 0) + 1
+
+    # Calentamiento (solo lecturas) con índices fuera del rango medido
+    if warmup and scenario.method == "GET":
+        client = app.test_client()
+        for i in range(warmup):
+            call(client, requests + i)
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    wall = time.perf_counter() - started
+
+    server_errors = sum(v for k, v in statuses.items() if k >= 500) + len(errors)
+    return {
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p90_ms": round(percentile(latencies, 0.90), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "max_ms": round(max(latencies), 3) if latencies else 0.0,
+        "statuses": {str(k): v for k, v in sorted(statuses.items())},
+        "errors": server_errors,
+        "exceptions": errors[:5],
+    }
+
+
+def uncovered_routes(app) -> list:
+    covered = {(s.endpoint, s.method) for s in SCENARIOS}
+    missing = []
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint == "static":
+            continue
+        for method in sorted((rule.methods or set()) - {"HEAD", "OPTIONS"}):
+            if (rule.endpoint, method) not in covered:
+                missing.append(f"{method} {rule.rule}")
+    return missing
+
+
+def git_info() -> dict:
+    def git(*args):
+        try:
+            return subprocess.run(("git",) + args, capture_output=True, text=True, check=True,
+                                  cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    return {"commit": git("rev-parse", "HEAD"), "branch": git("rev-parse", "--abbrev-ref", "HEAD"),
+            "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def compare(current: dict, baseline: dict, max_regression: float) -> bool:
+    """Imprime la diferencia por ruta; devuelve False si alguna empeora más que max_regression."""
+    ok = True
+    print(f"\n{'ruta':<32} {'p99 base':>9} {'p99':>9} {'rps base':>9} {'rps':>9}")
+    for name, result in current["routes"].items():
+        base = baseline.get("routes", {}).get(name)
+        if base is None:
+            continue
+        worse_p99 = base["p99_ms"] and result["p99_ms"] > base["p99_ms"] * (1 + max_regression)
+        worse_rps = base["throughput_rps"] and result["throughput_rps"] < base["throughput_rps"] * (1 - max_regression)
+        flag = "   <-- REGRESIÓN" if worse_p99 or worse_rps else ""
+        ok = ok and not flag
+        print(f"{name:<32} {base['p99_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+              f"{base['throughput_rps']:>9.1f} {result['throughput_rps']:>9.1f}{flag}")
+    return ok
+
+
+def _config_value(raw: str):
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return raw
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--posts", type=int, default=5000)
+    parser.add_argument("--comments-per-post", type=int, default=3)
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument("--categories-per-post", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=1, help="semilla del generador de datos")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="pedidos por ruta")
+    parser.add_argument("--warmup", type=int, default=5, help="pedidos de calentamiento por ruta GET")
+    parser.add_argument("--only", nargs="*", help="endpoints a medir (por nombre)")
+    parser.add_argument("--config", action="append", default=[], metavar="CLAVE=VALOR",
+                        help="override de configuración de la app (VALOR en JSON o texto)")
+    parser.add_argument("--output", default="load_test.json")
+    parser.add_argument("--compare", help="JSON de una corrida anterior")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv if argv is not None else sys.argv[1:])
+    overrides = dict(item.split("=", 1) for item in args.config)
+    overrides = {key: _config_value(value) for key, value in overrides.items()}
+
+    path = os.path.join(tempfile.mkdtemp(prefix="load_test_"), "bench.db")
+    app = build_app(f"sqlite:///{path}", **overrides)
+
+    started = time.perf_counter()
+    with app.app_context():
+        counts = seed(users=args.users, posts=args.posts, comments_per_post=args.comments_per_post,
+                      categories=args.categories, categories_per_post=args.categories_per_post,
+                      seed_value=args.seed)
+        headers = auth_headers(user_id=1, role="admin")
+    seed_seconds = time.perf_counter() - started
+    print(f"Datos sembrados en {seed_seconds:.1f}s: {counts}")
+
+    ctx = argparse.Namespace(
+        users=args.users, posts=args.posts, categories=args.categories,
+        comments=counts["comentario"], headers=headers, run=int(time.time()),
+    )
+
+    results = {}
+    print(f"{'ruta':<32} {'rps':>9} {'p50 ms':>9} {'p99 ms':>9}  status")
+    for scenario in SCENARIOS:
+        if args.only and scenario.endpoint not in args.only:
+            continue
+        name = f"{scenario.method} {scenario.endpoint}"
+        result = run_scenario(app, ctx, scenario, args.requests, args.threads, args.warmup)
+        results[name] = result
+        print(f"{name:<32} {result['throughput_rps']:>9.1f} {result['p50_ms']:>9.2f} "
+              f"{result['p99_ms']:>9.2f}  {result['statuses']}"
+              + (f"  errores={result['errors']}" if result["errors"] else ""))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "git": git_info(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+            "config": overrides,
+            "rows": counts,
+            "seed_seconds": round(seed_seconds, 2),
+        },
+        "uncovered": uncovered_routes(app),
+        "routes": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2, ensure_ascii=False)
+    print(f"\nResultados en {args.output}")
+    if report["uncovered"]:
+        print(f"Rutas sin escenario: {', '.join(report['uncovered'])}")
+
+    failed = any(r["errors"] for r in results.values())
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            failed = not compare(report, json.load(fh), args.max_regression) or failed
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
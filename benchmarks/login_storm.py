@@ -0,0 +1,83 @@
+"""
+Mide la latencia de un endpoint de lectura mientras hay una ráfaga de logins,
+con el hashing en el hilo del pedido (PASSWORD_HASH_WORKERS=0) y en el pool.
+
+    python -m benchmarks.login_storm [segundos] [hilos_de_login]
+
+Por cada modo imprime logins/s, respuestas 503 y p50/p95 de GET /api/posts/1.
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.harness import build_app, seed
+
+READ_URL = "/api/posts/1"
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+def run(workers: int, seconds: float, login_threads: int) -> dict:
+    path = os.path.join(tempfile.mkdtemp(), "storm.db")
+    app = build_app(f"sqlite:///{path}", PASSWORD_HASH_WORKERS=workers,
+                    PASSWORD_HASH_MAX_PENDING=login_threads)
+    with app.app_context():
+        seed(users=login_threads, posts=50, comments_per_post=2)
+
+    deadline = time.monotonic() + seconds
+    statuses = {}
+    read_latencies = []
+    lock = threading.Lock()
+
+    def login_loop(n):
+        client = app.test_client()
+        body = {"email": f"user{n:07d}@example.com", "password": "benchmark"}
+        while time.monotonic() < deadline:
+            status = client.post("/api/login", json=body).status_code
+            with lock:
+                statuses[status] = statuses.get(status, 0) + 1
+
+    def read_loop():
+        client = app.test_client()
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            client.get(READ_URL)
+            read_latencies.append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=login_loop, args=(i,)) for i in range(1, login_threads + 1)]
+    threads.append(threading.Thread(target=read_loop))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    app.extensions["password_hasher"].shutdown()
+
+    return {
+        "logins_s": statuses.get(200, 0) / seconds,
+        "rejected": statuses.get(503, 0),
+        "read_p50": percentile(read_latencies, 0.50),
+        "read_p95": percentile(read_latencies, 0.95),
+        "reads": len(read_latencies),
+    }
+
+
+def main() -> int:
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    login_threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    print(f"{'modo':<12} {'logins/s':>9} {'503':>6} {'lecturas':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for label, workers in (("inline", 0), ("pool(2)", 2)):
+        r = run(workers, seconds, login_threads)
+        print(f"{label:<12} {r['logins_s']:>9.1f} {r['rejected']:>6} {r['reads']:>9} "
+              f"{r['read_p50']:>8.2f} {r['read_p95']:>8.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
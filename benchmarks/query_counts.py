@@ -0,0 +1,71 @@
+"""
+Verifica que cada endpoint de lectura ejecute una cantidad fija de consultas SQL,
+sin importar cuántas filas haya (detecta consultas N+1).
+
+    python -m benchmarks.query_counts
+
+Siembra la base con dos volúmenes distintos, cuenta las consultas por endpoint
+y falla (exit code 1) si alguna cantidad crece con los datos.
+"""
+import sys
+
+from app import db
+from benchmarks.harness import auth_headers, build_app, count_queries, seed
+
+SIZES = (
+    {"users": 5, "posts": 10, "comments_per_post": 1, "categories": 2},
+    {"users": 200, "posts": 400, "comments_per_post": 5, "categories": 20},
+)
+
+# (método, url, requiere token)
+ENDPOINTS = (
+    ("GET", "/api/posts?limit=100", False),
+    ("GET", "/api/posts?limit=100&fields=id,titulo,excerpt", False),
+    ("GET", "/api/posts/1", False),
+    ("GET", "/api/posts/1?include=comments,categories,autor", False),
+    ("GET", "/api/posts?categoria=1&limit=100", False),
+    ("GET", "/api/categories", False),
+    ("GET", "/api/categories/1/posts?limit=100", False),
+    ("GET", "/api/users", True),
+    ("GET", "/api/users?role=user&is_active=true&limit=100", True),
+    ("GET", "/api/users?username=user0000&limit=100", True),
+    ("GET", "/api/users/2", True),
+    ("GET", "/api/stats", True),
+)
+
+
+def measure(size: dict) -> dict:
+    app = build_app()
+    results = {}
+    with app.app_context():
+        seed(**size)
+        headers = auth_headers()
+        client = app.test_client()
+        # La lista de revocación se sincroniza con la base cada REVOCATION_SYNC_SECONDS;
+        # se fuerza la primera sincronización para no contarla en el primer endpoint
+        app.extensions["revocation_list"].sync()
+        for method, url, needs_auth in ENDPOINTS:
+            db.session.remove()
+            with count_queries() as counter:
+                response = client.open(url, method=method, headers=headers if needs_auth else None)
+            results[(method, url)] = (response.status_code, counter.count)
+    return results
+
+
+def main() -> int:
+    runs = [measure(size) for size in SIZES]
+    failed = False
+    print(f"{'endpoint':56} " + " ".join(f"{'n=' + str(s['posts']):>10}" for s in SIZES))
+    for method, url, _ in ENDPOINTS:
+        key = (method, url)
+        counts = [run[key][1] for run in runs]
+        statuses = {run[key][0] for run in runs}
+        ok = len(set(counts)) == 1 and all(status < 400 for status in statuses)
+        failed = failed or not ok
+        print(f"{method + ' ' + url:56} " + " ".join(f"{c:>10}" for c in counts)
+              + ("" if ok else f"   <-- FALLA (status {sorted(statuses)})"))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+Verificación local del ruteo de lecturas a réplicas con dos archivos SQLite.
+
+    python -m benchmarks.replica_routing
+
+La "réplica" es una copia del archivo del primario tomada después de cargar
+los datos: lo escrito después no le llega, como una réplica atrasada. Para
+cada pedido se cuentan las sentencias que fueron a cada engine.
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+from sqlalchemy import event
+
+from app import db
+from benchmarks.harness import auth_headers, build_app, seed
+from services.revocation import revocation_list
+
+
+def main() -> int:
+    workdir = tempfile.mkdtemp(prefix="miniblog-replicas-")
+    primary_path = os.path.join(workdir, "primary.db")
+    replica_path = os.path.join(workdir, "replica.db")
+    app = build_app(
+        f"sqlite:///{primary_path}",
+        SQLALCHEMY_BINDS={"replica": {"url": f"sqlite:///{replica_path}", "pool_size": 2}},
+        SQLALCHEMY_READ_REPLICAS=("replica",),
+    )
+    counts = {"primary": 0, "replica": 0}
+    with app.app_context():
+        seed(users=5, posts=50, comments_per_post=2)
+        shutil.copyfile(primary_path, replica_path)
+        for name, engine in (("primary", db.engines[None]), ("replica", db.engines["replica"])):
+            event.listen(engine, "before_cursor_execute",
+                         lambda *args, name=name: counts.__setitem__(name, counts[name] + 1))
+        revocation_list().sync()  # la primera sincronización no cuenta para ningún pedido
+        admin, author, other = auth_headers(1, "admin"), auth_headers(2, "user"), auth_headers(3, "user")
+
+    client = app.test_client()
+    new_post = {}
+
+    def create_post():
+        response = client.post("/api/posts", headers=author,
+                               json={"titulo": "Post nuevo", "contenido": "Escrito después de la copia."})
+        new_post["id"] = response.get_json()["id"]
+        return response
+
+    # (descripción, pedido, status esperado, engine esperado)
+    cases = (
+        ("GET /api/posts anónimo", lambda: client.get("/api/posts"), 200, "replica"),
+        ("GET /api/stats admin", lambda: client.get("/api/stats", headers=admin), 200, "replica"),
+        ("GET /api/export/posts admin", lambda: client.get("/api/export/posts", headers=admin), 200, "replica"),
+        ("POST /api/posts autor", create_post, 201, "primary"),
+        ("GET post nuevo, autor (read-your-writes)",
+         lambda: client.get(f"/api/posts/{new_post['id']}", headers=author), 200, "primary"),
+        ("GET post nuevo, otro usuario (réplica atrasada)",
+         lambda: client.get(f"/api/posts/{new_post['id']}", headers=other), 404, "replica"),
+        ("GET post nuevo, anónimo (réplica atrasada)",
+         lambda: client.get(f"/api/posts/{new_post['id']}"), 404, "replica"),
+        ("POST /api/categories admin",
+         lambda: client.post("/api/categories", headers=admin, json={"nombre": "Nueva"}), 201, "primary"),
+        ("GET /api/categories anónimo (recarga la caché)", lambda: client.get("/api/categories"), 200, "primary"),
+    )
+
+    failures = 0
+    print(f"{'pedido':50} {'status':>6} {'primario':>9} {'réplica':>8}")
+    for description, call, status, expected in cases:
+        before = dict(counts)
+        response = call()
+        response.get_data()
+        used = {name: counts[name] - before[name] for name in counts}
+        ok = response.status_code == status and used[expected] > 0 and not any(
+            value for name, value in used.items() if name != expected)
+        failures += not ok
+        print(f"{description:50} {response.status_code:>6} {used['primary']:>9} {used['replica']:>8}"
+              f"{'' if ok else '  <- FALLA'}")
+    print(app.extensions["db_router"].metrics())
+
+    shutil.rmtree(workdir, ignore_errors=True)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
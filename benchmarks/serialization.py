@@ -0,0 +1,67 @@
+"""
+Compara la serialización de listados: marshmallow + json de la stdlib (antes)
+contra serializadores compilados + OrjsonProvider (después).
+
+    python -m benchmarks.serialization [filas] [repeticiones]
+
+Para cada listado verifica que el cuerpo de la respuesta sea idéntico byte a
+byte en ambos caminos y falla (exit code 1) si no lo es.
+"""
+import sys
+import timeit
+
+from flask.json.provider import DefaultJSONProvider
+
+from app import db
+from benchmarks.harness import build_app, seed
+from repositories.category_repository import CategoryRepository
+from repositories.post_repository import PostRepository
+from repositories.user_repository import UserRepository
+from schemas.category_schemas import CategorySchema
+from schemas.compiled import compiled
+from schemas.post_schemas import PostSchema
+from services.json_provider import OrjsonProvider, orjson
+from views.user_views import UserSchema
+
+
+def main() -> int:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    app = build_app()
+    stdlib = DefaultJSONProvider(app)
+    fast = OrjsonProvider(app) if orjson is not None else stdlib
+
+    with app.app_context():
+        seed(users=rows, posts=rows, comments_per_post=0, categories=min(rows, 500))
+        # Un título no ASCII para ejercitar también el camino de respaldo
+        db.session.execute(db.text("UPDATE post SET titulo = 'Canción ñandú' WHERE id = 1"))
+        db.session.commit()
+        listings = (
+            ("posts", PostSchema, PostRepository.get_all()),
+            ("users", UserSchema, UserRepository.get_all(profile="admin")),
+            ("categories", CategorySchema, CategoryRepository.get_all()),
+        )
+
+        failed = False
+        print(f"{'listado':<12} {'filas':>6} {'antes ms':>9} {'después ms':>11} {'speedup':>8}  bytes iguales")
+        for name, schema_cls, objects in listings:
+            def before():
+                return stdlib.response({"items": schema_cls(many=True).dump(objects)}).get_data()
+
+            def after():
+                return fast.response({"items": compiled(schema_cls).many(objects)}).get_data()
+
+            same = before() == after()
+            failed = failed or not same
+            t_before = timeit.timeit(before, number=repeat) / repeat * 1000
+            t_after = timeit.timeit(after, number=repeat) / repeat * 1000
+            print(f"{name:<12} {len(objects):>6} {t_before:>9.2f} {t_after:>11.2f} "
+                  f"{t_before / t_after:>7.1f}x  {'sí' if same else 'NO'}")
+
+        if orjson is None:
+            print("orjson no está instalado: solo se midieron los serializadores compilados")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
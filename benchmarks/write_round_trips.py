@@ -0,0 +1,67 @@
+"""
+Cuenta los viajes a la base de cada endpoint de escritura: sentencias SQL
+(incluidos los SELECT de refresh) y COMMITs.
+
+    python -m benchmarks.write_round_trips
+
+Cada endpoint se ejecuta una vez sobre una base sembrada; la cantidad no
+depende del volumen de datos, así que una base chica alcanza.
+"""
+import sys
+from types import SimpleNamespace
+
+from sqlalchemy import event
+
+from app import db
+from benchmarks.harness import auth_headers, build_app, seed
+
+# (método, url, cuerpo, usuario que hace el pedido, status esperado)
+ENDPOINTS = (
+    ("POST", "/api/register",
+     {"username": "nuevo", "email": "nuevo@example.com", "password": "secreta123"}, None, 201),
+    ("POST", "/api/posts",
+     {"titulo": "Post nuevo", "contenido": "Contenido del post nuevo.", "categoria_ids": [1, 2]}, 2, 201),
+    ("PUT", "/api/posts/1", {"titulo": "Título editado", "categoria_ids": [2]}, 1, 200),
+    ("POST", "/api/posts/1/comments", {"contenido": "Un comentario"}, 2, 201),
+    ("POST", "/api/categories", {"nombre": "categoria-nueva"}, 1, 201),
+    ("PUT", "/api/categories/1", {"nombre": "categoria-renombrada"}, 1, 200),
+    ("PATCH", "/api/users/3/role", {"role": "moderator"}, 1, 200),
+    ("DELETE", "/api/users/4", None, 1, 200),
+)
+
+
+def main() -> int:
+    app = build_app(PASSWORD_HASH_METHOD="pbkdf2:sha256:1000", REVOCATION_SYNC_SECONDS=3600)
+    counter = SimpleNamespace(statements=0, commits=0)
+
+    def before_cursor_execute(*args):
+        counter.statements += 1
+
+    def commit(conn):
+        counter.commits += 1
+
+    with app.app_context():
+        seed(users=5, posts=10, comments_per_post=1, categories=3)
+        headers = {user_id: auth_headers(user_id, "admin" if user_id == 1 else "user") for user_id in (1, 2)}
+        app.extensions["revocation_list"].sync()
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "commit", commit)
+
+    # Fuera del app_context: cada pedido tiene su propio contexto (y su propio g)
+    client = app.test_client()
+    failed = False
+    print(f"{'endpoint':32} {'status':>6} {'sentencias':>10} {'commits':>8}")
+    for method, url, body, user_id, expected in ENDPOINTS:
+        counter.statements = counter.commits = 0
+        response = client.open(url, method=method, json=body, headers=headers[user_id] if user_id else None)
+        ok = response.status_code == expected
+        failed = failed or not ok
+        print(f"{method + ' ' + url:32} {response.status_code:>6} {counter.statements:>10} {counter.commits:>8}"
+              + ("" if ok else "   <-- FALLA"))
+    app.extensions["password_hasher"].shutdown()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,73 +1,164 @@
 from functools import wraps
-from flask import jsonify
+from typing import FrozenSet, NamedTuple, Optional
+
+from flask import g, jsonify, request
 from flask_jwt_extended import verify_jwt_in_request, get_jwt, get_jwt_identity
 
 
+class Policy(NamedTuple):
+    """Requisitos de acceso de una vista: roles admitidos (None = cualquiera) y usuario activo."""
+    roles: Optional[FrozenSet[str]] = None
+    active: bool = False
+
+
+class Principal(NamedTuple):
+    """Usuario autenticado del pedido, armado una sola vez a partir del token."""
+    id: int
+    role: str
+    is_active: bool
+    claims: dict
+
+
 def roles_required(*roles):
     """
     Decorador para restringir acceso según el rol del usuario.
     Uso:
-        @jwt_required()
         @roles_required('admin')              # solo admin
         @roles_required('admin', 'moderator') # admin o moderator
+
+    La verificación la hace init_authorization una vez por pedido (el token se
+    decodifica una sola vez aunque se apilen varios decoradores).
     """
     def wrapper(fn):
-        @wraps(fn)
-        def decorator(*args, **kwargs):
-            # Verifica token válido
-            verify_jwt_in_request()
-            claims = get_jwt()
-            user_role = claims.get("role", "user")  # fallback 'user' si no viene
-
-            if user_role not in roles:
-                return jsonify({
-                    "error": "Acceso denegado",
-                    "message": f"Se requiere uno de los roles: {roles}"
-                }), 403
-
-            return fn(*args, **kwargs)
-        return decorator
+        return _with_policy(fn, roles=frozenset(roles))
     return wrapper
 
 
 def active_user_required(fn):
     """
     Decorador que verifica que el usuario (según claims) esté activo.
-    Requiere que el token incluya 'is_active' en los claims o que la vista
-    valide la condición consultando la BD.
+    Requiere que el token incluya 'is_active' en los claims; si no viene se
+    asume activo.
     """
-    @wraps(fn)
-    def wrapper(*args, **kwargs):
-        verify_jwt_in_request()
-        claims = get_jwt()
+    return _with_policy(fn, active=True)
+
 
-        # Si no incluiste is_active en los claims, podés dejar True por defecto
-        is_active = claims.get("is_active", True)
-        if not is_active:
-            return jsonify({
-                "error": "Usuario inactivo",
-                "message": "Tu cuenta ha sido desactivada. Contacta al administrador."
-            }), 403
+def _with_policy(fn, roles=None, active=False):
+    """
+    Agrega requisitos a la política de la vista. Si fn ya es una vista decorada,
+    combina las políticas en lugar de apilar otro wrapper.
+    """
+    current = getattr(fn, "__auth_policy__", None)
+    if current is not None:
+        fn.__auth_policy__ = Policy(
+            roles=roles if roles is not None else current.roles,
+            active=current.active or active,
+        )
+        return fn
 
+    @wraps(fn)
+    def decorator(*args, **kwargs):
+        # Respaldo si la vista se ejecuta sin init_authorization (p. ej. fuera de create_app)
+        if not g.get("_authorized"):
+            denied = authorize(decorator.__auth_policy__)
+            if denied is not None:
+                return denied
         return fn(*args, **kwargs)
-    return wrapper
+
+    decorator.__auth_policy__ = Policy(roles=roles, active=active)
+    return decorator
 
 
-def check_ownership_or_role(resource_owner_id):
+def authorize(policy: Policy):
+    """
+    Verifica el token una vez, guarda el Principal en g y aplica la política.
+    Devuelve una respuesta 403 si se deniega el acceso, o None si está permitido.
+    """
+    principal = current_principal()
+
+    if policy.roles is not None and principal.role not in policy.roles:
+        return jsonify({
+            "error": "Acceso denegado",
+            "message": f"Se requiere uno de los roles: {tuple(sorted(policy.roles))}"
+        }), 403
+
+    if policy.active and not principal.is_active:
+        return jsonify({
+            "error": "Usuario inactivo",
+            "message": "Tu cuenta ha sido desactivada. Contacta al administrador."
+        }), 403
+
+    g._authorized = True
+    return None
+
+
+def current_principal() -> Principal:
+    """
+    Principal del pedido actual; la primera llamada verifica el token
+    (verify_jwt_in_request) y las siguientes lo leen de g.
+    """
+    principal = g.get("principal")
+    if principal is None:
+        verify_jwt_in_request()
+        claims = get_jwt()
+        principal = Principal(
+            id=int(get_jwt_identity()),
+            role=claims.get("role", "user"),  # fallback 'user' si no viene
+            is_active=claims.get("is_active", True),
+            claims=claims,
+        )
+        g.principal = principal
+    return principal
+
+
+def check_ownership_or_role(resource_owner_id, roles=("admin",)):
     """
     Verifica si el usuario autenticado ES PROPIETARIO del recurso
-    o tiene rol 'admin'. Retorna True/False.
+    o tiene alguno de los roles indicados (por defecto 'admin'). Retorna True/False.
 
     Uso dentro de una vista (MethodView):
         if not check_ownership_or_role(post.usuario_id):
             return jsonify({"error": "No tienes permiso"}), 403
     """
-    # identity: id que pasaste al crear el token (create_access_token(identity=...))
-    user_id = get_jwt_identity()
-    claims = get_jwt()
-    user_role = claims.get("role")
-
-    if user_role == "admin":
+    principal = current_principal()
+    if principal.role in roles:
         return True
+    return principal.id == resource_owner_id
+
+
+# ==================== Tabla de permisos ====================
+
+def build_policy_table(app) -> dict:
+    """
+    Recorre las rutas registradas y arma {(endpoint, MÉTODO): Policy}
+    a partir de los decoradores de cada método de las MethodView.
+    """
+    table = {}
+    for rule in app.url_map.iter_rules():
+        view_func = app.view_functions.get(rule.endpoint)
+        view_class = getattr(view_func, "view_class", None)
+        for method in rule.methods or ():
+            handler = getattr(view_class, method.lower(), None) if view_class else view_func
+            policy = getattr(handler, "__auth_policy__", None)
+            if policy is not None:
+                table[(rule.endpoint, method)] = policy
+    return table
+
+
+def init_authorization(app) -> dict:
+    """
+    Construye la tabla endpoint -> política (app.extensions['auth_policies'])
+    y registra un before_request que la aplica: el token se verifica una sola
+    vez por pedido y solo en endpoints protegidos.
+    Debe llamarse después de registrar las rutas.
+    """
+    table = build_policy_table(app)
+    app.extensions['auth_policies'] = table
+
+    @app.before_request
+    def enforce_policy():
+        policy = table.get((request.endpoint, request.method))
+        if policy is not None:
+            return authorize(policy)
 
-    return user_id == resource_owner_id
\ No newline at end of file
+    return table
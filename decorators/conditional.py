@@ -0,0 +1,51 @@
+import hashlib
+from datetime import timezone
+from functools import wraps
+
+from flask import request, make_response
+from werkzeug.http import is_resource_modified
+
+
+def conditional(version_fn, validate_last_modified: bool = True):
+    """
+    Decorador para GET condicionales (ETag / Last-Modified / 304).
+    - version_fn(**kwargs_de_la_vista) hace una consulta barata y devuelve
+      (seed, last_modified) o None si el recurso no existe.
+    - El ETag es un hash fuerte de la URL completa (incluye query params) + seed,
+      así que cambia si cambia cualquier dato que se serializa.
+    - validate_last_modified=False: se envía Last-Modified pero solo se valida
+      con el ETag (en listados un borrado no mueve la fecha máxima).
+    Si el cliente ya tiene la versión actual responde 304 sin ejecutar la vista.
+    Uso:
+        @conditional(lambda post_id: post_repo.get_version(post_id))
+        def get(self, post_id): ...
+    """
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            version = version_fn(**kwargs)
+            if version is None:
+                return fn(*args, **kwargs)
+
+            seed, last_modified = version
+            raw = f"{request.full_path}|{seed!r}".encode("utf-8")
+            etag = hashlib.sha1(raw).hexdigest()
+            if last_modified is not None:
+                last_modified = last_modified.replace(microsecond=0, tzinfo=timezone.utc)
+
+            if not is_resource_modified(
+                request.environ, etag=etag,
+                last_modified=last_modified if validate_last_modified else None
+            ):
+                response = make_response("", 304)
+            else:
+                response = make_response(fn(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            return response
+        return decorator
+    return wrapper
@@ -0,0 +1,42 @@
+"""Índices secundarios para las consultas de los repositories
+
+Revision ID: 0b2a381eaf65
+Revises: c837897eb0cd
+Create Date: 2026-10-17 11:03:47.905216
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b2a381eaf65'
+down_revision = 'c837897eb0cd'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.create_index('ix_post_published_fecha', ['is_published', 'fecha_creacion', 'id'], unique=False)
+        batch_op.create_index('ix_post_usuario_fecha', ['usuario_id', 'fecha_creacion'], unique=False)
+        batch_op.create_index('ix_post_fecha_creacion', ['fecha_creacion'], unique=False)
+
+    with op.batch_alter_table('comentario', schema=None) as batch_op:
+        batch_op.create_index('ix_comentario_post_visible', ['post_id', 'is_visible'], unique=False)
+
+    with op.batch_alter_table('post_categoria', schema=None) as batch_op:
+        batch_op.create_index('ix_post_categoria_categoria', ['categoria_id', 'post_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('post_categoria', schema=None) as batch_op:
+        batch_op.drop_index('ix_post_categoria_categoria')
+
+    with op.batch_alter_table('comentario', schema=None) as batch_op:
+        batch_op.drop_index('ix_comentario_post_visible')
+
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.drop_index('ix_post_fecha_creacion')
+        batch_op.drop_index('ix_post_usuario_fecha')
+        batch_op.drop_index('ix_post_published_fecha')
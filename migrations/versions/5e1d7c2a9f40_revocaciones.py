@@ -0,0 +1,38 @@
+"""Revocaciones de tokens compartidas entre workers
+
+Revision ID: 5e1d7c2a9f40
+Revises: 0b2a381eaf65
+Create Date: 2026-10-17 14:21:09.518344
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e1d7c2a9f40'
+down_revision = '0b2a381eaf65'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('revocacion',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tipo', sa.String(length=16), nullable=False),
+    sa.Column('valor', sa.String(length=64), nullable=False),
+    sa.Column('revocado_en', sa.DateTime(), nullable=False),
+    sa.Column('expira', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('revocacion', schema=None) as batch_op:
+        batch_op.create_index('ix_revocacion_revocado_en', ['revocado_en'], unique=False)
+        batch_op.create_index('ix_revocacion_expira', ['expira'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('revocacion', schema=None) as batch_op:
+        batch_op.drop_index('ix_revocacion_expira')
+        batch_op.drop_index('ix_revocacion_revocado_en')
+
+    op.drop_table('revocacion')
@@ -0,0 +1,41 @@
+"""Contador de comentarios por post y paginación de comentarios
+
+Revision ID: 7c4e1b9d2a63
+Revises: 5e1d7c2a9f40
+Create Date: 2026-10-17 16:02:41.730118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c4e1b9d2a63'
+down_revision = '5e1d7c2a9f40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('comment_count', sa.Integer(), server_default='0', nullable=False))
+
+    op.execute(
+        "UPDATE post SET comment_count = ("
+        "SELECT COUNT(*) FROM comentario "
+        "WHERE comentario.post_id = post.id AND comentario.is_visible = 1)"
+    )
+
+    with op.batch_alter_table('comentario', schema=None) as batch_op:
+        batch_op.create_index('ix_comentario_post_visible_fecha',
+                              ['post_id', 'is_visible', 'fecha_creacion', 'id'], unique=False)
+        batch_op.drop_index('ix_comentario_post_visible')
+
+
+def downgrade():
+    with op.batch_alter_table('comentario', schema=None) as batch_op:
+        batch_op.create_index('ix_comentario_post_visible', ['post_id', 'is_visible'], unique=False)
+        batch_op.drop_index('ix_comentario_post_visible_fecha')
+
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.drop_column('comment_count')
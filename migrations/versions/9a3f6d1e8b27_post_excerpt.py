@@ -0,0 +1,59 @@
+"""Resumen precalculado de los posts
+
+Revision ID: 9a3f6d1e8b27
+Revises: 7c4e1b9d2a63
+Create Date: 2026-10-17 17:18:52.604391
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a3f6d1e8b27'
+down_revision = '7c4e1b9d2a63'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+EXCERPT_LENGTH = 200
+
+
+def make_excerpt(texto):
+    """
+    Copia congelada de models.make_excerpt tal como era en esta revisión: la
+    migración no debe cambiar si el modelo cambia después.
+    """
+    texto = " ".join((texto or "").split())
+    if len(texto) <= EXCERPT_LENGTH:
+        return texto
+    corte = texto.rfind(" ", 0, EXCERPT_LENGTH + 1)
+    return texto[:corte if corte > 0 else EXCERPT_LENGTH].rstrip() + "..."
+
+
+def upgrade():
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('excerpt', sa.String(length=255), server_default='', nullable=False))
+
+    # Se calcula en Python (igual que al guardar un post en esta revisión), de a lotes por id
+    post = sa.table('post', sa.column('id', sa.Integer), sa.column('contenido', sa.Text),
+                    sa.column('excerpt', sa.String))
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(post.c.id, post.c.contenido).where(post.c.id > last_id)
+            .order_by(post.c.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        connection.execute(
+            post.update().where(post.c.id == sa.bindparam('post_id')).values(excerpt=sa.bindparam('value')),
+            [{"post_id": row.id, "value": make_excerpt(row.contenido)} for row in rows]
+        )
+        last_id = rows[-1].id
+
+
+def downgrade():
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.drop_column('excerpt')
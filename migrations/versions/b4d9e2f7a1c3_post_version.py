@@ -0,0 +1,26 @@
+"""Versión de los posts para los ETag (contador de comentarios y categorías)
+
+Revision ID: b4d9e2f7a1c3
+Revises: f2c8a4e6b1d7
+Create Date: 2026-10-17 23:12:08.451927
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4d9e2f7a1c3'
+down_revision = 'f2c8a4e6b1d7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,34 @@
+"""Registro de cambios de posts para el índice de búsqueda en memoria
+
+Revision ID: c6e3a9d1f4b8
+Revises: b4d9e2f7a1c3
+Create Date: 2026-10-17 23:48:15.203946
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6e3a9d1f4b8'
+down_revision = 'b4d9e2f7a1c3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('post_cambio',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('cambiado_en', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('post_cambio', schema=None) as batch_op:
+        batch_op.create_index('ix_post_cambio_cambiado_en', ['cambiado_en'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('post_cambio', schema=None) as batch_op:
+        batch_op.drop_index('ix_post_cambio_cambiado_en')
+
+    op.drop_table('post_cambio')
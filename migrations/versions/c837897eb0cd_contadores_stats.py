@@ -0,0 +1,28 @@
+"""Contadores de estadísticas
+
+Revision ID: c837897eb0cd
+Revises: cacc6d090c0b
+Create Date: 2026-10-17 10:12:03.412907
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c837897eb0cd'
+down_revision = 'cacc6d090c0b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('contador',
+    sa.Column('nombre', sa.String(length=64), nullable=False),
+    sa.Column('valor', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('nombre')
+    )
+
+
+def downgrade():
+    op.drop_table('contador')
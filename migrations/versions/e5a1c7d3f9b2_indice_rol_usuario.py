@@ -0,0 +1,28 @@
+"""Índices de user_credentials por usuario y por rol
+
+Revision ID: e5a1c7d3f9b2
+Revises: 9a3f6d1e8b27
+Create Date: 2026-10-17 20:50:11.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a1c7d3f9b2'
+down_revision = '9a3f6d1e8b27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user_credentials', schema=None) as batch_op:
+        batch_op.create_index('ix_user_credentials_usuario', ['usuario_id'], unique=False)
+        batch_op.create_index('ix_user_credentials_role_usuario', ['role', 'usuario_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('user_credentials', schema=None) as batch_op:
+        batch_op.drop_index('ix_user_credentials_role_usuario')
+        batch_op.drop_index('ix_user_credentials_usuario')
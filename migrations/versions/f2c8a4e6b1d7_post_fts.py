@@ -0,0 +1,34 @@
+"""Tabla FTS5 de búsqueda de posts (solo SQLite)
+
+Revision ID: f2c8a4e6b1d7
+Revises: e5a1c7d3f9b2
+Create Date: 2026-10-17 21:05:42.118530
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c8a4e6b1d7'
+down_revision = 'e5a1c7d3f9b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # En otros motores la búsqueda usa el índice en memoria (SEARCH_BACKEND)
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS post_fts USING fts5("
+        "titulo, contenido, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    op.execute("DELETE FROM post_fts")
+    op.execute("INSERT INTO post_fts (rowid, titulo, contenido) SELECT id, titulo, contenido FROM post")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("DROP TABLE IF EXISTS post_fts")
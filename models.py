@@ -1,16 +1,32 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from datetime import datetime
+from sqlalchemy.orm import validates
 from werkzeug.security import generate_password_hash, check_password_hash
 
 from app import db
 
+# Largo máximo del resumen de un post (sin contar los "..." finales)
+EXCERPT_LENGTH = 200
+
+
+def make_excerpt(texto: str, length: int = EXCERPT_LENGTH) -> str:
+    """Comienzo del texto con los espacios normalizados, cortado en un límite de palabra."""
+    texto = " ".join((texto or "").split())
+    if len(texto) <= length:
+        return texto
+    corte = texto.rfind(" ", 0, length + 1)
+    return texto[:corte if corte > 0 else length].rstrip() + "..."
+
+
 # Tabla intermedia Post-Categoria
 post_categoria = db.Table(
     'post_categoria',
     db.Column('post_id', db.Integer, db.ForeignKey('post.id'), primary_key=True),
     db.Column('categoria_id', db.Integer, db.ForeignKey('categoria.id'), primary_key=True)
 )
+# La PK (post_id, categoria_id) no sirve para buscar los posts de una categoría
+db.Index('ix_post_categoria_categoria', post_categoria.c.categoria_id, post_categoria.c.post_id)
 
 # Usuario
 class Usuario(UserMixin, db.Model):
@@ -36,6 +52,12 @@ class Usuario(UserMixin, db.Model):
 # Credenciales del Usuario 
 class UserCredentials(db.Model):
     __tablename__ = 'user_credentials'
+    __table_args__ = (
+        # JOIN desde usuario (credenciales de cada usuario)
+        db.Index('ix_user_credentials_usuario', 'usuario_id'),
+        # Listado de usuarios filtrado por rol
+        db.Index('ix_user_credentials_role_usuario', 'role', 'usuario_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False)
@@ -57,24 +79,48 @@ class UserCredentials(db.Model):
 # Post
 class Post(db.Model):
     __tablename__ = 'post'
+    __table_args__ = (
+        # Listado público paginado: WHERE is_published ORDER BY fecha_creacion, id
+        db.Index('ix_post_published_fecha', 'is_published', 'fecha_creacion', 'id'),
+        # Posts de un usuario ordenados por fecha
+        db.Index('ix_post_usuario_fecha', 'usuario_id', 'fecha_creacion'),
+        # Rango de fechas (posts de la última semana)
+        db.Index('ix_post_fecha_creacion', 'fecha_creacion'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     titulo = db.Column(db.String(140), nullable=False)
     contenido = db.Column(db.Text, nullable=False)
+    # Resumen precalculado de contenido (se actualiza al asignarlo): los listados
+    # pueden mostrar una vista previa sin leer el texto completo
+    excerpt = db.Column(db.String(255), nullable=False, default='', server_default='')
     fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
     fecha_actualizacion = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     is_published = db.Column(db.Boolean, default=True)
+    # Comentarios visibles; lo mantienen los eventos de comment_repository en la
+    # misma transacción que el alta, la baja o el cambio de visibilidad
+    comment_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Versión de lo que se serializa además de las columnas editables (contador de
+    # comentarios, categorías): entra en el ETag. fecha_actualizacion solo cambia
+    # con ediciones del post
+    version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False)
 
     comentarios = db.relationship('Comentario', backref='post', lazy=True)
+    # lazy='select' (no 'dynamic') para poder cargarla en lote con selectinload
     categorias = db.relationship(
         'Categoria',
         secondary=post_categoria,
         backref=db.backref('posts', lazy='dynamic'),
-        lazy='dynamic'
+        lazy='select'
     )
 
+    @validates('contenido')
+    def _actualizar_excerpt(self, key, contenido):
+        self.excerpt = make_excerpt(contenido)
+        return contenido
+
     def __repr__(self):
         return f'<Post {self.titulo}>'
 
@@ -82,6 +128,10 @@ class Post(db.Model):
 # Comentario
 class Comentario(db.Model):
     __tablename__ = 'comentario'
+    __table_args__ = (
+        # Comentarios visibles de un post, paginados por (fecha_creacion, id)
+        db.Index('ix_comentario_post_visible_fecha', 'post_id', 'is_visible', 'fecha_creacion', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     contenido = db.Column(db.Text, nullable=False)
@@ -103,4 +153,49 @@ class Categoria(db.Model):
     nombre = db.Column(db.String(64), unique=True, nullable=False)
 
     def __repr__(self):
-        return f'<Categoria {self.nombre}>'
\ No newline at end of file
+        return f'<Categoria {self.nombre}>'
+
+# Contadores precalculados para /api/stats (ver STATS_USE_COUNTERS)
+class Contador(db.Model):
+    __tablename__ = 'contador'
+
+    nombre = db.Column(db.String(64), primary_key=True)
+    valor = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<Contador {self.nombre}={self.valor}>'
+
+
+# Revocaciones de tokens: las consultan periódicamente todos los workers
+class Revocacion(db.Model):
+    __tablename__ = 'revocacion'
+    __table_args__ = (
+        db.Index('ix_revocacion_revocado_en', 'revocado_en'),
+        db.Index('ix_revocacion_expira', 'expira'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    tipo = db.Column(db.String(16), nullable=False)  # 'usuario' | 'jti'
+    valor = db.Column(db.String(64), nullable=False)
+    revocado_en = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    expira = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f'<Revocacion {self.tipo}={self.valor}>'
+
+
+# Altas, cambios y bajas de posts para el índice de búsqueda en memoria: cada
+# worker relee las filas nuevas y actualiza su copia del índice
+class PostCambio(db.Model):
+    __tablename__ = 'post_cambio'
+    __table_args__ = (
+        db.Index('ix_post_cambio_cambiado_en', 'cambiado_en'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    # Sin FK: la fila de una baja sobrevive al post
+    post_id = db.Column(db.Integer, nullable=False)
+    cambiado_en = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<PostCambio post={self.post_id}>'
@@ -1,5 +1,8 @@
+from sqlalchemy import select, update
+
 from app import db
-from models import Categoria
+from models import Categoria, Post, post_categoria
+from repositories.post_repository import version_bump
 
 class CategoryRepository:
     """Acceso a datos para categorías"""
@@ -14,25 +17,50 @@ class CategoryRepository:
         """Obtiene una categoría por id"""
         return Categoria.query.get(category_id)
 
+    @staticmethod
+    def get_by_nombre(nombre: str):
+        """Obtiene una categoría por nombre (único)"""
+        return Categoria.query.filter_by(nombre=nombre).first()
+
+    @staticmethod
+    def get_existing_ids(category_ids):
+        """Devuelve el subconjunto de ids que existen, en una sola consulta."""
+        if not category_ids:
+            return set()
+        rows = db.session.query(Categoria.id).filter(Categoria.id.in_(list(category_ids))).all()
+        return {row.id for row in rows}
+
     @staticmethod
     def create(nombre: str):
         """Crea una nueva categoría"""
         nueva = Categoria(nombre=nombre)
         db.session.add(nueva)
-        db.session.commit()
-        db.session.refresh(nueva)
+        db.session.flush()
         return nueva
 
     @staticmethod
     def update(category: Categoria, nombre: str):
         """Actualiza una categoría existente"""
         category.nombre = nombre
-        db.session.commit()
-        db.session.refresh(category)
+        CategoryRepository._touch_posts(category.id)
+        db.session.flush()
         return category
 
     @staticmethod
     def delete(category: Categoria):
         """Elimina una categoría"""
+        CategoryRepository._touch_posts(category.id)
         db.session.delete(category)
-        db.session.commit()
\ No newline at end of file
+        db.session.flush()
+
+    @staticmethod
+    def _touch_posts(category_id: int) -> None:
+        """
+        Sube la versión de los posts de la categoría (sin commit): los posts
+        serializan sus categorías, así que cambia su ETag.
+        """
+        post_ids = select(post_categoria.c.post_id).where(post_categoria.c.categoria_id == category_id)
+        db.session.execute(
+            update(Post).where(Post.id.in_(post_ids)).values(**version_bump())
+            .execution_options(synchronize_session="fetch")
+        )
@@ -1,12 +1,71 @@
+from datetime import datetime
+from typing import FrozenSet, List, Optional, Tuple
+
+from sqlalchemy import func, inspect, select, update
+from sqlalchemy.orm import joinedload
+
 from app import db
-from models import Comentario
-from flask_jwt_extended import get_jwt_identity
+from models import Comentario, Post
+from decorators.auth_decorators import current_principal
+from repositories.loading import LoadProfiles, profile_options, sparse_options
+from repositories.pagination import decode_cursor, seek_after, split_page
+from repositories.post_repository import version_bump
+from repositories.session_deltas import SessionDeltas
 
 class CommentRepository:
 
+    PROFILES: LoadProfiles = {
+        "list": lambda: (joinedload(Comentario.autor),),
+    }
+    # Campos de CommentSchema que salen de relaciones, para las cargas con ?fields=
+    RELATIONS: LoadProfiles = {
+        "autor_username": lambda: (joinedload(Comentario.autor),),
+    }
+
+    @staticmethod
+    def get_by_post(post_id: int, profile: Optional[str] = "list"):
+        return (Comentario.query.options(*profile_options(CommentRepository.PROFILES, profile))
+                .filter_by(post_id=post_id, is_visible=True)
+                .all())
+
+    @staticmethod
+    def get_page(post_id: int, limit: int, cursor: Optional[str] = None, profile: Optional[str] = "list",
+                 fields: Optional[FrozenSet[str]] = None) -> Tuple[List[Comentario], Optional[str]]:
+        """
+        Página de comentarios visibles de un post, en orden cronológico por
+        (fecha_creacion, id), con búsqueda por cursor como PostRepository.get_page.
+        - fields: campos de CommentSchema pedidos; se cargan solo sus columnas y relaciones.
+        Retorna (comentarios, next_cursor).
+        """
+        if fields is None:
+            options = profile_options(CommentRepository.PROFILES, profile)
+        else:
+            options = sparse_options(Comentario, fields, CommentRepository.RELATIONS,
+                                     always=("id", "fecha_creacion"))
+        query = Comentario.query.options(*options)
+        rows = CommentRepository._page_filter(query, post_id, cursor).limit(limit + 1).all()
+        return split_page(rows, limit, lambda c: (c.fecha_creacion, c.id))
+
+    @staticmethod
+    def get_page_version(post_id: int, limit: int, cursor: Optional[str] = None):
+        """
+        Versión de la página que devolvería get_page: ids de sus limit + 1 filas
+        (ocultar o borrar un comentario la cambia) y la fecha del más nuevo.
+        """
+        query = db.session.query(Comentario.id, Comentario.fecha_creacion)
+        rows = CommentRepository._page_filter(query, post_id, cursor).limit(limit + 1).all()
+        fechas = [r.fecha_creacion for r in rows if r.fecha_creacion]
+        return tuple(r.id for r in rows), max(fechas, default=None)
+
     @staticmethod
-    def get_by_post(post_id: int):
-        return Comentario.query.filter_by(post_id=post_id, is_visible=True).all()
+    def _page_filter(query, post_id: int, cursor: Optional[str]):
+        """Filtro y orden compartidos por get_page y get_page_version."""
+        query = query.filter(Comentario.post_id == post_id, Comentario.is_visible == True)
+        if cursor:
+            fecha, comment_id = decode_cursor(cursor, datetime, int)
+            query = query.filter(seek_after((Comentario.fecha_creacion, Comentario.id),
+                                            (fecha, comment_id), descending=False))
+        return query.order_by(Comentario.fecha_creacion.asc(), Comentario.id.asc())
 
     @staticmethod
     def get_by_id(comment_id: int):
@@ -17,19 +76,110 @@ class CommentRepository:
         nuevo = Comentario(
             contenido=data["contenido"],
             post_id=post_id,
-            usuario_id = get_jwt_identity()
+            usuario_id=current_principal().id
         )
         db.session.add(nuevo)
-        db.session.commit()
-        db.session.refresh(nuevo)
+        db.session.flush()
         return nuevo
 
+    @staticmethod
+    def create_many(rows):
+        """
+        Inserta varios comentarios en un solo flush (sin commit: confirma quien llama).
+        rows: dicts con post_id, usuario_id, contenido y opcionalmente fecha_creacion.
+        """
+        db.session.add_all([Comentario(**row) for row in rows])
+        db.session.flush()
+
     @staticmethod
     def delete(comment):
         db.session.delete(comment)
-        db.session.commit()
+        db.session.flush()
+
+    @staticmethod
+    def iter_all(after_id: int = 0, batch_size: int = 500):
+        """Itera todos los comentarios por id en lotes (yield_per, cursor del servidor)."""
+        stmt = (select(Comentario)
+                .options(*profile_options(CommentRepository.PROFILES, "list"))
+                .where(Comentario.id > after_id)
+                .order_by(Comentario.id)
+                .execution_options(yield_per=batch_size))
+        return db.session.execute(stmt).scalars()
 
     @staticmethod
     def get_all():
         """Devuelve todos los comentarios visibles."""
-        return Comentario.query.filter_by(is_visible=True).all()
\ No newline at end of file
+        return Comentario.query.filter_by(is_visible=True).all()
+
+    @staticmethod
+    def rebuild_comment_counts() -> None:
+        """Recalcula Post.comment_count a partir de los comentarios visibles."""
+        visibles = (select(func.count(Comentario.id))
+                    .where(Comentario.post_id == Post.id, Comentario.is_visible == True)
+                    .scalar_subquery())
+        db.session.execute(update(Post).values(comment_count=visibles))
+
+
+# ==================== Post.comment_count ====================
+
+def _apply_deltas(session, deltas) -> None:
+    """
+    Aplica los deltas por post (un UPDATE por post, no uno por comentario).
+    También sube Post.version: las versiones (ETag) de los posts cambian
+    cuando cambia el contador que muestran. Los posts ya cargados en la
+    sesión se expiran para que no muestren el contador anterior.
+    """
+    connection = session.connection()
+    table = Post.__table__
+    for post_id, delta in deltas.items():
+        connection.execute(
+            update(table).where(table.c.id == post_id)
+            .values(comment_count=table.c.comment_count + delta, **version_bump())
+        )
+        post = session.identity_map.get(inspect(Post).identity_key_from_primary_key((post_id,)))
+        if post is not None:
+            session.expire(post, ["comment_count", "version"])
+
+
+COMMENT_COUNTS = SessionDeltas("comment_count_deltas", _apply_deltas)
+_bump = COMMENT_COUNTS.bump
+
+
+def _comment_inserted(mapper, connection, target):
+    if target.is_visible:
+        _bump(target, target.post_id, 1)
+
+
+def _comment_deleted(mapper, connection, target):
+    if target.is_visible:
+        _bump(target, target.post_id, -1)
+
+
+def _comment_updated(mapper, connection, target):
+    state = inspect(target)
+    visible = state.attrs.is_visible.history
+    moved = state.attrs.post_id.history
+    if not visible.has_changes() and not moved.has_changes():
+        return
+    was_visible = bool(visible.deleted[0]) if visible.deleted else bool(target.is_visible)
+    old_post_id = moved.deleted[0] if moved.deleted else target.post_id
+    if was_visible:
+        _bump(target, old_post_id, -1)
+    if target.is_visible:
+        _bump(target, target.post_id, 1)
+
+
+_LISTENERS = (
+    (Comentario, "after_insert", _comment_inserted),
+    (Comentario, "after_delete", _comment_deleted),
+    (Comentario, "after_update", _comment_updated),
+)
+
+
+def register_comment_count_listeners() -> None:
+    """
+    Registra los eventos que mantienen Post.comment_count en la misma
+    transacción que cada alta, baja u ocultamiento de comentarios (incluidos
+    los lotes del ingestor, que pasan por el ORM).
+    """
+    COMMENT_COUNTS.register(_LISTENERS)
\ No newline at end of file
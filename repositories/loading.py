@@ -0,0 +1,37 @@
+from typing import Callable, Dict, FrozenSet, Iterable, Optional, Tuple
+
+from sqlalchemy.orm import load_only
+
+# Un perfil de carga es una función que devuelve las opciones de loader
+# (joinedload / selectinload) que necesita un caso de uso.
+# Son funciones y no tuplas porque los backrefs (Post.autor, Comentario.autor)
+# recién existen cuando SQLAlchemy configura los mappers.
+LoadProfiles = Dict[str, Callable[[], Tuple]]
+
+
+def profile_options(profiles: LoadProfiles, profile: Optional[str]) -> Tuple:
+    """Devuelve las opciones de un perfil, o () si profile es None."""
+    if profile is None:
+        return ()
+    try:
+        return profiles[profile]()
+    except KeyError:
+        raise ValueError(f"Perfil de carga desconocido: {profile}")
+
+
+def sparse_options(model, fields: FrozenSet[str], relations: LoadProfiles,
+                   always: Iterable[str] = ("id",)) -> Tuple:
+    """
+    Opciones para cargar solo lo que necesitan los campos pedidos (?fields=):
+    load_only de las columnas del modelo entre `fields` más las de `always`
+    (p. ej. las del cursor), y solo las relaciones de `relations` que esos
+    campos usan. Las columnas no pedidas (como un Text grande) no se leen.
+    - relations: {nombre de campo: función que devuelve sus opciones de carga}
+    """
+    columns = model.__mapper__.column_attrs
+    names = dict.fromkeys([*always, *(f for f in sorted(fields) if f in columns)])
+    options = [load_only(*(getattr(model, name) for name in names))]
+    for field in sorted(fields):
+        if field in relations:
+            options.extend(relations[field]())
+    return tuple(options)
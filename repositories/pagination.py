@@ -0,0 +1,90 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    """El cursor recibido no se puede decodificar."""
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Codifica los valores de la última fila de una página como un token opaco.
+    Los datetime se guardan en ISO 8601 para poder reconstruirlos.
+    """
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: type) -> Tuple[Any, ...]:
+    """
+    Decodifica un cursor generado por encode_cursor.
+    - types: tipo esperado de cada valor (datetime, int, str).
+    Lanza InvalidCursor si el token está mal formado.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(payload, list) or len(payload) != len(types):
+            raise ValueError("cantidad de valores incorrecta")
+        values = []
+        for value, expected in zip(payload, types):
+            if expected is datetime:
+                values.append(datetime.fromisoformat(value))
+            else:
+                values.append(expected(value))
+        return tuple(values)
+    except (ValueError, TypeError, UnicodeError) as exc:
+        raise InvalidCursor("Cursor inválido") from exc
+
+
+def parse_page_args(args) -> Tuple[int, Optional[str]]:
+    """
+    Lee `limit` y `cursor` de los query params (request.args).
+    Lanza ValueError si limit no es un entero positivo.
+    """
+    raw_limit = args.get("limit")
+    if raw_limit is None or raw_limit == "":
+        limit = DEFAULT_PAGE_SIZE
+    else:
+        try:
+            limit = int(raw_limit)
+        except ValueError:
+            raise ValueError("limit debe ser un entero")
+        if limit < 1:
+            raise ValueError("limit debe ser mayor a 0")
+    return min(limit, MAX_PAGE_SIZE), args.get("cursor") or None
+
+
+def seek_after(columns, values, descending: bool = True):
+    """
+    Predicado de keyset para (c1, c2, ...) > / < (v1, v2, ...).
+    Se expande a ORs de igualdades para que funcione en todos los motores.
+    La cota redundante sobre c1 permite que el motor recorra solo el rango
+    del índice compuesto a partir del cursor.
+    """
+    clauses = []
+    for i, (column, value) in enumerate(zip(columns, values)):
+        step = column < value if descending else column > value
+        prefix = [c == v for c, v in zip(columns[:i], values[:i])]
+        clauses.append(and_(*prefix, step) if prefix else step)
+    bound = columns[0] <= values[0] if descending else columns[0] >= values[0]
+    return and_(bound, or_(*clauses))
+
+
+def split_page(rows: List[Any], limit: int, key) -> Tuple[List[Any], Optional[str]]:
+    """
+    Recibe limit + 1 filas y devuelve (items, next_cursor).
+    - key: función que devuelve la tupla de orden de una fila.
+    """
+    if len(rows) > limit:
+        items = rows[:limit]
+        return items, encode_cursor(*key(items[-1]))
+    return rows, None
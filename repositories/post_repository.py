@@ -1,21 +1,49 @@
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import FrozenSet, List, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import joinedload, selectinload
 
 from app import db
-from models import Post, Categoria
+from models import Post, Categoria, post_categoria
+from repositories.loading import LoadProfiles, profile_options, sparse_options
+from repositories.pagination import decode_cursor, encode_cursor, seek_after, split_page
+from repositories.search_index import search_index
 
 
 class PostRepository:
     """Repository para operaciones CRUD sobre Post."""
 
+    # Relaciones que lee PostSchema: autor_username en la misma consulta y las
+    # categorías de toda la página en una consulta extra (no una por post)
+    PROFILES: LoadProfiles = {
+        "list": lambda: (joinedload(Post.autor), selectinload(Post.categorias)),
+        # Un solo post: las categorías vienen en el mismo SELECT (un JOIN más)
+        "detail": lambda: (joinedload(Post.autor), joinedload(Post.categorias)),
+    }
+    # Campos de PostSchema que salen de relaciones, para las cargas con ?fields=
+    RELATIONS: LoadProfiles = {
+        "autor_username": lambda: (joinedload(Post.autor),),
+        "categorias": lambda: (selectinload(Post.categorias),),
+    }
+
     @staticmethod
-    def get_all(published_only: bool = True, order_desc: bool = True) -> List[Post]:
+    def _options(profile: Optional[str], fields: Optional[FrozenSet[str]]) -> Tuple:
+        """Opciones del perfil, o solo las columnas/relaciones de `fields` si se pidieron."""
+        if fields is None:
+            return profile_options(PostRepository.PROFILES, profile)
+        # id y fecha_creacion siempre: las usa el cursor de los listados
+        return sparse_options(Post, fields, PostRepository.RELATIONS, always=("id", "fecha_creacion"))
+
+    @staticmethod
+    def get_all(published_only: bool = True, order_desc: bool = True, profile: Optional[str] = "list") -> List[Post]:
         """
         Devuelve todos los posts.
         - published_only: si True devuelve solo posts con is_published=True.
         - order_desc: si True ordena por fecha_creacion desc.
+        - profile: perfil de carga de relaciones (ver PROFILES).
         """
-        query = Post.query
+        query = Post.query.options(*profile_options(PostRepository.PROFILES, profile))
         if published_only:
             query = query.filter_by(is_published=True)
         if order_desc:
@@ -25,14 +53,112 @@ class PostRepository:
         return query.all()
 
     @staticmethod
-    def get_by_id(post_id: int) -> Optional[Post]:
+    def get_page(limit: int, cursor: Optional[str] = None, published_only: bool = True,
+                 profile: Optional[str] = "list", categoria_id: Optional[int] = None,
+                 fields: Optional[FrozenSet[str]] = None) -> Tuple[List[Post], Optional[str]]:
+        """
+        Devuelve una página de posts ordenada por (fecha_creacion, id) desc.
+        - cursor: token devuelto por la página anterior (None = primera página).
+        - categoria_id: solo posts de esa categoría (join con post_categoria).
+        - fields: campos de PostSchema pedidos; se cargan solo sus columnas y relaciones.
+        Usa un predicado de búsqueda (seek) en lugar de OFFSET, así cualquier
+        página cuesta lo mismo que la primera.
+        Retorna (posts, next_cursor); next_cursor es None en la última página.
+        """
+        query = Post.query.options(*PostRepository._options(profile, fields))
+        rows = PostRepository._page_filter(query, cursor, published_only, categoria_id).limit(limit + 1).all()
+        return split_page(rows, limit, lambda p: (p.fecha_creacion, p.id))
+
+    @staticmethod
+    def get_page_version(limit: int, cursor: Optional[str] = None, published_only: bool = True,
+                         categoria_id: Optional[int] = None) -> Tuple[tuple, Optional[datetime]]:
+        """
+        Versión de la página que devolvería get_page: (id, fecha_actualizacion,
+        version) de sus limit + 1 filas, leyendo solo esas columnas.
+        Retorna (seed, última modificación) para validar ETag / Last-Modified.
+        """
+        query = db.session.query(Post.id, Post.fecha_actualizacion, Post.version)
+        rows = PostRepository._page_filter(query, cursor, published_only, categoria_id).limit(limit + 1).all()
+        fechas = [r.fecha_actualizacion for r in rows if r.fecha_actualizacion]
+        return tuple((r.id, r.fecha_actualizacion, r.version) for r in rows), max(fechas, default=None)
+
+    @staticmethod
+    def _page_filter(query, cursor: Optional[str], published_only: bool, categoria_id: Optional[int] = None):
+        """Filtro y orden compartidos por get_page y get_page_version."""
+        if published_only:
+            query = query.filter_by(is_published=True)
+        if cursor:
+            fecha, post_id = decode_cursor(cursor, datetime, int)
+            query = query.filter(seek_after((Post.fecha_creacion, Post.id), (fecha, post_id)))
+        if categoria_id is not None:
+            # ix_post_categoria_categoria (categoria_id, post_id) resuelve el join
+            query = (query.join(post_categoria, post_categoria.c.post_id == Post.id)
+                     .filter(post_categoria.c.categoria_id == categoria_id))
+        return query.order_by(Post.fecha_creacion.desc(), Post.id.desc())
+
+    @staticmethod
+    def search(query: str, limit: int, cursor: Optional[str] = None, profile: Optional[str] = "list",
+               fields: Optional[FrozenSet[str]] = None) -> Tuple[List[Post], Optional[str]]:
+        """
+        Búsqueda de texto completo sobre titulo y contenido de posts publicados.
+        Los resultados vienen ordenados por relevancia; el cursor guarda la
+        posición dentro del ranking.
+        Retorna (posts, next_cursor).
+        """
+        offset = decode_cursor(cursor, int)[0] if cursor else 0
+        hits = search_index().search(query, limit + 1, offset)
+        page = hits[:limit]
+        ids = [post_id for post_id, _ in page]
+        found = {}
+        if ids:
+            rows = (Post.query.options(*PostRepository._options(profile, fields))
+                    .filter(Post.id.in_(ids))
+                    .all())
+            found = {p.id: p for p in rows}
+        posts = [found[post_id] for post_id in ids if post_id in found]
+        next_cursor = encode_cursor(offset + limit) if len(hits) > limit else None
+        return posts, next_cursor
+
+    @staticmethod
+    def iter_all(after_id: int = 0, batch_size: int = 500):
+        """
+        Itera todos los posts por id sin cargarlos todos en memoria:
+        yield_per trae lotes de batch_size filas con un cursor del lado
+        del servidor (stream_results).
+        - after_id: retoma una exportación a partir de ese id.
+        """
+        stmt = (select(Post)
+                .options(*profile_options(PostRepository.PROFILES, "list"))
+                .where(Post.id > after_id)
+                .order_by(Post.id)
+                .execution_options(yield_per=batch_size))
+        return db.session.execute(stmt).scalars()
+
+    @staticmethod
+    def get_by_id(post_id: int, profile: Optional[str] = None,
+                  fields: Optional[FrozenSet[str]] = None) -> Optional[Post]:
         """Devuelve un Post por su id o None si no existe."""
-        return Post.query.get(post_id)
+        return db.session.get(Post, post_id, options=PostRepository._options(profile, fields))
+
+    @staticmethod
+    def get_version(post_id: int) -> Optional[Tuple[tuple, Optional[datetime]]]:
+        """
+        Versión de un post sin cargar su contenido: (seed, última modificación)
+        o None si no existe.
+        """
+        row = db.session.execute(
+            select(Post.fecha_creacion, Post.fecha_actualizacion, Post.version).where(Post.id == post_id)
+        ).first()
+        if row is None:
+            return None
+        seed = (row.fecha_creacion, row.fecha_actualizacion, row.version)
+        return seed, row.fecha_actualizacion or row.fecha_creacion
 
     @staticmethod
-    def get_by_user(user_id: int, published_only: bool = False) -> List[Post]:
+    def get_by_user(user_id: int, published_only: bool = False, profile: Optional[str] = "list") -> List[Post]:
         """Devuelve posts escritos por un usuario."""
-        query = Post.query.filter_by(usuario_id=user_id)
+        query = (Post.query.options(*profile_options(PostRepository.PROFILES, profile))
+                 .filter_by(usuario_id=user_id))
         if published_only:
             query = query.filter_by(is_published=True)
         return query.order_by(Post.fecha_creacion.desc()).all()
@@ -67,11 +193,45 @@ class PostRepository:
                 nuevo_post.categorias.append(c)
 
         db.session.add(nuevo_post)
-        db.session.commit()
-        # refrescar por si hay defaults/autogenerados
-        db.session.refresh(nuevo_post)
+        db.session.flush()  # obtener el id para el índice de búsqueda
+        search_index().index_post(nuevo_post)
         return nuevo_post
 
+    @staticmethod
+    def create_many(items: List[dict]) -> List[int]:
+        """
+        Crea muchos posts en una sola transacción.
+        items: dicts con las mismas claves que create(); los categoria_ids
+        ya deben estar validados.
+        - Los posts se insertan en un único flush: en motores con RETURNING
+          ordenado (PostgreSQL, MariaDB) es un INSERT multi-fila por lote.
+        - Las filas de post_categoria se insertan con un executemany.
+        - Sin commit ni refresh: confirma quien llama.
+        Retorna los ids creados, en el mismo orden que items.
+        """
+        posts = [
+            Post(
+                titulo=item["titulo"],
+                contenido=item["contenido"],
+                usuario_id=item["usuario_id"],
+                is_published=item.get("is_published", True)
+            )
+            for item in items
+        ]
+        db.session.add_all(posts)
+        db.session.flush()
+
+        links = [
+            {"post_id": post.id, "categoria_id": cat_id}
+            for post, item in zip(posts, items)
+            for cat_id in dict.fromkeys(item.get("categoria_ids") or [])
+        ]
+        if links:
+            db.session.execute(post_categoria.insert(), links)
+
+        search_index().index_posts(posts)
+        return [post.id for post in posts]
+
     @staticmethod
     def update(post: Post, data: dict) -> Post:
         """
@@ -87,7 +247,9 @@ class PostRepository:
         if "is_published" in data:
             post.is_published = data["is_published"]
 
-        # Manejo de categorías: si viene categoria_ids, reemplazamos las relaciones
+        # Manejo de categorías: si viene categoria_ids, reemplazamos las relaciones.
+        # Solo cambia post_categoria: se sube version para que cambie la versión
+        # (ETag) del post, que serializa sus categorías
         if "categoria_ids" in data:
             cat_ids = data.get("categoria_ids") or []
             if cat_ids:
@@ -97,15 +259,21 @@ class PostRepository:
                 # si lista vacía => limpiar categorías
                 post.categorias = []
 
-        db.session.commit()
-        db.session.refresh(post)
+        db.session.flush()
+        if "categoria_ids" in data:
+            db.session.execute(
+                update(Post).where(Post.id == post.id).values(**version_bump())
+                .execution_options(synchronize_session="fetch")
+            )
+        search_index().index_post(post)
         return post
 
     @staticmethod
     def delete(post: Post) -> None:
         """Elimina un post (borrado físico)."""
+        search_index().remove_post(post.id)
         db.session.delete(post)
-        db.session.commit()
+        db.session.flush()
 
     @staticmethod
     def count_all(published_only: bool = True) -> int:
@@ -119,4 +287,13 @@ class PostRepository:
     def get_posts_last_week() -> List[Post]:
         """Devuelve posts creados en la última semana."""
         since = datetime.utcnow() - timedelta(days=7)
-        return Post.query.filter(Post.fecha_creacion >= since).order_by(Post.fecha_creacion.desc()).all()
\ No newline at end of file
+        return Post.query.filter(Post.fecha_creacion >= since).order_by(Post.fecha_creacion.desc()).all()
+
+
+def version_bump() -> dict:
+    """
+    Valores de un UPDATE que sube Post.version sin tocar fecha_actualizacion
+    (nombrarla evita su onupdate): cambia el ETag sin que el post figure editado.
+    """
+    table = Post.__table__
+    return {"version": table.c.version + 1, "fecha_actualizacion": table.c.fecha_actualizacion}
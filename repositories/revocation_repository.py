@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from app import db
+from models import Revocacion
+
+
+class RevocationRepository:
+    """Acceso a datos para la tabla de revocaciones compartida entre workers"""
+
+    @staticmethod
+    def add(tipo: str, valor: str, expira: datetime) -> Revocacion:
+        """Registra una revocación en la sesión actual; el commit lo hace quien llama."""
+        revocacion = Revocacion(tipo=tipo, valor=valor, revocado_en=datetime.utcnow(), expira=expira)
+        db.session.add(revocacion)
+        return revocacion
+
+    @staticmethod
+    def get_since(since: datetime):
+        """Revocaciones vigentes registradas desde `since` (o todas si es None)."""
+        query = db.session.query(
+            Revocacion.tipo, Revocacion.valor, Revocacion.revocado_en, Revocacion.expira
+        ).filter(Revocacion.expira > datetime.utcnow())
+        if since is not None:
+            query = query.filter(Revocacion.revocado_en >= since)
+        return query.all()
+
+    @staticmethod
+    def purge_expired() -> None:
+        """Borra las revocaciones vencidas (sin commit)."""
+        db.session.query(Revocacion).filter(Revocacion.expira <= datetime.utcnow()).delete(
+            synchronize_session=False)
@@ -0,0 +1,157 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Sequence
+
+from flask import current_app, g, has_app_context, has_request_context, request
+from flask_sqlalchemy.session import Session
+
+# Métodos HTTP cuyas consultas pueden ir a una réplica
+READ_METHODS = frozenset(("GET", "HEAD", "OPTIONS"))
+# Usuarios recordados para read-your-writes antes de descartar los vencidos
+MAX_PINNED_USERS = 10000
+
+
+class ReplicaRouter:
+    """
+    Decide a qué engine va cada consulta cuando hay réplicas de lectura
+    (app.extensions['db_router']).
+
+    Van a una réplica solo las lecturas hechas durante pedidos GET/HEAD/OPTIONS.
+    Se quedan en el primario:
+    - escrituras (flush y sentencias INSERT/UPDATE/DELETE) y todo lo que venga
+      después de una escritura en el mismo pedido
+    - pedidos de un usuario que escribió hace menos de pin_seconds
+      (read-your-writes; se recuerda por proceso)
+    - bloques marcados con `primary()`, y todo lo que corra fuera de un pedido
+      (CLI, hilos de fondo)
+    Cada pedido elige una réplica al azar y la usa para todas sus lecturas.
+    """
+
+    def __init__(self, replicas: Sequence[str], pin_seconds: float = 5.0):
+        self.replicas = tuple(replicas)
+        self.pin_seconds = pin_seconds
+        self._lock = threading.Lock()
+        self._last_write = {}  # usuario_id -> time.monotonic() de su última escritura
+        self.counters = {"replica": 0, "primary": 0, "pinned": 0}
+
+    def replica_key(self) -> Optional[str]:
+        """Bind de réplica para la consulta actual, o None si va al primario."""
+        if not has_request_context() or request.method not in READ_METHODS:
+            return None
+        if g.get("_db_pinned") or g.get("_db_force_primary") or self._recently_wrote():
+            with self._lock:
+                self.counters["pinned"] += 1
+            return None
+        key = g.get("_db_replica")
+        if key is None:
+            key = g._db_replica = random.choice(self.replicas)
+        with self._lock:
+            self.counters["replica"] += 1
+        return key
+
+    def note_write(self) -> None:
+        """Fija el pedido actual (y al usuario, por pin_seconds) al primario."""
+        if not has_request_context():
+            return
+        g._db_pinned = True
+        principal = g.get("principal")
+        if principal is not None:
+            now = time.monotonic()
+            with self._lock:
+                if len(self._last_write) >= MAX_PINNED_USERS:
+                    self._last_write = {user_id: written for user_id, written in self._last_write.items()
+                                        if now - written < self.pin_seconds}
+                self._last_write[principal.id] = now
+
+    def count_primary(self) -> None:
+        with self._lock:
+            self.counters["primary"] += 1
+
+    def metrics(self) -> dict:
+        with self._lock:
+            data = dict(self.counters)
+            data["pinned_users"] = len(self._last_write)
+        return data
+
+    def _recently_wrote(self) -> bool:
+        principal = g.get("principal")
+        if principal is None:
+            if not self._last_write or "Authorization" not in request.headers:
+                return False
+            # Endpoint público con token: se identifica al usuario solo si alguien
+            # escribió hace poco (cuesta verificar el token)
+            from decorators.auth_decorators import current_principal
+            try:
+                principal = current_principal()
+            except Exception:
+                return False
+        with self._lock:
+            written = self._last_write.get(principal.id)
+            if written is None:
+                return False
+            if time.monotonic() - written < self.pin_seconds:
+                return True
+            del self._last_write[principal.id]
+        return False
+
+
+class RoutingSession(Session):
+    """
+    Sesión de Flask-SQLAlchemy que manda las lecturas a réplicas según el
+    ReplicaRouter de la app. Sin router (SQLALCHEMY_READ_REPLICAS vacío) se
+    comporta igual que la sesión por defecto.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is not None or not has_app_context():
+            return engine
+        router = current_app.extensions.get("db_router")
+        if router is None or engine is not self._db.engine:
+            # Sin réplicas, o tablas de otro bind: no se enruta
+            return engine
+        if self._flushing or (clause is not None and getattr(clause, "is_dml", False)):
+            router.note_write()
+        else:
+            key = router.replica_key()
+            if key is not None:
+                return self._db.engines[key]
+        router.count_primary()
+        return engine
+
+
+@contextmanager
+def primary():
+    """
+    Fuerza el primario para las lecturas del bloque, para las que no toleran
+    el retraso de las réplicas.
+    """
+    if not has_request_context():
+        yield
+        return
+    previous = g.get("_db_force_primary", False)
+    g._db_force_primary = True
+    try:
+        yield
+    finally:
+        g._db_force_primary = previous
+
+
+def init_read_replicas(app, db) -> Optional[ReplicaRouter]:
+    """
+    Activa el ruteo a réplicas si SQLALCHEMY_READ_REPLICAS nombra binds de
+    SQLALCHEMY_BINDS (app.extensions['db_router']).
+    """
+    replicas = tuple(app.config['SQLALCHEMY_READ_REPLICAS'])
+    if not replicas:
+        return None
+    missing = [key for key in replicas if key not in app.config['SQLALCHEMY_BINDS']]
+    if missing:
+        raise RuntimeError(f"SQLALCHEMY_READ_REPLICAS nombra binds inexistentes: {missing}")
+    if not issubclass(db.session.session_factory.class_, RoutingSession):
+        raise RuntimeError("El ruteo a réplicas requiere db con session_options={'class_': RoutingSession}")
+    router = ReplicaRouter(replicas, pin_seconds=app.config['REPLICA_PIN_SECONDS'])
+    app.extensions['db_router'] = router
+    return router
@@ -0,0 +1,367 @@
+import math
+from abc import ABC, abstractmethod
+import re
+import threading
+import time
+import unicodedata
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Tuple
+
+from flask import current_app
+from sqlalchemy import delete, select, text
+
+from app import db
+from models import Post, PostCambio
+from repositories.routing import primary
+from repositories.unit_of_work import on_commit
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+# El título pesa más que el contenido al rankear
+TITLE_WEIGHT = 2.0
+# Margen al releer post_cambio: cubre transacciones que confirman después de
+# una lectura aunque su cambiado_en sea anterior
+SYNC_OVERLAP = timedelta(seconds=30)
+# Antigüedad con la que se borran las filas de post_cambio; un worker que no
+# sincronizó en ese lapso reconstruye su índice completo
+CHANGE_RETENTION = timedelta(hours=1)
+
+
+def tokenize(value: str) -> List[str]:
+    """Minúsculas, sin tildes, separado en palabras."""
+    normalized = unicodedata.normalize("NFKD", value or "")
+    plain = "".join(ch for ch in normalized if not unicodedata.combining(ch))
+    return TOKEN_RE.findall(plain.lower())
+
+
+class SearchIndex(ABC):
+    """
+    Índice invertido sobre Post.titulo y Post.contenido.
+    PostRepository lo mantiene actualizado en create/update/delete.
+    """
+
+    @abstractmethod
+    def index_post(self, post: Post) -> None:
+        ...
+
+    def index_posts(self, posts: Iterable[Post]) -> None:
+        for post in posts:
+            self.index_post(post)
+
+    @abstractmethod
+    def remove_post(self, post_id: int) -> None:
+        ...
+
+    @abstractmethod
+    def search(self, query: str, limit: int, offset: int = 0) -> List[Tuple[int, float]]:
+        """Devuelve [(post_id, score)] de posts publicados, mejor score primero."""
+
+    @abstractmethod
+    def rebuild(self) -> None:
+        ...
+
+
+FTS_EXISTS = text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'post_fts'")
+FTS_CREATE = text(
+    "CREATE VIRTUAL TABLE post_fts USING fts5("
+    "titulo, contenido, tokenize = 'unicode61 remove_diacritics 2')"
+)
+FTS_POPULATE = text("INSERT INTO post_fts (rowid, titulo, contenido) SELECT id, titulo, contenido FROM post")
+
+
+class SqliteFtsIndex(SearchIndex):
+    """
+    Índice nativo con una tabla virtual FTS5 (post_fts, rowid = post.id).
+    Las escrituras van por db.session, así que quedan en la misma transacción
+    que el cambio del post. El ranking usa bm25().
+    La tabla la crea la migración; si la base se creó con create_all, se crea
+    y se llena la primera vez que se usa.
+    """
+
+    def __init__(self):
+        self._ready = False
+
+    def _mark_ready(self) -> None:
+        self._ready = True
+
+    def _ensure_table(self) -> None:
+        """
+        Para escrituras: si falta, la tabla se crea dentro de la transacción
+        del cambio del post y se marca lista recién con el commit (si hay
+        rollback, se vuelve a intentar en el próximo uso).
+        """
+        if self._ready:
+            return
+        if not db.session.execute(FTS_EXISTS).first():
+            db.session.execute(FTS_CREATE)
+            db.session.execute(FTS_POPULATE)
+        on_commit(self._mark_ready)
+
+    def _ensure_table_committed(self) -> None:
+        """
+        Para lecturas (los GET no hacen commit): si falta, la tabla se crea y
+        se llena en una transacción propia sobre el primario, confirmada
+        antes de marcarla lista.
+        """
+        if self._ready:
+            return
+        with db.engine.begin() as connection:
+            if not connection.execute(FTS_EXISTS).first():
+                connection.execute(FTS_CREATE)
+                connection.execute(FTS_POPULATE)
+        self._ready = True
+
+    def index_post(self, post: Post) -> None:
+        self.index_posts([post])
+
+    def index_posts(self, posts: Iterable[Post]) -> None:
+        self._ensure_table()
+        rows = [{"id": p.id, "titulo": p.titulo, "contenido": p.contenido} for p in posts]
+        if not rows:
+            return
+        db.session.execute(text("DELETE FROM post_fts WHERE rowid = :id"), rows)
+        db.session.execute(text(
+            "INSERT INTO post_fts (rowid, titulo, contenido) VALUES (:id, :titulo, :contenido)"
+        ), rows)
+
+    def remove_post(self, post_id: int) -> None:
+        self._ensure_table()
+        db.session.execute(text("DELETE FROM post_fts WHERE rowid = :id"), {"id": post_id})
+
+    def search(self, query: str, limit: int, offset: int = 0) -> List[Tuple[int, float]]:
+        terms = tokenize(query)
+        if not terms:
+            return []
+        self._ensure_table_committed()
+        # Cada término entre comillas: la entrada del usuario nunca se interpreta
+        # como sintaxis de FTS5 (los términos se combinan con AND)
+        match = " ".join(f'"{t}"' for t in terms)
+        rows = db.session.execute(text(
+            "SELECT post_fts.rowid, bm25(post_fts, :tw, 1.0) AS rank "
+            "FROM post_fts JOIN post ON post.id = post_fts.rowid "
+            "WHERE post_fts MATCH :match AND post.is_published = 1 "
+            "ORDER BY rank LIMIT :limit OFFSET :offset"
+        ), {"tw": TITLE_WEIGHT, "match": match, "limit": limit, "offset": offset}).all()
+        # bm25() devuelve valores negativos: más chico es mejor
+        return [(row[0], -row[1]) for row in rows]
+
+    def rebuild(self) -> None:
+        """Vuelve a llenar post_fts en la sesión actual; el commit lo hace quien llama."""
+        if db.session.execute(FTS_EXISTS).first():
+            db.session.execute(text("DELETE FROM post_fts"))
+        else:
+            db.session.execute(FTS_CREATE)
+        db.session.execute(FTS_POPULATE)
+        on_commit(self._mark_ready)
+
+
+class InMemoryIndex(SearchIndex):
+    """
+    Índice invertido en memoria del proceso (término -> {post_id: frecuencia})
+    con ranking BM25. Se construye desde la base la primera vez que se busca.
+    Los cambios de los posts se aplican recién cuando se confirma su
+    transacción (on_commit): un alta o baja que termina en rollback no deja
+    el índice distinto de la base.
+
+    Sincronización entre workers: cada alta, cambio o baja agrega una fila a
+    post_cambio en la misma transacción; cada sync_seconds la primera búsqueda
+    del worker relee las filas nuevas y recarga esos posts (como la tabla
+    revocacion en services/revocation.py).
+    La búsqueda intersecta las listas de posting empezando por la más corta,
+    así que el costo depende de los posts que matchean y no del corpus.
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, sync_seconds: float = 5.0):
+        self.sync_seconds = sync_seconds
+        self._lock = threading.RLock()
+        self._next_sync = 0.0
+        self._next_purge = 0.0
+        self._reset()
+
+    def _reset(self) -> None:
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self._terms: Dict[int, Dict[str, float]] = {}
+        self._lengths: Dict[int, float] = {}
+        self._published: Dict[int, bool] = {}
+        self._total_length = 0.0
+        self._loaded = False
+        self._last_sync = None
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            started = datetime.utcnow()
+            # Una réplica atrasada dejaría afuera los últimos cambios: se lee del primario
+            with primary():
+                rows = db.session.execute(
+                    select(Post.id, Post.titulo, Post.contenido, Post.is_published)
+                    .execution_options(yield_per=1000)
+                )
+                for row in rows:
+                    self._add(row.id, row.titulo, row.contenido, row.is_published)
+            self._last_sync = started
+            self._next_sync = time.monotonic() + self.sync_seconds
+            self._loaded = True
+
+    def sync(self) -> None:
+        """Recarga los posts que cambiaron en otros workers desde la última sincronización."""
+        with self._lock:
+            if not self._loaded or time.monotonic() < self._next_sync:
+                return
+            self._next_sync = time.monotonic() + self.sync_seconds
+            started = datetime.utcnow()
+            if started - self._last_sync > CHANGE_RETENTION - SYNC_OVERLAP:
+                # Las filas de ese lapso pueden estar borradas: se reconstruye
+                self._reset()
+                self._ensure_loaded()
+                return
+            try:
+                with primary():
+                    post_ids = db.session.execute(
+                        select(PostCambio.post_id).distinct()
+                        .where(PostCambio.cambiado_en >= self._last_sync - SYNC_OVERLAP)
+                    ).scalars().all()
+                    rows = db.session.execute(
+                        select(Post.id, Post.titulo, Post.contenido, Post.is_published)
+                        .where(Post.id.in_(post_ids))
+                    ).all() if post_ids else []
+            except Exception:
+                # Sin base se sigue con lo que ya se conoce; se reintenta en el próximo ciclo
+                current_app.logger.exception("No se pudo sincronizar el índice de búsqueda")
+                return
+            found = set()
+            for row in rows:
+                self._add(row.id, row.titulo, row.contenido, row.is_published)
+                found.add(row.id)
+            for post_id in set(post_ids) - found:
+                self._remove(post_id)
+            self._last_sync = started
+
+    def _log_changes(self, post_ids: Iterable[int]) -> None:
+        """Registra los cambios para los demás workers (en la transacción actual)."""
+        db.session.add_all([PostCambio(post_id=post_id) for post_id in post_ids])
+        if time.monotonic() >= self._next_purge:
+            self._next_purge = time.monotonic() + CHANGE_RETENTION.total_seconds() / 4
+            db.session.execute(delete(PostCambio).where(
+                PostCambio.cambiado_en < datetime.utcnow() - CHANGE_RETENTION))
+
+    def _add(self, post_id: int, titulo: str, contenido: str, is_published: bool) -> None:
+        self._remove(post_id)
+        terms: Dict[str, float] = defaultdict(float)
+        for token in tokenize(titulo):
+            terms[token] += TITLE_WEIGHT
+        for token in tokenize(contenido):
+            terms[token] += 1.0
+        length = sum(terms.values())
+        for token, freq in terms.items():
+            self._postings[token][post_id] = freq
+        self._terms[post_id] = terms
+        self._lengths[post_id] = length
+        self._published[post_id] = bool(is_published)
+        self._total_length += length
+
+    def _remove(self, post_id: int) -> None:
+        terms = self._terms.pop(post_id, None)
+        if terms is None:
+            return
+        for token in terms:
+            posting = self._postings.get(token)
+            if posting is not None:
+                posting.pop(post_id, None)
+                if not posting:
+                    del self._postings[token]
+        self._total_length -= self._lengths.pop(post_id, 0.0)
+        self._published.pop(post_id, None)
+
+    def index_post(self, post: Post) -> None:
+        self.index_posts([post])
+
+    def index_posts(self, posts: Iterable[Post]) -> None:
+        # Se copian los valores ahora: después del commit las instancias están expiradas
+        rows = [(p.id, p.titulo, p.contenido, True if p.is_published is None else p.is_published)
+                for p in posts]
+        if not rows:
+            return
+        self._log_changes(row[0] for row in rows)
+        on_commit(lambda: self._apply(rows, ()))
+
+    def remove_post(self, post_id: int) -> None:
+        self._log_changes((post_id,))
+        on_commit(lambda: self._apply((), (post_id,)))
+
+    def _apply(self, rows, removed_ids) -> None:
+        # Si todavía no se cargó, la carga inicial leerá los posts desde la base
+        if not self._loaded:
+            return
+        with self._lock:
+            for row in rows:
+                self._add(*row)
+            for post_id in removed_ids:
+                self._remove(post_id)
+
+    def search(self, query: str, limit: int, offset: int = 0) -> List[Tuple[int, float]]:
+        terms = tokenize(query)
+        if not terms:
+            return []
+        self._ensure_loaded()
+        self.sync()
+        with self._lock:
+            total_docs = len(self._lengths)
+            if not total_docs:
+                return []
+            avg_length = self._total_length / total_docs
+
+            postings = sorted((self._postings.get(t, {}) for t in set(terms)), key=len)
+            candidates = [pid for pid in postings[0] if self._published.get(pid)]
+            for posting in postings[1:]:
+                candidates = [pid for pid in candidates if pid in posting]
+
+            scored = []
+            for post_id in candidates:
+                score = 0.0
+                norm = self.K1 * (1 - self.B + self.B * self._lengths[post_id] / avg_length)
+                for posting in postings:
+                    freq = posting[post_id]
+                    idf = math.log(1 + (total_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+                    score += idf * freq * (self.K1 + 1) / (freq + norm)
+                scored.append((post_id, score))
+        scored.sort(key=lambda item: (-item[1], -item[0]))
+        return scored[offset:offset + limit]
+
+    def rebuild(self) -> None:
+        with self._lock:
+            self._reset()
+        self._ensure_loaded()
+
+
+def init_search_index(app) -> SearchIndex:
+    """
+    Elige el backend de búsqueda según SEARCH_BACKEND:
+    - 'fts5': tabla virtual FTS5 (solo SQLite)
+    - 'memory': índice invertido en memoria del proceso
+    - 'auto' (default): FTS5 si la base es SQLite, memoria en otro caso
+    Lanza ValueError con cualquier otro valor.
+    """
+    backend = app.config['SEARCH_BACKEND']
+    if backend == 'auto':
+        uri = app.config['SQLALCHEMY_DATABASE_URI']
+        backend = 'fts5' if uri.startswith('sqlite') else 'memory'
+    if backend == 'fts5':
+        index = SqliteFtsIndex()
+    elif backend == 'memory':
+        index = InMemoryIndex(app.config['SEARCH_SYNC_SECONDS'])
+    else:
+        raise ValueError(f"SEARCH_BACKEND desconocido: {backend!r}")
+    app.extensions['search_index'] = index
+    return index
+
+
+def search_index() -> SearchIndex:
+    """Índice de búsqueda de la app actual."""
+    return current_app.extensions['search_index']
@@ -0,0 +1,45 @@
+from typing import Callable, Dict, Hashable, Iterable, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+Deltas = Dict[Hashable, int]
+# (modelo, evento de mapper, función) que acumulan deltas con SessionDeltas.bump
+Listeners = Iterable[Tuple[type, str, Callable]]
+
+
+class SessionDeltas:
+    """
+    Contadores mantenidos por eventos de mapper: cada fila que cambia acumula
+    un delta en la sesión (session.info[key]) y al final del flush se aplican
+    todos juntos con apply(session, deltas), dentro de la misma transacción
+    (una sentencia por contador, no una por fila).
+    Los deltas de un flush que falla se descartan con el rollback, así que no
+    se suman al siguiente flush de la sesión.
+    """
+
+    def __init__(self, key: str, apply: Callable[[Session, Deltas], None]):
+        self.key = key
+        self.apply = apply
+
+    def bump(self, target, name: Hashable, delta: int) -> None:
+        """Acumula delta para name en la sesión de target (la fila que cambió)."""
+        deltas = object_session(target).info.setdefault(self.key, {})
+        deltas[name] = deltas.get(name, 0) + delta
+
+    def _apply_deltas(self, session, flush_context) -> None:
+        deltas = session.info.pop(self.key, None)
+        if deltas and any(deltas.values()):
+            self.apply(session, {name: delta for name, delta in deltas.items() if delta})
+
+    def _discard_deltas(self, session, previous_transaction) -> None:
+        session.info.pop(self.key, None)
+
+    def register(self, listeners: Listeners) -> None:
+        """Registra los eventos de mapper y los de la sesión, una sola vez por proceso."""
+        for model, name, fn in listeners:
+            if not event.contains(model, name, fn):
+                event.listen(model, name, fn)
+        if not event.contains(Session, "after_flush", self._apply_deltas):
+            event.listen(Session, "after_flush", self._apply_deltas)
+            event.listen(Session, "after_soft_rollback", self._discard_deltas)
@@ -0,0 +1,263 @@
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from flask import current_app, has_app_context
+from sqlalchemy import delete, func, insert, inspect, or_, select, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+from app import db
+from models import Post, Comentario, Categoria, Contador
+from repositories.session_deltas import SessionDeltas
+
+# Nombres de los contadores globales
+POSTS_PUBLICADOS = "posts_publicados"
+COMENTARIOS_VISIBLES = "comentarios_visibles"
+CATEGORIAS = "categorias"
+# Los posts por fecha se cuentan en buckets horarios: "posts_hora:AAAAMMDDHH"
+POSTS_HORA = "posts_hora:"
+# Cada cuántos segundos (por app) se borran los buckets vencidos
+PRUNE_INTERVAL = 3600
+
+
+def _bucket(fecha: datetime) -> str:
+    return f"{POSTS_HORA}{fecha:%Y%m%d%H}"
+
+
+class StatsRepository:
+    """Consultas de estadísticas: agregados SQL o contadores precalculados."""
+
+    @staticmethod
+    def get_aggregates(days: int = 7) -> dict:
+        """
+        Calcula todas las estadísticas con COUNT(*) en una sola consulta
+        (subconsultas escalares), sin cargar filas como objetos ORM.
+        """
+        since = datetime.utcnow() - timedelta(days=days)
+        stmt = select(
+            select(func.count(Post.id)).where(Post.is_published == True).scalar_subquery(),
+            select(func.count(Comentario.id)).where(Comentario.is_visible == True).scalar_subquery(),
+            select(func.count(Categoria.id)).scalar_subquery(),
+            select(func.count(Post.id)).where(Post.fecha_creacion >= since).scalar_subquery(),
+        )
+        total_posts, total_comments, total_categories, posts_last_week = db.session.execute(stmt).one()
+        return {
+            "total_posts": total_posts,
+            "total_comments": total_comments,
+            "total_categories": total_categories,
+            "posts_last_week": posts_last_week
+        }
+
+    @staticmethod
+    def get_from_counters(days: int = 7) -> dict:
+        """
+        Lee las estadísticas desde la tabla contador: 3 contadores globales
+        más a lo sumo 24 * days + 1 buckets horarios, sin importar el volumen de datos.
+        La ventana de posts_last_week tiene resolución de una hora.
+        """
+        since = _bucket(datetime.utcnow() - timedelta(days=days))
+        rows = db.session.execute(
+            select(Contador.nombre, Contador.valor).where(or_(
+                Contador.nombre.in_([POSTS_PUBLICADOS, COMENTARIOS_VISIBLES, CATEGORIAS]),
+                Contador.nombre.between(since, POSTS_HORA + "~")
+            ))
+        ).all()
+        valores = {nombre: valor for nombre, valor in rows}
+        return {
+            "total_posts": valores.get(POSTS_PUBLICADOS, 0),
+            "total_comments": valores.get(COMENTARIOS_VISIBLES, 0),
+            "total_categories": valores.get(CATEGORIAS, 0),
+            "posts_last_week": sum(v for k, v in valores.items() if k.startswith(POSTS_HORA))
+        }
+
+    @staticmethod
+    def rebuild_counters(bucket_days: int = 8) -> None:
+        """
+        Recalcula la tabla contador desde cero a partir de los datos reales
+        (buckets horarios de los últimos bucket_days días).
+        Hay que ejecutarlo una vez al activar STATS_USE_COUNTERS (flask rebuild-stats).
+        """
+        aggregates = StatsRepository.get_aggregates()
+        hourly = db.session.execute(
+            select(Post.fecha_creacion).where(
+                Post.fecha_creacion >= datetime.utcnow() - timedelta(days=bucket_days)
+            )
+        ).scalars()
+        buckets = {}
+        for fecha in hourly:
+            buckets[_bucket(fecha)] = buckets.get(_bucket(fecha), 0) + 1
+
+        db.session.query(Contador).delete()
+        db.session.add_all([
+            Contador(nombre=POSTS_PUBLICADOS, valor=aggregates["total_posts"]),
+            Contador(nombre=COMENTARIOS_VISIBLES, valor=aggregates["total_comments"]),
+            Contador(nombre=CATEGORIAS, valor=aggregates["total_categories"]),
+        ])
+        db.session.add_all([Contador(nombre=k, valor=v) for k, v in buckets.items()])
+        db.session.flush()
+
+
+# ==================== Mantenimiento incremental ====================
+
+class CounterMaintenance:
+    """
+    Estado por app de los contadores (app.extensions['stats_counters']).
+    Los eventos de SQLAlchemy son globales a los modelos; solo actualizan
+    contadores cuando la app del contexto actual tiene esta extensión.
+    """
+
+    def __init__(self, retention: timedelta):
+        self.retention = retention
+        self._next_prune = 0.0
+
+    def cutoff(self) -> datetime:
+        """Los buckets horarios anteriores a esta fecha se borran."""
+        return datetime.utcnow() - self.retention
+
+    def prune_due(self) -> bool:
+        now = time.monotonic()
+        if now < self._next_prune:
+            return False
+        self._next_prune = now + PRUNE_INTERVAL
+        return True
+
+
+def _maintenance() -> Optional[CounterMaintenance]:
+    return current_app.extensions.get("stats_counters") if has_app_context() else None
+
+
+def _bump(target, nombre: str, delta: int) -> None:
+    """Acumula delta para un contador (ver COUNTERS), si la app usa contadores."""
+    if _maintenance() is not None:
+        COUNTERS.bump(target, nombre, delta)
+
+
+def _bump_bucket(target, fecha: Optional[datetime], delta: int) -> None:
+    """Como _bump para el bucket horario de fecha; los buckets ya podados no se recrean."""
+    maintenance = _maintenance()
+    if maintenance is not None and fecha and fecha >= maintenance.cutoff():
+        _bump(target, _bucket(fecha), delta)
+
+
+def _upsert(connection, nombre: str, delta: int) -> None:
+    """
+    Suma delta al contador en una sola sentencia atómica (INSERT ... ON
+    CONFLICT / ON DUPLICATE KEY): dos transacciones que crean el mismo bucket
+    a la vez no chocan con la clave primaria.
+    """
+    table = Contador.__table__
+    dialect = connection.dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        stmt = (sqlite if dialect == "sqlite" else postgresql).insert(table).values(nombre=nombre, valor=delta)
+        stmt = stmt.on_conflict_do_update(index_elements=[table.c.nombre],
+                                          set_={"valor": table.c.valor + stmt.excluded.valor})
+    elif dialect in ("mysql", "mariadb"):
+        stmt = mysql.insert(table).values(nombre=nombre, valor=delta)
+        stmt = stmt.on_duplicate_key_update(valor=table.c.valor + stmt.inserted.valor)
+    else:
+        result = connection.execute(
+            update(table).where(table.c.nombre == nombre).values(valor=table.c.valor + delta)
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(nombre=nombre, valor=delta))
+        return
+    connection.execute(stmt)
+
+
+def _apply_deltas(session, deltas) -> None:
+    """Aplica los deltas acumulados (un UPSERT por contador, no uno por fila)."""
+    connection = session.connection()
+    for nombre, delta in deltas.items():
+        _upsert(connection, nombre, delta)
+
+    # Poda de buckets vencidos: a lo sumo una vez por PRUNE_INTERVAL, aprovechando
+    # una transacción que ya escribe buckets (un DELETE por rango de la clave)
+    maintenance = _maintenance()
+    if maintenance is not None and any(n.startswith(POSTS_HORA) for n in deltas) and maintenance.prune_due():
+        table = Contador.__table__
+        connection.execute(delete(table).where(
+            table.c.nombre >= POSTS_HORA, table.c.nombre < _bucket(maintenance.cutoff())
+        ))
+
+
+COUNTERS = SessionDeltas("contador_deltas", _apply_deltas)
+
+
+def _changed(target, attr: str):
+    """Devuelve (antes, después) si el atributo cambió en este flush, o None."""
+    history = inspect(target).attrs[attr].history
+    if not history.has_changes():
+        return None
+    before = history.deleted[0] if history.deleted else None
+    after = history.added[0] if history.added else None
+    return before, after
+
+
+def _post_inserted(mapper, connection, target):
+    if target.is_published:
+        _bump(target, POSTS_PUBLICADOS, 1)
+    _bump_bucket(target, target.fecha_creacion, 1)
+
+
+def _post_deleted(mapper, connection, target):
+    if target.is_published:
+        _bump(target, POSTS_PUBLICADOS, -1)
+    _bump_bucket(target, target.fecha_creacion, -1)
+
+
+def _post_updated(mapper, connection, target):
+    change = _changed(target, "is_published")
+    if change and bool(change[0]) != bool(change[1]):
+        _bump(target, POSTS_PUBLICADOS, 1 if change[1] else -1)
+
+
+def _comment_inserted(mapper, connection, target):
+    if target.is_visible:
+        _bump(target, COMENTARIOS_VISIBLES, 1)
+
+
+def _comment_deleted(mapper, connection, target):
+    if target.is_visible:
+        _bump(target, COMENTARIOS_VISIBLES, -1)
+
+
+def _comment_updated(mapper, connection, target):
+    change = _changed(target, "is_visible")
+    if change and bool(change[0]) != bool(change[1]):
+        _bump(target, COMENTARIOS_VISIBLES, 1 if change[1] else -1)
+
+
+def _category_inserted(mapper, connection, target):
+    _bump(target, CATEGORIAS, 1)
+
+
+def _category_deleted(mapper, connection, target):
+    _bump(target, CATEGORIAS, -1)
+
+
+_LISTENERS = (
+    (Post, "after_insert", _post_inserted),
+    (Post, "after_delete", _post_deleted),
+    (Post, "after_update", _post_updated),
+    (Comentario, "after_insert", _comment_inserted),
+    (Comentario, "after_delete", _comment_deleted),
+    (Comentario, "after_update", _comment_updated),
+    (Categoria, "after_insert", _category_inserted),
+    (Categoria, "after_delete", _category_deleted),
+)
+
+
+def init_stats_counters(app) -> CounterMaintenance:
+    """
+    Activa la tabla contador para la app (app.extensions['stats_counters'])
+    y registra, una sola vez por proceso, los eventos de SQLAlchemy que la
+    mantienen. Los contadores se actualizan en la misma transacción que el
+    cambio, así que nunca quedan desfasados respecto de un commit. Los buckets
+    horarios anteriores a STATS_BUCKET_RETENTION_DAYS se borran solos.
+    """
+    maintenance = app.extensions.get("stats_counters")
+    if maintenance is None:
+        maintenance = CounterMaintenance(timedelta(days=app.config['STATS_BUCKET_RETENTION_DAYS']))
+        app.extensions["stats_counters"] = maintenance
+    COUNTERS.register(_LISTENERS)
+    return maintenance
@@ -0,0 +1,72 @@
+from typing import Callable
+
+from flask import request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import db
+
+# Métodos HTTP cuya unidad de trabajo se confirma al final del pedido
+WRITE_METHODS = frozenset(("POST", "PUT", "PATCH", "DELETE"))
+
+
+def on_commit(callback: Callable[[], None]) -> None:
+    """
+    Ejecuta callback cuando se confirme la transacción actual de db.session
+    (p. ej. invalidar una caché). Si la transacción termina en rollback, no
+    se ejecuta.
+    """
+    db.session.info.setdefault("on_commit", []).append(callback)
+
+
+def on_rollback(callback: Callable[[], None]) -> None:
+    """
+    Ejecuta callback si la transacción actual de db.session termina sin
+    confirmarse (rollback o cierre de la sesión), p. ej. para liberar algo
+    reservado para el commit. Si se confirma, no se ejecuta.
+    """
+    session = db.session()
+    if not session.in_transaction():
+        # Un rollback sin transacción no emite eventos: se abre una (sin conexión
+        # todavía) para que su fin, sea cual sea, pase por _end_transaction
+        session.begin()
+    session.info.setdefault("on_rollback", []).append(callback)
+
+
+def _run_on_commit(session) -> None:
+    session.info.pop("on_rollback", None)
+    for callback in session.info.pop("on_commit", ()):
+        callback()
+
+
+def _end_transaction(session, transaction) -> None:
+    # Después de un commit ya no quedan callbacks: lo que queda es de una
+    # transacción externa que terminó en rollback o con la sesión cerrada
+    if transaction.parent is None:
+        session.info.pop("on_commit", None)
+        for callback in session.info.pop("on_rollback", ()):
+            callback()
+
+
+def init_unit_of_work(app) -> None:
+    """
+    Unidad de trabajo por pedido: los repositories solo hacen flush (los ids
+    vuelven en el mismo INSERT, con RETURNING donde el motor lo soporta) y
+    la transacción de un pedido de escritura se confirma una sola vez al
+    final, con commit si la respuesta es < 400 y rollback si no (incluidas
+    las excepciones, que Flask convierte en 500). Los pedidos de lectura no
+    hacen commit; la sesión se cierra en el teardown.
+    Fuera de un pedido (CLI, hilos de fondo) quien escribe hace su commit.
+    """
+    if not event.contains(Session, "after_commit", _run_on_commit):
+        event.listen(Session, "after_commit", _run_on_commit)
+        event.listen(Session, "after_transaction_end", _end_transaction)
+
+    @app.after_request
+    def commit_unit_of_work(response):
+        if request.method in WRITE_METHODS:
+            if response.status_code < 400:
+                db.session.commit()
+            else:
+                db.session.rollback()
+        return response
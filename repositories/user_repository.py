@@ -1,19 +1,86 @@
+from typing import List, Optional, Tuple
+
+from sqlalchemy.orm import contains_eager, joinedload
+
 from app import db
 from models import Usuario, UserCredentials
+from repositories.loading import LoadProfiles, profile_options
+from repositories.pagination import decode_cursor, seek_after, split_page
+
+
+def prefix_range(column, prefix: str):
+    """
+    column LIKE 'prefix%' escrito como rango (>= prefix y < el siguiente
+    prefijo), que cualquier motor resuelve con el índice de la columna.
+    Los U+10FFFF finales no tienen siguiente: se incrementa el carácter
+    anterior, y si el prefijo es solo U+10FFFF queda el límite inferior.
+    """
+    stem = prefix.rstrip(chr(0x10FFFF))
+    if not stem:
+        return column >= prefix
+    upper = stem[:-1] + chr(ord(stem[-1]) + 1)
+    return (column >= prefix) & (column < upper)
 
 
 class UserRepository:
     """Acceso a datos de usuarios."""
 
+    # UserSchema.get_role lee credenciales: se traen con JOIN en la misma consulta
+    PROFILES: LoadProfiles = {
+        "admin": lambda: (joinedload(Usuario.credenciales),),
+    }
+
     @staticmethod
-    def get_all():
+    def get_all(profile: Optional[str] = "admin"):
         """Devuelve todos los usuarios activos e inactivos."""
-        return Usuario.query.order_by(Usuario.username.asc()).all()
+        return (Usuario.query.options(*profile_options(UserRepository.PROFILES, profile))
+                .order_by(Usuario.username.asc())
+                .all())
+
+    @staticmethod
+    def get_page(limit: int, cursor: Optional[str] = None, username: Optional[str] = None,
+                 email: Optional[str] = None, role: Optional[str] = None,
+                 is_active: Optional[bool] = None) -> Tuple[List[Usuario], Optional[str]]:
+        """
+        Página de usuarios ordenada por username, con búsqueda por cursor.
+        - username / email: prefijos (rango sobre sus índices únicos). Con
+          email y sin username se ordena por email, así la página sale del
+          mismo rango del índice sin ordenar todas las coincidencias.
+        - role: filtra por el rol de las credenciales. Sin prefijos se ordena
+          por usuario_id, el orden de ix_user_credentials_role_usuario.
+        - is_active: filtra por estado.
+        Las credenciales (el rol que muestra UserSchema) vienen en la misma
+        consulta, por el mismo JOIN que usa el filtro de rol.
+        Retorna (usuarios, next_cursor).
+        """
+        query = (Usuario.query.outerjoin(Usuario.credenciales)
+                 .options(contains_eager(Usuario.credenciales)))
+        if username:
+            query = query.filter(prefix_range(Usuario.username, username))
+        if email:
+            query = query.filter(prefix_range(Usuario.email, email))
+        if role is not None:
+            query = query.filter(UserCredentials.role == role)
+        if is_active is not None:
+            query = query.filter(Usuario.is_active == is_active)
+        if username:
+            order, kind, key = Usuario.username, str, lambda u: (u.username,)
+        elif email:
+            order, kind, key = Usuario.email, str, lambda u: (u.email,)
+        elif role is not None:
+            order, kind, key = UserCredentials.usuario_id, int, lambda u: (u.id,)
+        else:
+            order, kind, key = Usuario.username, str, lambda u: (u.username,)
+        if cursor:
+            (after,) = decode_cursor(cursor, kind)
+            query = query.filter(seek_after((order,), (after,), descending=False))
+        rows = query.order_by(order.asc()).limit(limit + 1).all()
+        return split_page(rows, limit, key)
 
     @staticmethod
-    def get_by_id(user_id: int):
+    def get_by_id(user_id: int, profile: Optional[str] = None):
         """Obtiene un usuario por id."""
-        return Usuario.query.get(user_id)
+        return db.session.get(Usuario, user_id, options=profile_options(UserRepository.PROFILES, profile))
 
     @staticmethod
     def update_role(user: Usuario, new_role: str):
@@ -21,14 +88,12 @@ class UserRepository:
         if not user.credenciales:
             return None
         user.credenciales.role = new_role
-        db.session.commit()
-        db.session.refresh(user)
+        db.session.flush()
         return user
 
     @staticmethod
     def deactivate_user(user: Usuario):
         """Desactiva un usuario (is_active=False)."""
         user.is_active = False
-        db.session.commit()
-        db.session.refresh(user)
+        db.session.flush()
         return user
\ No newline at end of file
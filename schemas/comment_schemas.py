@@ -5,4 +5,18 @@ class CommentCreateSchema(Schema):
         required=True,
         validate=validate.Length(min=1),
         error_messages={"required": "El contenido es obligatorio"}
-    )
\ No newline at end of file
+    )
+
+class CommentSchema(Schema):
+    """Formato de salida para mostrar comentarios"""
+    id = fields.Int(dump_only=True)
+    contenido = fields.Str()
+    fecha_creacion = fields.DateTime()
+    is_visible = fields.Bool()
+    usuario_id = fields.Int()
+    post_id = fields.Int()
+    autor_username = fields.Method("get_autor_username")
+
+    def get_autor_username(self, obj):
+        """Devuelve el nombre del autor del comentario"""
+        return obj.autor.username if obj.autor else None
@@ -1,5 +1,7 @@
 from marshmallow import Schema, fields, validate
 
+from schemas.category_schemas import CategorySchema
+
 
 class PostCreateSchema(Schema):
     """Validación para crear un nuevo post"""
@@ -13,7 +15,8 @@ class PostCreateSchema(Schema):
         validate=validate.Length(min=10),
         error_messages={"required": "El contenido es obligatorio"}
     )
-    is_published = fields.Bool(missing=True)
+    is_published = fields.Bool(load_default=True)
+    categoria_ids = fields.List(fields.Int(), load_default=list)
 
 
 class PostUpdateSchema(Schema):
@@ -21,6 +24,13 @@ class PostUpdateSchema(Schema):
     titulo = fields.Str(validate=validate.Length(min=3, max=140))
     contenido = fields.Str(validate=validate.Length(min=10))
     is_published = fields.Bool()
+    categoria_ids = fields.List(fields.Int())
+
+
+class AutorSchema(Schema):
+    """Datos públicos del autor de un post (?include=autor)"""
+    id = fields.Int(dump_only=True)
+    username = fields.Str()
 
 
 class PostSchema(Schema):
@@ -28,10 +38,13 @@ class PostSchema(Schema):
     id = fields.Int(dump_only=True)
     titulo = fields.Str()
     contenido = fields.Str()
+    excerpt = fields.Str(dump_only=True)
     is_published = fields.Bool()
     fecha_creacion = fields.DateTime()
     fecha_actualizacion = fields.DateTime()
     usuario_id = fields.Int()
+    comment_count = fields.Int(dump_only=True)
+    categorias = fields.Nested(CategorySchema, many=True, dump_only=True)
     autor_username = fields.Method("get_autor_username")
 
     def get_autor_username(self, obj):
@@ -0,0 +1,37 @@
+from typing import FrozenSet, Optional
+
+from schemas.compiled import compiled
+
+
+def parse_fields(args, schema_cls) -> Optional[FrozenSet[str]]:
+    """
+    Lee `fields` de los query params (request.args): lista separada por comas
+    de campos de salida del schema, p. ej. ?fields=id,titulo,excerpt.
+    Devuelve None si no viene (se devuelven todos los campos).
+    Lanza ValueError si algún campo no existe en el schema.
+    """
+    raw = args.get("fields")
+    if raw is None or not raw.strip():
+        return None
+    requested = frozenset(name.strip() for name in raw.split(",") if name.strip())
+    if not requested:
+        return None
+    unknown = sorted(requested - frozenset(compiled(schema_cls).schema.dump_fields))
+    if unknown:
+        raise ValueError(f"Campos desconocidos en fields: {', '.join(unknown)}")
+    return requested
+
+
+def parse_include(args, allowed: FrozenSet[str]) -> FrozenSet[str]:
+    """
+    Lee `include` de los query params: recursos relacionados a embeber en la
+    respuesta, separados por comas (p. ej. ?include=comments,autor).
+    Lanza ValueError si alguno no está en allowed.
+    """
+    raw = args.get("include") or ""
+    requested = frozenset(name.strip() for name in raw.split(",") if name.strip())
+    unknown = sorted(requested - allowed)
+    if unknown:
+        raise ValueError(f"Valores desconocidos en include: {', '.join(unknown)} "
+                         f"(se admiten: {', '.join(sorted(allowed))})")
+    return requested
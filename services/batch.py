@@ -0,0 +1,99 @@
+import sys
+from typing import Iterable, List, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+from flask import current_app, g, request
+from werkzeug.exceptions import HTTPException
+from werkzeug.test import EnvironBuilder
+
+from decorators.auth_decorators import authorize
+
+# Métodos que se pueden pedir en un batch: solo lecturas, así una operación
+# que falla no deja escrituras a medias en la transacción compartida
+BATCH_METHODS = frozenset(("GET",))
+# Headers del pedido batch que se reenvían a cada operación
+FORWARDED_HEADERS = ("Authorization", "Accept-Language")
+
+
+class Operation(NamedTuple):
+    """Operación de un batch ya validada."""
+    method: str
+    path: str  # incluye el query string
+    body: object
+    endpoint: Optional[str]  # None si la ruta no existe (la operación responde 404/405)
+
+
+def parse_operations(data, allowed_endpoints: Iterable[str], max_operations: int) -> List[Operation]:
+    """
+    Valida {'operations': [{method, path, body}, ...]} contra el máximo de
+    operaciones y los endpoints habilitados para batch.
+    Lanza ValueError si el batch no es válido; no ejecuta nada.
+    """
+    if not isinstance(data, dict) or not isinstance(data.get("operations"), list):
+        raise ValueError("Se espera {'operations': [{'method', 'path', 'body'}, ...]}")
+    items = data["operations"]
+    if not items:
+        raise ValueError("La lista de operaciones está vacía")
+    if len(items) > max_operations:
+        raise ValueError(f"Máximo {max_operations} operaciones por batch (se recibieron {len(items)})")
+
+    allowed = frozenset(allowed_endpoints)
+    adapter = current_app.url_map.bind_to_environ(request.environ)
+    operations = []
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            raise ValueError(f"operations[{i}]: se espera un objeto")
+        method = str(item.get("method", "GET")).upper()
+        path = item.get("path")
+        if not isinstance(path, str) or not path.startswith("/"):
+            raise ValueError(f"operations[{i}].path: se espera una ruta absoluta (/api/...)")
+        if method not in BATCH_METHODS:
+            raise ValueError(f"operations[{i}]: el método {method} no se puede usar en un batch")
+        try:
+            endpoint, _ = adapter.match(urlsplit(path).path, method=method)
+        except HTTPException:
+            endpoint = None
+        else:
+            if endpoint not in allowed:
+                raise ValueError(f"operations[{i}]: {method} {path} no se puede usar en un batch")
+        operations.append(Operation(method, path, item.get("body"), endpoint))
+    return operations
+
+
+def run_operations(operations: List[Operation]) -> list:
+    """
+    Ejecuta las operaciones en orden, dentro del contexto de la app del pedido
+    batch: comparten g (el token se verifica una sola vez, en la primera
+    operación que lo requiere) y db.session. Cada operación pasa por la
+    política de acceso de su endpoint y por la vista, pero no por los hooks
+    before/after_request (métricas, compresión y commit son del pedido batch).
+    Devuelve una Response por operación.
+    """
+    app = current_app._get_current_object()
+    headers = {name: request.headers[name] for name in FORWARDED_HEADERS if name in request.headers}
+    return [_run(app, operation, headers, request.host_url) for operation in operations]
+
+
+def _run(app, operation: Operation, headers: dict, base_url: str):
+    builder = EnvironBuilder(path=operation.path, base_url=base_url, method=operation.method,
+                             headers=headers, json=operation.body)
+    try:
+        environ = builder.get_environ()
+    finally:
+        builder.close()
+
+    # Mismo app: el request context reutiliza el app context (y su g) del pedido batch
+    with app.request_context(environ):
+        g.pop("_authorized", None)
+        try:
+            policy = app.extensions["auth_policies"].get((request.endpoint, request.method))
+            rv = authorize(policy) if policy is not None else None
+            if rv is None:
+                rv = app.dispatch_request()
+            return app.make_response(rv)
+        except Exception as err:
+            try:
+                return app.make_response(app.handle_user_exception(err))
+            except Exception:
+                app.log_exception(sys.exc_info())
+                return app.make_response(({"error": "Internal Server Error"}, 500))
@@ -1,24 +1,91 @@
 from typing import List, Optional
+
+from flask import current_app
+
 from repositories.category_repository import CategoryRepository
+from repositories.routing import primary
+from repositories.unit_of_work import on_commit
 from models import Categoria
+from schemas.category_schemas import CategorySchema
+from schemas.compiled import compiled
+from services.cache import CacheBackend, TTLCache
+
+CATEGORIES_KEY = "categorias:lista"
+
+
+def init_category_cache(app) -> CacheBackend:
+    """
+    Crea la caché de categorías de la app (app.extensions['category_cache']).
+    CATEGORY_CACHE_BACKEND permite pasar otro backend (p. ej. uno compartido);
+    si no, se usa un TTLCache en memoria del proceso.
+    """
+    backend = app.config.get('CATEGORY_CACHE_BACKEND') or TTLCache(
+        maxsize=16, ttl=app.config['CATEGORY_CACHE_TTL'])
+    app.extensions['category_cache'] = backend
+    return backend
+
 
 class CategoryService:
     """Lógica de negocio para categorías"""
 
-    def __init__(self):
+    def __init__(self, cache: Optional[CacheBackend] = None):
         self.repo = CategoryRepository()
+        self._cache = cache
+
+    @property
+    def cache(self) -> CacheBackend:
+        return self._cache or current_app.extensions['category_cache']
 
     def get_all_categories(self) -> List[Categoria]:
         return self.repo.get_all()
 
+    def get_all_categories_serialized(self) -> List[dict]:
+        """
+        Lista de categorías ya serializada, leída desde la caché.
+        Solo consulta la base en un miss (primer pedido, TTL vencido o
+        después de una escritura). La recarga lee del primario: una réplica
+        atrasada dejaría cacheada la lista anterior a la escritura por todo el TTL.
+        """
+        cached = self.cache.get(CATEGORIES_KEY)
+        if cached is not None:
+            return cached
+        with primary():
+            categorias = self.repo.get_all()
+        data = compiled(CategorySchema).many(categorias)
+        self.cache.set(CATEGORIES_KEY, data, ttl=current_app.config["CATEGORY_CACHE_TTL"])
+        return data
+
     def get_category_by_id(self, category_id: int) -> Optional[Categoria]:
         return self.repo.get_by_id(category_id)
 
+    def resolve_category_id(self, ref: str) -> Optional[int]:
+        """
+        Id de la categoría indicada por id (solo dígitos) o por nombre, o None
+        si no existe. Se resuelve sobre la lista cacheada; solo consulta la base
+        si no la encuentra ahí (caché de otro worker todavía sin la categoría).
+        """
+        by_id = ref.isdigit()
+        for categoria in self.get_all_categories_serialized():
+            if (str(categoria["id"]) == ref) if by_id else (categoria["nombre"] == ref):
+                return categoria["id"]
+        categoria = self.repo.get_by_id(int(ref)) if by_id else self.repo.get_by_nombre(ref)
+        return categoria.id if categoria else None
+
+    def _invalidate(self) -> None:
+        """Borra la lista cacheada cuando se confirma la escritura (no antes)."""
+        cache = self.cache
+        on_commit(lambda: cache.delete(CATEGORIES_KEY))
+
     def create_category(self, nombre: str) -> Categoria:
-        return self.repo.create(nombre)
+        nueva = self.repo.create(nombre)
+        self._invalidate()
+        return nueva
 
     def update_category(self, category: Categoria, nombre: str) -> Categoria:
-        return self.repo.update(category, nombre)
+        actualizada = self.repo.update(category, nombre)
+        self._invalidate()
+        return actualizada
 
     def delete_category(self, category: Categoria) -> None:
-        self.repo.delete(category)
\ No newline at end of file
+        self.repo.delete(category)
+        self._invalidate()
@@ -0,0 +1,317 @@
+import atexit
+import glob
+import json
+import os
+import queue
+import re
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from app import db
+from repositories.comment_repository import CommentRepository
+from repositories.unit_of_work import on_commit, on_rollback
+
+# comments-<pid>[-<sufijo>].journal[.replaying[-<pid que lo reprocesa>]]
+JOURNAL_NAME = re.compile(r"^comments-(\d+)(?:-\w+)?\.journal(?:\.replaying(?:-(\d+))?)?$")
+
+
+class IngestQueueFull(Exception):
+    """El buffer de comentarios está lleno (backpressure): el cliente debe reintentar."""
+
+
+class CommentIngestor:
+    """
+    Ingesta de comentarios con escritura diferida (write-behind).
+
+    La vista valida el comentario y lo encola; un hilo de fondo lo persiste
+    en lotes cada flush_ms milisegundos o cada batch_size comentarios, en una
+    sola transacción por lote. El cliente recibe un id provisorio.
+    El lugar en el buffer (max_queue) se reserva al aceptar el comentario,
+    antes de responder 202: al confirmarse el pedido siempre entra.
+
+    Durabilidad (COMMENT_INGEST_DURABILITY):
+    - 'memory': solo en memoria; lo encolado se pierde si el proceso muere.
+    - 'journal': cada comentario se agrega a un archivo antes de responder y
+      se reprocesa al reiniciar (al menos una vez: tras una caída justo después
+      de un commit puede duplicarse). El archivo se vacía cada vez que el buffer
+      queda vacío.
+    - 'journal_fsync': como 'journal' pero con fsync por comentario.
+    """
+
+    def __init__(self, app, batch_size: int = 100, flush_ms: int = 200,
+                 max_queue: int = 10000, durability: str = "memory", journal_dir: str = None):
+        if durability not in ("memory", "journal", "journal_fsync"):
+            raise ValueError(f"Durabilidad desconocida: {durability}")
+        self.app = app
+        self.batch_size = batch_size
+        self.flush_interval = flush_ms / 1000.0
+        self.durability = durability
+        self.journal_dir = journal_dir
+        # Sin maxsize: el límite lo imponen las reservas de submit
+        self._queue = queue.Queue()
+        self.max_queue = max_queue
+        self._reserved = 0
+        self._reserve_lock = threading.Lock()
+        self._journal = None
+        self._journal_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._stopping = threading.Event()
+        self.counters = {
+            "enqueued": 0, "persisted": 0, "failed": 0, "rejected": 0,
+            "batches": 0, "max_queue_depth": 0, "last_batch_size": 0, "last_flush_ms": 0.0,
+        }
+
+    # ==================== API para las vistas ====================
+
+    def submit(self, post_id: int, usuario_id: int, contenido: str) -> str:
+        """
+        Reserva un lugar en el buffer para un comentario ya validado y
+        devuelve su id provisorio. El comentario entra al buffer cuando se
+        confirma la transacción del pedido (on_commit); si el pedido termina
+        en error no se encola y la reserva se libera (on_rollback).
+        Lanza IngestQueueFull si el buffer (incluidas las reservas) está lleno.
+        """
+        self._ensure_started()
+        with self._reserve_lock:
+            if self._queue.qsize() + self._reserved >= self.max_queue:
+                self.counters["rejected"] += 1
+                raise IngestQueueFull("El buffer de comentarios está lleno")
+            self._reserved += 1
+        on_rollback(self._release)
+        item = {
+            "provisional_id": uuid.uuid4().hex,
+            "post_id": post_id,
+            "usuario_id": usuario_id,
+            "contenido": contenido,
+            "fecha_creacion": datetime.utcnow().isoformat(),
+        }
+        on_commit(lambda: self._put(item))
+        return item["provisional_id"]
+
+    def _release(self) -> None:
+        with self._reserve_lock:
+            self._reserved -= 1
+
+    def _put(self, item: dict) -> None:
+        """Encola un comentario con lugar ya reservado: no puede fallar por falta de lugar."""
+        with self._reserve_lock:
+            self._reserved -= 1
+            if self._journal is None:
+                self._queue.put_nowait(item)
+            else:
+                # Encolar y escribir el journal juntos: el hilo de escritura no
+                # puede vaciar el archivo entre las dos operaciones
+                with self._journal_lock:
+                    self._queue.put_nowait(item)
+                    self._write_journal(item)
+
+        self.counters["enqueued"] += 1
+        depth = self._queue.qsize()
+        if depth > self.counters["max_queue_depth"]:
+            self.counters["max_queue_depth"] = depth
+
+    def metrics(self) -> dict:
+        """Contadores de backpressure y rendimiento del buffer."""
+        data = dict(self.counters)
+        data["queue_depth"] = self._queue.qsize()
+        data["queue_reserved"] = self._reserved
+        data["queue_capacity"] = self.max_queue
+        data["durability"] = self.durability
+        return data
+
+    # ==================== Hilo de escritura ====================
+
+    def _ensure_started(self) -> None:
+        # Arranque perezoso: no se crean hilos en comandos CLI ni antes de un fork
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            if self.durability != "memory":
+                self._open_journal()
+            self._thread = threading.Thread(target=self._run, name="comment-ingestor", daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Detiene el hilo persistiendo lo que quede en el buffer."""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not (self._stopping.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if batch:
+                self._flush(batch)
+
+    def _next_batch(self) -> list:
+        """Espera el primer comentario y junta hasta batch_size o hasta que venza flush_ms."""
+        try:
+            first = self._queue.get(timeout=self.flush_interval)
+        except queue.Empty:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _flush(self, batch: list) -> None:
+        start = time.perf_counter()
+        rows = [
+            {
+                "post_id": item["post_id"],
+                "usuario_id": item["usuario_id"],
+                "contenido": item["contenido"],
+                "fecha_creacion": datetime.fromisoformat(item["fecha_creacion"]),
+            }
+            for item in batch
+        ]
+        with self.app.app_context():
+            try:
+                CommentRepository.create_many(rows)
+                db.session.commit()
+                persisted = len(rows)
+            except Exception:
+                db.session.rollback()
+                self.app.logger.exception("Falló el lote de %d comentarios; se reintenta de a uno", len(rows))
+                persisted = self._flush_one_by_one(rows)
+            finally:
+                db.session.remove()
+
+        self.counters["persisted"] += persisted
+        self.counters["failed"] += len(rows) - persisted
+        self.counters["batches"] += 1
+        self.counters["last_batch_size"] = len(rows)
+        self.counters["last_flush_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        if self._queue.empty():
+            self._truncate_journal()
+
+    def _flush_one_by_one(self, rows: list) -> int:
+        """Aísla las filas inválidas de un lote fallido."""
+        persisted = 0
+        for row in rows:
+            try:
+                CommentRepository.create_many([row])
+                db.session.commit()
+                persisted += 1
+            except Exception:
+                db.session.rollback()
+                self.app.logger.exception("Comentario descartado: %r", row)
+        return persisted
+
+    # ==================== Journal ====================
+
+    def _journal_path(self, pid: int) -> str:
+        return os.path.join(self.journal_dir, f"comments-{pid}.journal")
+
+    def _open_journal(self) -> None:
+        os.makedirs(self.journal_dir, exist_ok=True)
+        self._replay_orphans()
+        self._journal = open(self._journal_path(os.getpid()), "a", encoding="utf-8")
+
+    def _replay_orphans(self) -> None:
+        """
+        Persiste lo que quedó en los journals de procesos que ya no existen,
+        incluidos los que otro proceso empezó a reprocesar y no terminó
+        (*.replaying-<pid> de un proceso muerto).
+        Un journal que no se puede reprocesar vuelve a su nombre de journal
+        huérfano, así lo reintenta el próximo arranque.
+        """
+        for path in glob.glob(os.path.join(self.journal_dir, "comments-*.journal*")):
+            match = JOURNAL_NAME.match(os.path.basename(path))
+            if match is None:
+                continue
+            owner = int(match.group(2) or match.group(1))
+            if owner != os.getpid() and _process_alive(owner):
+                continue
+            journal = path.split(".journal", 1)[0] + ".journal"
+            claimed = f"{journal}.replaying-{os.getpid()}"
+            try:
+                os.rename(path, claimed)
+            except OSError:
+                continue  # otro proceso lo tomó primero
+            if self._replay(claimed):
+                os.remove(claimed)
+                continue
+            if journal == self._journal_path(os.getpid()):
+                # El pid se reutilizó: no mezclarlo con el journal propio
+                journal = os.path.join(self.journal_dir, f"comments-{os.getpid()}-{uuid.uuid4().hex[:8]}.journal")
+            os.rename(claimed, journal)
+
+    def _replay(self, path: str) -> bool:
+        """Persiste los comentarios de un journal en una transacción; False si falla."""
+        with self.app.app_context():
+            try:
+                with open(path, encoding="utf-8") as fh:
+                    items = [json.loads(line) for line in fh if line.strip()]
+                CommentRepository.create_many([
+                    {**{k: item[k] for k in ("post_id", "usuario_id", "contenido")},
+                     "fecha_creacion": datetime.fromisoformat(item["fecha_creacion"])}
+                    for item in items
+                ])
+                db.session.commit()
+                return True
+            except Exception:
+                db.session.rollback()
+                self.app.logger.exception("No se pudo reprocesar el journal %s", path)
+                return False
+            finally:
+                db.session.remove()
+
+    def _write_journal(self, item: dict) -> None:
+        """Se llama con _journal_lock tomado."""
+        self._journal.write(json.dumps(item) + "\n")
+        self._journal.flush()
+        if self.durability == "journal_fsync":
+            os.fsync(self._journal.fileno())
+
+    def _truncate_journal(self) -> None:
+        if self._journal is None:
+            return
+        with self._journal_lock:
+            # Si entró algo mientras tanto, todavía no está persistido
+            if self._queue.empty():
+                self._journal.truncate(0)
+                self._journal.seek(0)
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def init_comment_ingestion(app):
+    """
+    Crea el ingestor si COMMENT_INGEST_MODE == 'buffered'
+    (app.extensions['comment_ingestor']); en modo 'sync' no hace nada.
+    """
+    if app.config['COMMENT_INGEST_MODE'] != 'buffered':
+        return None
+    ingestor = CommentIngestor(
+        app,
+        batch_size=app.config['COMMENT_INGEST_BATCH_SIZE'],
+        flush_ms=app.config['COMMENT_INGEST_FLUSH_MS'],
+        max_queue=app.config['COMMENT_INGEST_MAX_QUEUE'],
+        durability=app.config['COMMENT_INGEST_DURABILITY'],
+        journal_dir=app.config['COMMENT_INGEST_JOURNAL_DIR'] or os.path.join(app.instance_path, 'comment_journal'),
+    )
+    app.extensions['comment_ingestor'] = ingestor
+    return ingestor
@@ -1,4 +1,5 @@
-from typing import List, Optional
+from typing import FrozenSet, Optional
+from flask import current_app
 from app import db
 from models import Comentario
 from repositories.comment_repository import CommentRepository
@@ -9,8 +10,14 @@ comment_repo = CommentRepository()
 class CommentService:
     """Lógica de negocio para comentarios"""
 
-    def get_comments_by_post(self, post_id: int) -> List[Comentario]:
-        return comment_repo.get_by_post(post_id)
+    def get_comments_page(self, post_id: int, limit: int, cursor: Optional[str] = None,
+                          fields: Optional[FrozenSet[str]] = None):
+        """(comentarios, next_cursor) de una página de comentarios visibles del post."""
+        return comment_repo.get_page(post_id, limit, cursor, fields=fields)
+
+    def get_comments_page_version(self, post_id: int, limit: int, cursor: Optional[str] = None):
+        """(seed, última modificación) de la página que devolvería get_comments_page."""
+        return comment_repo.get_page_version(post_id, limit, cursor)
 
     def get_comment_by_id(self, comment_id: int) -> Optional[Comentario]:
         return comment_repo.get_by_id(comment_id)
@@ -18,5 +25,20 @@ class CommentService:
     def create_comment(self, post_id: int, data: dict) -> Comentario:
         return comment_repo.create(post_id, data)
 
+    def enqueue_comment(self, post_id: int, usuario_id: int, data: dict) -> Optional[str]:
+        """
+        Encola el comentario en el ingestor (COMMENT_INGEST_MODE='buffered').
+        Devuelve el id provisorio, o None si la app está en modo sincrónico.
+        Lanza IngestQueueFull si el buffer está lleno.
+        """
+        ingestor = current_app.extensions.get('comment_ingestor')
+        if ingestor is None:
+            return None
+        return ingestor.submit(post_id, usuario_id, data["contenido"])
+
     def delete_comment(self, comment: Comentario) -> None:
-        comment_repo.delete(comment)
\ No newline at end of file
+        comment_repo.delete(comment)
+
+    def iter_all_comments(self, after_id: int = 0, batch_size: int = 500):
+        """Itera todos los comentarios (visibles o no) para exportación."""
+        return comment_repo.iter_all(after_id=after_id, batch_size=batch_size)
@@ -0,0 +1,153 @@
+import threading
+import time
+import zlib
+from typing import Optional
+
+from flask import request
+
+
+class Compressor:
+    """
+    Compresión gzip de respuestas negociada por Accept-Encoding.
+
+    - Respuestas con cuerpo en memoria: se comprimen si superan min_size.
+    - Respuestas streaming (generadores, p. ej. las exportaciones NDJSON): se
+      comprimen a medida que salen, sin acumular el cuerpo; cada flush_bytes
+      de entrada se hace un Z_SYNC_FLUSH para que el cliente reciba datos
+      sin esperar al final.
+    Solo se comprimen los mimetypes configurados. Toda respuesta comprimible
+    lleva Vary: Accept-Encoding aunque no se comprima (por tamaño o porque el
+    cliente no acepta gzip), para que un cache no sirva una variante por la
+    otra. Si el cliente acepta gzip el ETag pasa a ser débil (la
+    representación cambia pero el contenido es el mismo, y los GET
+    condicionales validan con comparación débil), también en las respuestas
+    chicas y en los 304: así el 304 lleva el mismo ETag que el 200 comprimido.
+    """
+
+    def __init__(self, level: int = 6, min_size: int = 1024, mimetypes=(), flush_bytes: int = 16384):
+        self.level = level
+        self.min_size = min_size
+        self.mimetypes = frozenset(mimetypes)
+        self.flush_bytes = flush_bytes
+        self._lock = threading.Lock()
+        self.counters = {"responses": 0, "streamed": 0, "skipped_small": 0,
+                         "bytes_in": 0, "bytes_out": 0, "cpu_seconds": 0.0}
+
+    def process(self, response):
+        if not self._compressible(response):
+            return response
+        response.vary.add("Accept-Encoding")
+        if request.method == "HEAD" or request.accept_encodings.quality("gzip") <= 0:
+            return response
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        if not self._applies(response):
+            return response
+        if response.is_streamed:
+            self._compress_stream(response)
+        else:
+            self._compress_body(response)
+        response.headers["Content-Encoding"] = "gzip"
+        return response
+
+    def metrics(self) -> dict:
+        data = dict(self.counters)
+        data["ratio"] = round(data["bytes_out"] / data["bytes_in"], 4) if data["bytes_in"] else 0.0
+        data["cpu_seconds"] = round(data["cpu_seconds"], 6)
+        return data
+
+    # ==================== Internos ====================
+
+    def _compressible(self, response) -> bool:
+        """Si la respuesta tiene (o, en un 304, tendría) una variante gzip."""
+        if "Content-Encoding" in response.headers:
+            return False
+        if response.status_code == 304:
+            # Sin cuerpo ni Content-Type: el 304 repite las cabeceras del 200
+            return True
+        if response.status_code < 200 or response.status_code in (204, 206):
+            return False
+        return response.mimetype in self.mimetypes
+
+    def _applies(self, response) -> bool:
+        """Si se comprime el cuerpo (el cliente ya aceptó gzip)."""
+        if response.status_code == 304:
+            return False
+        if not response.is_streamed and response.calculate_content_length() < self.min_size:
+            with self._lock:
+                self.counters["skipped_small"] += 1
+            return False
+        return True
+
+    def _compressobj(self):
+        # wbits=31: formato gzip (cabecera + CRC) en lugar de zlib crudo
+        return zlib.compressobj(self.level, zlib.DEFLATED, 31)
+
+    def _compress_body(self, response) -> None:
+        data = response.get_data()
+        start = time.thread_time()
+        compressor = self._compressobj()
+        compressed = compressor.compress(data) + compressor.flush()
+        self._record(len(data), len(compressed), time.thread_time() - start, streamed=False)
+        response.set_data(compressed)
+
+    def _compress_stream(self, response) -> None:
+        chunks = response.iter_encoded()
+        source = response.response
+        response.response = self._iter_compressed(chunks, source)
+        response.headers.pop("Content-Length", None)
+
+    def _iter_compressed(self, chunks, source):
+        compressor = self._compressobj()
+        bytes_in = bytes_out = pending = 0
+        cpu = 0.0
+        try:
+            for chunk in chunks:
+                start = time.thread_time()
+                out = compressor.compress(chunk)
+                pending += len(chunk)
+                if pending >= self.flush_bytes:
+                    out += compressor.flush(zlib.Z_SYNC_FLUSH)
+                    pending = 0
+                cpu += time.thread_time() - start
+                bytes_in += len(chunk)
+                if out:
+                    bytes_out += len(out)
+                    yield out
+            start = time.thread_time()
+            out = compressor.flush()
+            cpu += time.thread_time() - start
+            bytes_out += len(out)
+            yield out
+        finally:
+            self._record(bytes_in, bytes_out, cpu, streamed=True)
+            close = getattr(source, "close", None)
+            if close is not None:
+                close()
+
+    def _record(self, bytes_in: int, bytes_out: int, cpu: float, streamed: bool) -> None:
+        with self._lock:
+            self.counters["responses"] += 1
+            self.counters["streamed"] += int(streamed)
+            self.counters["bytes_in"] += bytes_in
+            self.counters["bytes_out"] += bytes_out
+            self.counters["cpu_seconds"] += cpu
+
+
+def init_compression(app) -> Optional[Compressor]:
+    """
+    Registra la compresión de respuestas (app.extensions['compression'])
+    si COMPRESS_ENABLED.
+    """
+    if not app.config['COMPRESS_ENABLED']:
+        return None
+    compressor = Compressor(
+        level=app.config['COMPRESS_LEVEL'],
+        min_size=app.config['COMPRESS_MIN_SIZE'],
+        mimetypes=app.config['COMPRESS_MIMETYPES'],
+        flush_bytes=app.config['COMPRESS_STREAM_FLUSH_BYTES'],
+    )
+    app.extensions['compression'] = compressor
+    app.after_request(compressor.process)
+    return compressor
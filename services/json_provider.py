@@ -0,0 +1,90 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # dependencia opcional
+    orjson = None
+
+COMPACT = {"separators": (",", ":")}
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    JSON provider que serializa con orjson y produce el mismo JSON que el
+    provider por defecto de Flask (claves ordenadas, separadores compactos,
+    salida ASCII y el mismo `default` para fechas, Decimal, UUID, etc.).
+
+    Vuelve al json de la stdlib cuando orjson no puede garantizar el mismo
+    resultado: salida no ASCII (Flask la escapa como \\uXXXX), tipos que orjson
+    rechaza (enteros de más de 64 bits, claves no str), modo debug con
+    indentación o argumentos extra. Diferencias conocidas, no byte a byte:
+    - NaN/Infinity se serializan como null en lugar de NaN.
+    - Los float que repr() escribe con exponente (|x| < 1e-4 o >= 1e16) tienen
+      otro texto con el mismo valor: 1e-05 -> 0.00001, 2.5e-07 -> 2.5e-7,
+      1e+16 -> 1e16. Los schemas de la API no tienen campos float; si hace
+      falta el texto exacto de la stdlib, usar JSON_PROVIDER='stdlib'.
+    """
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.counters = {"fast": 0, "fallback": 0}
+
+    def _options(self) -> int:
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def _fast_dumps(self, obj):
+        """bytes con el JSON compacto, o None si hay que usar la stdlib."""
+        try:
+            data = orjson.dumps(obj, default=self.default, option=self._options())
+        except TypeError:
+            self.counters["fallback"] += 1
+            return None
+        if self.ensure_ascii and not data.isascii():
+            # Escapar a posteriori es más lento que el encoder C de la stdlib
+            self.counters["fallback"] += 1
+            return None
+        self.counters["fast"] += 1
+        return data
+
+    def dumps(self, obj, **kwargs) -> str:
+        # Solo la forma compacta coincide byte a byte: sin argumentos, json.dumps
+        # usa separadores con espacios
+        if kwargs == COMPACT:
+            data = self._fast_dumps(obj)
+            if data is not None:
+                return data.decode("ascii" if self.ensure_ascii else "utf-8")
+        return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        compact = self.compact if self.compact is not None else not self._app.debug
+        if not compact:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        data = self._fast_dumps(obj)
+        if data is None:
+            return super().response(obj)
+        return self._app.response_class(data + b"\n", mimetype=self.mimetype)
+
+    def metrics(self) -> dict:
+        return dict(self.counters)
+
+
+def init_json_provider(app):
+    """
+    Elige el JSON provider según JSON_PROVIDER:
+    - 'orjson': OrjsonProvider (falla si orjson no está instalado)
+    - 'stdlib': el provider por defecto de Flask
+    - 'auto' (default): orjson si está instalado
+    """
+    choice = app.config['JSON_PROVIDER']
+    if choice == 'auto':
+        choice = 'orjson' if orjson is not None else 'stdlib'
+    if choice == 'orjson':
+        if orjson is None:
+            raise RuntimeError("JSON_PROVIDER='orjson' requiere el paquete orjson")
+        app.json = OrjsonProvider(app)
+        app.extensions['json_provider'] = app.json
+    return app.json
@@ -0,0 +1,257 @@
+import threading
+import time
+from typing import Optional
+
+from flask import g, has_request_context, request
+from flask.json.provider import JSONProvider
+from sqlalchemy import event
+
+from app import db
+from schemas.compiled import DUMP_OBSERVERS
+
+# Límites de los buckets del histograma de latencia, en segundos
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# Límites de los buckets del histograma de tamaño de respuesta, en bytes
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+# Extensiones de la app con métricas propias: (clave en app.extensions, método, prefijo)
+EXTENSION_METRICS = (
+    ("category_cache", "stats", "category_cache"),
+    ("comment_ingestor", "metrics", "comment_ingest"),
+    ("password_hasher", "metrics", "password_hash"),
+    ("revocation_list", "metrics", "revocation"),
+    ("json_provider", "metrics", "json"),
+    ("compression", "metrics", "compression"),
+    ("db_router", "metrics", "db_router"),
+)
+
+
+class EndpointStats:
+    """Acumulados de un par (endpoint, método)."""
+    __slots__ = ("buckets", "count", "duration", "queries", "db_time",
+                 "serialization", "size_buckets", "size_sum", "size_count")
+
+    def __init__(self):
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.duration = 0.0
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialization = 0.0
+        self.size_buckets = [0] * len(SIZE_BUCKETS)
+        self.size_sum = 0
+        self.size_count = 0
+
+
+class MetricsRegistry:
+    """
+    Métricas por endpoint en memoria del proceso: histograma de latencia,
+    cantidad y tiempo de consultas SQL, tiempo de serialización (dump y JSON) e
+    histograma de tamaño de respuesta. Cada pedido hace una sola actualización bajo lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self._statuses = {}
+
+    def observe(self, endpoint: str, method: str, status: int, duration: float, queries: int,
+                db_time: float, serialization: float, size: Optional[int]) -> None:
+        key = (endpoint, method)
+        with self._lock:
+            stats = self._endpoints.get(key)
+            if stats is None:
+                stats = self._endpoints[key] = EndpointStats()
+            _observe_bucket(stats.buckets, LATENCY_BUCKETS, duration)
+            stats.count += 1
+            stats.duration += duration
+            stats.queries += queries
+            stats.db_time += db_time
+            stats.serialization += serialization
+            if size is not None:
+                _observe_bucket(stats.size_buckets, SIZE_BUCKETS, size)
+                stats.size_sum += size
+                stats.size_count += 1
+            status_key = (endpoint, method, status)
+            self._statuses[status_key] = self._statuses.get(status_key, 0) + 1
+
+    def render(self, extensions: dict) -> str:
+        """Formato de texto de Prometheus (version 0.0.4)."""
+        with self._lock:
+            endpoints = {key: _copy(stats) for key, stats in self._endpoints.items()}
+            statuses = dict(self._statuses)
+
+        lines = [
+            "# HELP http_requests_total Pedidos atendidos por endpoint, método y status.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (endpoint, method, status), value in sorted(statuses.items()):
+            lines.append(f'http_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {value}')
+
+        lines += [
+            "# HELP http_request_duration_seconds Latencia de los pedidos por endpoint.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (endpoint, method), stats in sorted(endpoints.items()):
+            lines += _histogram("http_request_duration_seconds", f'endpoint="{endpoint}",method="{method}"',
+                                LATENCY_BUCKETS, stats.buckets, f"{stats.duration:.6f}", stats.count)
+
+        lines += [
+            "# HELP http_response_size_bytes Tamaño de las respuestas con largo conocido.",
+            "# TYPE http_response_size_bytes histogram",
+        ]
+        for (endpoint, method), stats in sorted(endpoints.items()):
+            if stats.size_count:
+                lines += _histogram("http_response_size_bytes", f'endpoint="{endpoint}",method="{method}"',
+                                    SIZE_BUCKETS, stats.size_buckets, stats.size_sum, stats.size_count)
+
+        for name, attr, kind, help_text in (
+            ("db_queries_total", "queries", "counter", "Sentencias SQL ejecutadas."),
+            ("db_query_duration_seconds_total", "db_time", "counter", "Tiempo acumulado en la base."),
+            ("http_serialization_seconds_total", "serialization", "counter",
+             "Tiempo acumulado serializando (serializadores compilados y JSON)."),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            for (endpoint, method), stats in sorted(endpoints.items()):
+                value = getattr(stats, attr)
+                value = f"{value:.6f}" if isinstance(value, float) else value
+                lines.append(f'{name}{{endpoint="{endpoint}",method="{method}"}} {value}')
+
+        for key, method_name, prefix in EXTENSION_METRICS:
+            extension = extensions.get(key)
+            if extension is None:
+                continue
+            for name, value in getattr(extension, method_name)().items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    lines.append(f"miniblog_{prefix}_{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _observe_bucket(buckets: list, bounds: tuple, value) -> None:
+    """Suma 1 al primer bucket que contiene value (los mayores solo cuentan en +Inf)."""
+    for i, bound in enumerate(bounds):
+        if value <= bound:
+            buckets[i] += 1
+            return
+
+
+def _histogram(name: str, labels: str, bounds: tuple, buckets: list, total, count: int) -> list:
+    """Líneas _bucket (acumuladas), _sum y _count de un histograma de Prometheus."""
+    lines = []
+    cumulative = 0
+    for bound, value in zip(bounds, buckets):
+        cumulative += value
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {count}')
+    lines.append(f"{name}_sum{{{labels}}} {total}")
+    lines.append(f"{name}_count{{{labels}}} {count}")
+    return lines
+
+
+def _copy(stats: EndpointStats) -> EndpointStats:
+    copy = EndpointStats()
+    for attr in EndpointStats.__slots__:
+        value = getattr(stats, attr)
+        setattr(copy, attr, list(value) if isinstance(value, list) else value)
+    return copy
+
+
+class TimedJSONProvider(JSONProvider):
+    """
+    Envuelve el JSON provider de la app y suma a g el tiempo de serialización.
+    Delegar (en lugar de heredar del default) respeta cualquier provider que
+    ya tuviera la app.
+    """
+
+    def __init__(self, app, inner: JSONProvider):
+        super().__init__(app)
+        self.inner = inner
+
+    def dumps(self, obj, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self.inner.dumps(obj, **kwargs)
+        finally:
+            _add_serialization(time.perf_counter() - start)
+
+    def loads(self, s, **kwargs):
+        return self.inner.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self.inner.response(*args, **kwargs)
+        finally:
+            _add_serialization(time.perf_counter() - start)
+
+
+def _add_serialization(elapsed: float) -> None:
+    if has_request_context() and "_metrics_start" in g:
+        g._metrics_serialization += elapsed
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _end_query(conn)
+
+
+def _handle_error(exception_context):
+    # Una sentencia que falla no pasa por after_cursor_execute: sin esto su
+    # inicio quedaría en la pila de la conexión (que vuelve al pool)
+    conn = exception_context.connection
+    if conn is not None and exception_context.statement is not None and conn.info.get("metrics_query_start"):
+        _end_query(conn)
+
+
+def _end_query(conn) -> None:
+    start = conn.info["metrics_query_start"].pop()
+    if has_request_context() and "_metrics_start" in g:
+        g._metrics_queries += 1
+        g._metrics_db_time += time.perf_counter() - start
+
+
+def init_metrics(app) -> Optional[MetricsRegistry]:
+    """
+    Instrumenta la app si METRICS_ENABLED (app.extensions['metrics']):
+    hooks before/after_request, eventos de los engines de SQLAlchemy, el
+    JSON provider y los serializadores compilados. Las métricas se leen en GET /api/metrics.
+    """
+    if not app.config['METRICS_ENABLED']:
+        return None
+    registry = MetricsRegistry()
+    app.extensions['metrics'] = registry
+    app.json = TimedJSONProvider(app, app.json)
+    if _add_serialization not in DUMP_OBSERVERS:
+        DUMP_OBSERVERS.append(_add_serialization)
+
+    with app.app_context():
+        for engine in db.engines.values():
+            if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+                event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+                event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+                event.listen(engine, "handle_error", _handle_error)
+
+    @app.before_request
+    def start_timer():
+        g._metrics_start = time.perf_counter()
+        g._metrics_queries = 0
+        g._metrics_db_time = 0.0
+        g._metrics_serialization = 0.0
+
+    @app.after_request
+    def record_metrics(response):
+        start = g.pop("_metrics_start", None)
+        if start is None:
+            return response
+        registry.observe(
+            request.endpoint or "unmatched", request.method, response.status_code,
+            time.perf_counter() - start, g._metrics_queries, g._metrics_db_time,
+            g._metrics_serialization,
+            None if response.is_streamed else response.calculate_content_length(),
+        )
+        return response
+
+    return registry
@@ -0,0 +1,162 @@
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple
+
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class HasherBusy(Exception):
+    """El pool de hashing está saturado o no respondió a tiempo: el cliente debe reintentar."""
+
+
+# ==================== Trabajo en los procesos del pool ====================
+# Funciones de módulo (sin dependencias de la app) para que el pool las pueda
+# importar en procesos nuevos.
+
+def _hash(password: str, method: str) -> str:
+    return generate_password_hash(password, method=method)
+
+
+def _verify(password_hash: str, password: str, method: str, prefix: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifica la contraseña y, si es correcta pero el hash se generó con otros
+    parámetros, devuelve también el hash nuevo (rehash en el mismo viaje).
+    """
+    if not check_password_hash(password_hash, password):
+        return False, None
+    if needs_rehash(password_hash, prefix):
+        return True, generate_password_hash(password, method=method)
+    return True, None
+
+
+def method_prefix(method: str) -> str:
+    """
+    Prefijo que werkzeug escribe en los hashes de method, con los parámetros
+    por defecto ya expandidos ("scrypt" -> "scrypt:32768:8:1").
+    """
+    return generate_password_hash("", method=method).split("$", 1)[0]
+
+
+def needs_rehash(password_hash: str, prefix: str) -> bool:
+    """True si el hash guardado no usa exactamente el método/parámetros de prefix (method_prefix)."""
+    return password_hash.split("$", 1)[0] != prefix
+
+
+class PasswordHasher:
+    """
+    Hashing de contraseñas (scrypt/pbkdf2 de werkzeug) en un pool de procesos
+    de tamaño fijo, para que el costo de CPU de login/registro no ocupe los
+    hilos que atienden el resto de los endpoints.
+
+    - workers: procesos del pool (0 = hashear en el hilo del pedido).
+    - max_pending: pedidos de hashing admitidos a la vez (en curso + en cola);
+      por encima se rechaza con HasherBusy en lugar de encolar sin límite.
+    - timeout: segundos máximos de espera por un resultado. Un trabajo que ya
+      empezó no se puede cancelar: su lugar se libera recién cuando termina.
+    El pool se crea en el primer uso (después de un eventual fork del servidor).
+    """
+
+    def __init__(self, method: str, workers: int = 2, max_pending: int = 16, timeout: float = 5.0):
+        self.method = method
+        self.prefix = method_prefix(method)
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._max_pending = max_pending
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self.counters = {"hashed": 0, "verified": 0, "rehashed": 0, "rejected": 0, "timeouts": 0}
+
+    def hash(self, password: str) -> str:
+        """Genera el hash de una contraseña con el método configurado."""
+        result = self._run(_hash, password, self.method)
+        self.counters["hashed"] += 1
+        return result
+
+    def verify(self, password_hash: str, password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Devuelve (es_correcta, hash_nuevo). hash_nuevo no es None cuando la
+        contraseña es correcta pero el hash guardado usa parámetros viejos:
+        quien llama debe guardarlo.
+        """
+        ok, new_hash = self._run(_verify, password_hash, password, self.method, self.prefix)
+        self.counters["verified"] += 1
+        if new_hash is not None:
+            self.counters["rehashed"] += 1
+        return ok, new_hash
+
+    def metrics(self) -> dict:
+        data = dict(self.counters)
+        data["workers"] = self.workers
+        data["max_pending"] = self._max_pending
+        data["method"] = self.method
+        return data
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _discard_pool(self) -> None:
+        with self._pool_lock:
+            self._pool = None
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            self.counters["rejected"] += 1
+            raise HasherBusy("Demasiados pedidos de autenticación en curso")
+        if not self.workers:
+            try:
+                return fn(*args)
+            finally:
+                self._slots.release()
+        try:
+            future = self._get_pool().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # El lugar se libera cuando el trabajo termina o se cancela, no al
+        # dejar de esperarlo: cancel() no detiene un trabajo en curso
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()
+            self.counters["timeouts"] += 1
+            raise HasherBusy("El hashing de contraseñas no respondió a tiempo")
+        except BrokenProcessPool:
+            # Murió un proceso del pool: se recrea en el próximo pedido
+            self._discard_pool()
+            raise HasherBusy("El pool de hashing se reinició")
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is not None:
+            return self._pool
+        with self._pool_lock:
+            if self._pool is None:
+                # spawn: los procesos del pool no heredan hilos ni conexiones de la app
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+                atexit.register(self.shutdown)
+        return self._pool
+
+
+def init_password_hasher(app) -> PasswordHasher:
+    """Crea el hasher de la app (app.extensions['password_hasher']) según PASSWORD_HASH_*."""
+    hasher = PasswordHasher(
+        method=app.config['PASSWORD_HASH_METHOD'],
+        workers=app.config['PASSWORD_HASH_WORKERS'],
+        max_pending=app.config['PASSWORD_HASH_MAX_PENDING'],
+        timeout=app.config['PASSWORD_HASH_TIMEOUT'],
+    )
+    app.extensions['password_hasher'] = hasher
+    return hasher
+
+
+def password_hasher() -> PasswordHasher:
+    """Hasher de contraseñas de la app actual."""
+    return current_app.extensions['password_hasher']
@@ -1,5 +1,6 @@
-from typing import List, Optional
+from typing import Dict, FrozenSet, List, Optional, Tuple
 from repositories.post_repository import PostRepository
+from repositories.category_repository import CategoryRepository
 from models import Post
 from decorators.auth_decorators import check_ownership_or_role
 
@@ -14,9 +15,31 @@ class PostService:
         """Devuelve todos los posts públicos."""
         return self.repo.get_all(published_only=True)
 
-    def get_post_by_id(self, post_id: int) -> Optional[Post]:
+    def get_public_posts_page(self, limit: int, cursor: Optional[str] = None, categoria_id: Optional[int] = None,
+                              fields: Optional[FrozenSet[str]] = None) -> Tuple[List[Post], Optional[str]]:
+        """Devuelve una página de posts públicos (opcionalmente de una categoría) y el cursor de la siguiente."""
+        return self.repo.get_page(limit=limit, cursor=cursor, published_only=True,
+                                  categoria_id=categoria_id, fields=fields)
+
+    def search_posts(self, query: str, limit: int, cursor: Optional[str] = None,
+                     fields: Optional[FrozenSet[str]] = None) -> Tuple[List[Post], Optional[str]]:
+        """Busca posts publicados por texto, ordenados por relevancia."""
+        return self.repo.search(query, limit=limit, cursor=cursor, fields=fields)
+
+    def get_public_posts_page_version(self, limit: int, cursor: Optional[str] = None,
+                                      categoria_id: Optional[int] = None):
+        """(seed, última modificación) de la página de posts públicos."""
+        return self.repo.get_page_version(limit=limit, cursor=cursor, published_only=True,
+                                          categoria_id=categoria_id)
+
+    def get_post_version(self, post_id: int):
+        """(seed, última modificación) de un post, o None si no existe."""
+        return self.repo.get_version(post_id)
+
+    def get_post_by_id(self, post_id: int, profile: Optional[str] = None,
+                       fields: Optional[FrozenSet[str]] = None) -> Optional[Post]:
         """Devuelve un post por id, sin importar estado de publicación."""
-        return self.repo.get_by_id(post_id)
+        return self.repo.get_by_id(post_id, profile=profile, fields=fields)
 
     def get_user_posts(self, user_id: int, published_only: bool = False) -> List[Post]:
         """Devuelve posts de un usuario."""
@@ -26,6 +49,28 @@ class PostService:
         """Crea un post nuevo usando el repository."""
         return self.repo.create(data)
 
+    def create_posts_bulk(self, items: Dict[int, dict]) -> Tuple[Dict[int, int], Dict[int, dict]]:
+        """
+        Crea varios posts ya validados en una sola transacción.
+        - items: {índice en el pedido: datos validados}
+        Los ítems con categoria_ids inexistentes no se crean y se informan como error.
+        Retorna ({índice: id del post creado}, {índice: errores}).
+        """
+        requested = {cid for data in items.values() for cid in data.get("categoria_ids") or []}
+        existing = CategoryRepository.get_existing_ids(requested)
+
+        errors = {}
+        to_create = {}
+        for index, data in items.items():
+            missing = sorted(set(data.get("categoria_ids") or []) - existing)
+            if missing:
+                errors[index] = {"categoria_ids": [f"Categorías inexistentes: {missing}"]}
+            else:
+                to_create[index] = data
+
+        created = self.repo.create_many(list(to_create.values())) if to_create else []
+        return dict(zip(to_create.keys(), created)), errors
+
     def update_post(self, post: Post, data: dict) -> Optional[Post]:
         """Actualiza un post si el usuario es dueño o admin."""
         if not check_ownership_or_role(post.usuario_id):
@@ -38,6 +83,10 @@ class PostService:
             raise PermissionError("No tienes permiso para eliminar este post.")
         self.repo.delete(post)
 
+    def iter_all_posts(self, after_id: int = 0, batch_size: int = 500):
+        """Itera todos los posts (publicados o no) para exportación."""
+        return self.repo.iter_all(after_id=after_id, batch_size=batch_size)
+
     # ================= Estadísticas =================
     def count_posts(self, published_only: bool = True) -> int:
         return self.repo.count_all(published_only=published_only)
@@ -0,0 +1,240 @@
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+
+from repositories.revocation_repository import RevocationRepository
+from repositories.routing import primary
+from repositories.unit_of_work import on_commit
+
+USUARIO = "usuario"
+JTI = "jti"
+# Claim con el momento de emisión en milisegundos (iat tiene resolución de segundos)
+ISSUED_MS = "iat_ms"
+# Margen al releer la tabla: cubre transacciones que confirman después
+# de una lectura aunque su revocado_en sea anterior
+SYNC_OVERLAP = timedelta(seconds=30)
+
+
+def _epoch(value: datetime) -> float:
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom sobre un bytearray: "no está" es definitivo, "puede estar"
+    se confirma contra el conjunto exacto. Solo admite altas; para quitar
+    elementos se reconstruye.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    @staticmethod
+    def _seeds(key: str):
+        # Doble hashing sobre hash(key), que Python cachea en el propio str
+        mixed = (hash(key) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        return mixed & 0xFFFFFFFF, (mixed >> 32) | 1
+
+    def add(self, key: str) -> None:
+        h1, h2 = self._seeds(key)
+        for i in range(self.hashes):
+            pos = (h1 + i * h2) % self.size
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        # Sin generadores ni listas: se consulta en cada pedido autenticado
+        mixed = (hash(key) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        pos = mixed & 0xFFFFFFFF
+        step = (mixed >> 32) | 1
+        size, bits = self.size, self._bits
+        for _ in range(self.hashes):
+            pos %= size
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+            pos += step
+        return True
+
+
+class RevocationList:
+    """
+    Conjunto en memoria de usuarios y tokens (jti) revocados, consultado por
+    el token_in_blocklist_loader de flask-jwt-extended en cada pedido.
+
+    - Usuarios: se rechazan los tokens emitidos hasta el momento de la
+      revocación; un login posterior obtiene un token válido con los claims
+      nuevos. Se compara en milisegundos con el claim iat_ms (ver
+      init_revocation); un token sin él (emitido antes de agregarlo) se toma
+      como emitido al comienzo del segundo de su iat, así que ante la duda
+      se rechaza.
+    - Tokens: se rechaza el jti hasta su vencimiento.
+    Cada conjunto exacto tiene delante un filtro de Bloom, así que el caso común
+    (token no revocado) se resuelve sin tocar el diccionario ni la base.
+
+    Sincronización entre workers: cada revocación se guarda también en la tabla
+    revocacion; cada sync_seconds la primera consulta del worker relee las
+    filas nuevas (una consulta indexada por revocado_en, no una por pedido).
+    """
+
+    def __init__(self, ttl: timedelta, sync_seconds: float = 5.0, capacity: int = 10000):
+        self.ttl = ttl
+        self.sync_seconds = sync_seconds
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._users = {}  # sub -> epoch de revocación en milisegundos
+        self._jtis = {}   # jti -> epoch de vencimiento
+        self._expires = {}  # (tipo, valor) -> epoch de vencimiento de la entrada
+        self._rebuild_filters()
+        self._next_sync = 0.0
+        self._last_sync = None
+
+    # ==================== Camino caliente ====================
+
+    def is_revoked(self, payload: dict) -> bool:
+        if time.monotonic() >= self._next_sync:
+            self.sync()
+        sub = payload["sub"]
+        if sub in self._user_filter:
+            revoked_at = self._users.get(sub)
+            issued = payload.get(ISSUED_MS)
+            if issued is None:
+                issued = payload.get("iat", 0) * 1000
+            if revoked_at is not None and issued <= revoked_at:
+                return True
+        jti = payload.get("jti")
+        if jti is not None and jti in self._jti_filter:
+            return jti in self._jtis
+        return False
+
+    # ==================== Altas ====================
+
+    def revoke_user(self, user_id: int) -> None:
+        """
+        Revoca todos los tokens emitidos hasta ahora para el usuario.
+        Agrega la fila a la sesión (el commit lo hace quien llama) y la aplica
+        en este worker cuando se confirma; los demás la ven en la próxima
+        sincronización.
+        """
+        self._revoke(USUARIO, str(user_id), datetime.utcnow() + self.ttl)
+
+    def revoke_token(self, jti: str, expires: datetime) -> None:
+        """Revoca un token puntual (p. ej. logout) hasta su vencimiento."""
+        self._revoke(JTI, jti, expires)
+
+    def _revoke(self, tipo: str, valor: str, expira: datetime) -> None:
+        RevocationRepository.purge_expired()
+        row = RevocationRepository.add(tipo, valor, expira)
+        values = (row.tipo, row.valor, row.revocado_en, row.expira)
+        on_commit(lambda: self._apply_locked(*values))
+
+    def _apply_locked(self, *values) -> None:
+        with self._lock:
+            self._apply(*values)
+
+    # ==================== Sincronización ====================
+
+    def sync(self) -> None:
+        """Relee las revocaciones nuevas de la tabla y descarta las vencidas."""
+        with self._lock:
+            if time.monotonic() < self._next_sync:
+                return
+            self._next_sync = time.monotonic() + self.sync_seconds
+            started = datetime.utcnow()
+            since = self._last_sync - SYNC_OVERLAP if self._last_sync else None
+            try:
+                # Una réplica atrasada demoraría las revocaciones: se lee del primario
+                with primary():
+                    rows = RevocationRepository.get_since(since)
+            except Exception:
+                # Sin base se sigue con lo que ya se conoce; se reintenta en el próximo ciclo
+                current_app.logger.exception("No se pudo sincronizar la lista de revocación")
+                return
+            for tipo, valor, revocado_en, expira in rows:
+                self._apply(tipo, valor, revocado_en, expira)
+            self._purge()
+            self._last_sync = started
+
+    def _apply(self, tipo: str, valor: str, revocado_en: datetime, expira: datetime) -> None:
+        if tipo == USUARIO:
+            # Milisegundos, la resolución de iat_ms
+            revoked_at = int(_epoch(revocado_en) * 1000)
+            if revocado_en.microsecond == 0:
+                # Columna sin fracciones de segundo (p. ej. DATETIME de MySQL): se
+                # cubre el segundo entero, ante la duda se rechaza
+                revoked_at += 999
+            if revoked_at > self._users.get(valor, 0):
+                self._users[valor] = revoked_at
+            self._user_filter.add(valor)
+        elif tipo == JTI:
+            self._jtis[valor] = _epoch(expira)
+            self._jti_filter.add(valor)
+        else:
+            return
+        key = (tipo, valor)
+        self._expires[key] = max(self._expires.get(key, 0), _epoch(expira))
+        if len(self._users) > self._user_filter.capacity or len(self._jtis) > self._jti_filter.capacity:
+            self._rebuild_filters()
+
+    def _purge(self) -> None:
+        """Quita las entradas vencidas y reconstruye los filtros si hubo bajas."""
+        now = time.time()
+        expired = [key for key, expira in self._expires.items() if expira <= now]
+        if not expired:
+            return
+        for key in expired:
+            del self._expires[key]
+            (self._users if key[0] == USUARIO else self._jtis).pop(key[1], None)
+        self._rebuild_filters()
+
+    def _rebuild_filters(self) -> None:
+        users = BloomFilter(max(self.capacity, len(self._users) * 2))
+        jtis = BloomFilter(max(self.capacity, len(self._jtis) * 2))
+        for sub in self._users:
+            users.add(sub)
+        for jti in self._jtis:
+            jtis.add(jti)
+        # Se reemplazan de una vez: los lectores nunca ven un filtro a medio armar
+        self._user_filter, self._jti_filter = users, jtis
+
+    def metrics(self) -> dict:
+        return {"users": len(self._users), "tokens": len(self._jtis),
+                "filter_bits": self._user_filter.size + self._jti_filter.size}
+
+
+def init_revocation(app, jwt) -> RevocationList:
+    """
+    Crea la lista de revocación de la app (app.extensions['revocation_list'])
+    y la conecta al token_in_blocklist_loader de flask-jwt-extended. Todos los
+    tokens llevan iat_ms, con el que se comparan las revocaciones de usuarios.
+    """
+    expires = app.config['JWT_ACCESS_TOKEN_EXPIRES']
+    if not isinstance(expires, timedelta):
+        # JWT_ACCESS_TOKEN_EXPIRES admite segundos o False (tokens sin vencimiento)
+        expires = timedelta(seconds=expires) if expires else timedelta(days=365)
+    revocations = RevocationList(
+        ttl=expires,
+        sync_seconds=app.config['REVOCATION_SYNC_SECONDS'],
+        capacity=app.config['REVOCATION_FILTER_CAPACITY'],
+    )
+    app.extensions['revocation_list'] = revocations
+
+    @jwt.additional_claims_loader
+    def issued_at_ms(identity):
+        return {ISSUED_MS: int(time.time() * 1000)}
+
+    @jwt.token_in_blocklist_loader
+    def token_revoked(jwt_header, jwt_payload):
+        return current_app.extensions['revocation_list'].is_revoked(jwt_payload)
+
+    return revocations
+
+
+def revocation_list() -> RevocationList:
+    """Lista de revocación de la app actual."""
+    return current_app.extensions['revocation_list']
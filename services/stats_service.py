@@ -1,15 +1,13 @@
-from repositories.post_repository import PostRepository
-from repositories.comment_repository import CommentRepository
-from repositories.category_repository import CategoryRepository
-from models import Post, Comentario, Categoria
+from flask import current_app
+
+from repositories.stats_repository import StatsRepository
+
 
 class StatsService:
     """Servicio para obtener estadísticas de la aplicación."""
 
     def __init__(self):
-        self.post_repo = PostRepository()
-        self.comment_repo = CommentRepository()
-        self.category_repo = CategoryRepository()
+        self.stats_repo = StatsRepository()
 
     def get_stats(self) -> dict:
         """
@@ -18,15 +16,9 @@ class StatsService:
         - total_comments
         - total_categories
         - posts_last_week (cantidad)
+        Con STATS_USE_COUNTERS lee la tabla contador (costo constante);
+        si no, calcula los agregados en una sola consulta SQL.
         """
-        total_posts = self.post_repo.count_all(published_only=True)
-        total_comments = len(self.comment_repo.get_all())
-        total_categories = len(self.category_repo.get_all())
-        posts_last_week = len(self.post_repo.get_posts_last_week())
-
-        return {
-            "total_posts": total_posts,
-            "total_comments": total_comments,
-            "total_categories": total_categories,
-            "posts_last_week": posts_last_week
-        }
\ No newline at end of file
+        if current_app.config.get("STATS_USE_COUNTERS"):
+            return self.stats_repo.get_from_counters()
+        return self.stats_repo.get_aggregates()
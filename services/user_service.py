@@ -1,16 +1,24 @@
 from typing import List, Optional
 from models import Usuario, UserCredentials
-from app import db
-from flask_jwt_extended import get_jwt_identity, get_jwt
+from decorators.auth_decorators import current_principal
+from repositories.user_repository import UserRepository
+from services.revocation import revocation_list
 
 class UserService:
     """Lógica de negocio para usuarios"""
 
+    def __init__(self):
+        self.repo = UserRepository()
+
     def get_all_users(self) -> List[Usuario]:
-        return Usuario.query.order_by(Usuario.username.asc()).all()
+        return self.repo.get_all(profile="admin")
+
+    def get_users_page(self, limit: int, cursor: Optional[str] = None, **filters):
+        """(usuarios, next_cursor); filters: username, email, role, is_active (ver UserRepository.get_page)."""
+        return self.repo.get_page(limit, cursor, **filters)
 
-    def get_user_by_id(self, user_id: int) -> Optional[Usuario]:
-        return Usuario.query.get(user_id)
+    def get_user_by_id(self, user_id: int, profile: Optional[str] = "admin") -> Optional[Usuario]:
+        return self.repo.get_by_id(user_id, profile=profile)
 
     def update_user_role(self, user_id: int, new_role: str) -> Optional[Usuario]:
         user = self.get_user_by_id(user_id)
@@ -18,13 +26,12 @@ class UserService:
             return None
 
         # Evitar que un admin cambie su propio rol
-        current_user_id = get_jwt_identity()
-        if current_user_id == user.id:
+        if current_principal().id == user.id:
             raise PermissionError("No puedes cambiar tu propio rol")
 
-        user.credenciales.role = new_role
-        db.session.commit()
-        db.session.refresh(user)
+        self.repo.update_role(user, new_role)
+        # Los tokens vigentes llevan el rol anterior en los claims
+        revocation_list().revoke_user(user.id)
         return user
 
     def deactivate_user(self, user_id: int) -> Optional[Usuario]:
@@ -32,12 +39,10 @@ class UserService:
         if not user:
             return None
 
-        current_user_id = get_jwt_identity()
         # Evitar que un admin se desactive a sí mismo
-        if current_user_id == user.id:
+        if current_principal().id == user.id:
             raise PermissionError("No puedes desactivar tu propia cuenta")
 
-        user.is_active = False
-        db.session.commit()
-        db.session.refresh(user)
+        self.repo.deactivate_user(user)
+        revocation_list().revoke_user(user.id)
         return user
\ No newline at end of file
@@ -0,0 +1,9 @@
+from views.auth_views import AuthRegisterView, AuthLoginView
+from views.post_views import PostsAPI, PostDetailAPI, PostSearchAPI, PostBulkAPI
+from views.comment_views import PostCommentsAPI, CommentDeleteAPI
+from views.category_views import CategoriesAPI, CategoryDetailAPI, CategoryPostsAPI
+from views.user_views import UsersAPI, UserDetailAPI, UserRolePatchAPI
+from views.stats_views import StatsAPI
+from views.export_views import ExportPostsAPI, ExportCommentsAPI
+from views.metrics_views import MetricsAPI
+from views.batch_views import BatchAPI
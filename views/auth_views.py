@@ -5,6 +5,14 @@ from flask_jwt_extended import create_access_token
 from app import db
 from models import Usuario, UserCredentials
 from schemas.auth_schemas import RegisterSchema, LoginSchema
+from services.password_hasher import HasherBusy, password_hasher
+
+
+def _busy(err):
+    """503 con Retry-After cuando el pool de hashing está saturado."""
+    response = jsonify({"error": str(err)})
+    response.headers["Retry-After"] = "1"
+    return response, 503
 
 
 class AuthRegisterView(MethodView):
@@ -25,16 +33,20 @@ class AuthRegisterView(MethodView):
         if Usuario.query.filter_by(username=valid_data["username"]).first():
             return jsonify({"error": "El nombre de usuario ya está en uso"}), 400
 
+        # El hash se calcula en el pool antes de abrir la transacción
+        try:
+            password_hash = password_hasher().hash(valid_data["password"])
+        except HasherBusy as err:
+            return _busy(err)
+
         # Crear usuario y credenciales
         nuevo_usuario = Usuario(username=valid_data["username"], email=valid_data["email"])
         db.session.add(nuevo_usuario)
-        db.session.flush()  # obtener ID antes de commit
+        db.session.flush()  # obtener ID (el commit lo hace la unidad de trabajo del pedido)
 
-        credenciales = UserCredentials(usuario_id=nuevo_usuario.id)
-        credenciales.set_password(valid_data["password"])
+        credenciales = UserCredentials(usuario_id=nuevo_usuario.id, password_hash=password_hash)
 
         db.session.add(credenciales)
-        db.session.commit()
 
         return jsonify({
             "message": "Usuario creado correctamente",
@@ -59,14 +71,23 @@ class AuthLoginView(MethodView):
         if not usuario or not usuario.credenciales:
             return jsonify({"error": "Usuario no encontrado"}), 404
 
-        if not usuario.credenciales.check_password(valid_data["password"]):
+        try:
+            ok, new_hash = password_hasher().verify(usuario.credenciales.password_hash, valid_data["password"])
+        except HasherBusy as err:
+            return _busy(err)
+
+        if not ok:
             return jsonify({"error": "Contraseña incorrecta"}), 401
 
+        # Rehash transparente: el hash guardado usaba parámetros anteriores
+        if new_hash is not None:
+            usuario.credenciales.password_hash = new_hash
+
         if not usuario.is_active:
             return jsonify({"error": "Usuario inactivo"}), 403
 
         # Crear token JWT con claims personalizados
-        access_token = create_access_token(identity=usuario.id, additional_claims={
+        access_token = create_access_token(identity=str(usuario.id), additional_claims={
             "username": usuario.username,
             "email": usuario.email,
             "role": usuario.credenciales.role,
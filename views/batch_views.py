@@ -0,0 +1,41 @@
+from flask import current_app, jsonify, request
+from flask.views import MethodView
+
+from services.batch import parse_operations, run_operations
+
+
+def _result(response) -> bytes:
+    """
+    {"status", "body"} de una operación. Un body JSON se inserta tal cual lo
+    serializó la vista (sin parsearlo y volver a serializarlo).
+    """
+    data = response.get_data()
+    if response.is_json and data.strip():
+        body = data.strip()
+    else:
+        body = current_app.json.dumps(data.decode("utf-8", "replace") or None).encode("utf-8")
+    return b'{"status":%d,"body":%s}' % (response.status_code, body)
+
+
+class BatchAPI(MethodView):
+    """Endpoint para /api/batch"""
+
+    def post(self):
+        """
+        Ejecuta varias operaciones en un solo viaje HTTP.
+        Body: {"operations": [{"method": "GET", "path": "/api/posts/1", "body": null}, ...]}
+        Cada operación corre con el header Authorization del batch; responde
+        {"results": [{"status", "body"}, ...]} en el mismo orden, con 200
+        aunque alguna operación falle (el status de cada una va en su resultado).
+        Límites: BATCH_MAX_OPERATIONS y BATCH_ALLOWED_ENDPOINTS (solo GET).
+        """
+        try:
+            operations = parse_operations(request.get_json(silent=True),
+                                          current_app.config["BATCH_ALLOWED_ENDPOINTS"],
+                                          current_app.config["BATCH_MAX_OPERATIONS"])
+        except ValueError as err:
+            return jsonify({"error": "Batch inválido", "details": str(err)}), 400
+
+        results = b",".join(_result(response) for response in run_operations(operations))
+        return current_app.response_class(b'{"results":[' + results + b']}', status=200,
+                                          mimetype="application/json")
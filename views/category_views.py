@@ -1,20 +1,34 @@
 from flask import request, jsonify
 from flask.views import MethodView
 from services.category_service import CategoryService
+from services.post_service import PostService
 from schemas.category_schemas import CategorySchema, CategoryCreateSchema
+from schemas.post_schemas import PostSchema
+from schemas.compiled import compiled
+from schemas.sparse import parse_fields
 from decorators.auth_decorators import roles_required, active_user_required
+from decorators.conditional import conditional
+from repositories.pagination import parse_page_args
 
 category_service = CategoryService()
+post_service = PostService()
+
+
+def _category_posts_version(category_id):
+    """Versión de la página pedida; None si los parámetros son inválidos (la vista responde 400)."""
+    try:
+        limit, cursor = parse_page_args(request.args)
+        return post_service.get_public_posts_page_version(limit, cursor, categoria_id=category_id)
+    except ValueError:
+        return None
 
 
 class CategoriesAPI(MethodView):
     """Endpoints para /api/categories"""
 
     def get(self):
-        """Listar categorías (público)"""
-        categorias = category_service.get_all_categories()
-        schema = CategorySchema(many=True)
-        return jsonify(schema.dump(categorias)), 200
+        """Listar categorías (público, servido desde caché)"""
+        return jsonify(category_service.get_all_categories_serialized()), 200
 
     @roles_required("moderator", "admin")
     @active_user_required
@@ -61,4 +75,26 @@ class CategoryDetailAPI(MethodView):
             return jsonify({"error": "Categoría no encontrada"}), 404
 
         category_service.delete_category(category)
-        return jsonify({"message": "Categoría eliminada correctamente"}), 200
\ No newline at end of file
+        return jsonify({"message": "Categoría eliminada correctamente"}), 200
+
+
+class CategoryPostsAPI(MethodView):
+    """Endpoints para /api/categories/<id>/posts"""
+
+    @conditional(_category_posts_version, validate_last_modified=False)
+    def get(self, category_id):
+        """
+        Listar los posts públicos de una categoría (público), paginados por
+        cursor. Query params: limit, cursor y fields como en /api/posts.
+        """
+        if category_service.resolve_category_id(str(category_id)) is None:
+            return jsonify({"error": "Categoría no encontrada"}), 404
+        try:
+            limit, cursor = parse_page_args(request.args)
+            fields = parse_fields(request.args, PostSchema)
+            posts, next_cursor = post_service.get_public_posts_page(limit, cursor, categoria_id=category_id,
+                                                                    fields=fields)
+        except ValueError as err:
+            return jsonify({"error": "Parámetros inválidos", "details": str(err)}), 400
+
+        return jsonify({"items": compiled(PostSchema, fields).many(posts), "next_cursor": next_cursor}), 200
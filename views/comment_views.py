@@ -1,19 +1,47 @@
-from flask import request, jsonify
+from flask import request, jsonify, current_app
 from flask.views import MethodView
-from decorators.auth_decorators import roles_required, active_user_required, check_ownership_or_role
+from decorators.auth_decorators import (
+    roles_required, active_user_required, check_ownership_or_role, current_principal
+)
+from decorators.conditional import conditional
 from services.comment_service import CommentService
-from schemas.comment_schemas import CommentCreateSchema
+from services.comment_ingestion import IngestQueueFull
+from services.post_service import PostService
+from schemas.comment_schemas import CommentCreateSchema, CommentSchema
+from schemas.compiled import compiled
+from schemas.sparse import parse_fields
+from repositories.pagination import parse_page_args
 
 comment_service = CommentService()
+post_service = PostService()
+
+
+def _comments_page_version(post_id):
+    """Versión de la página pedida; None si los parámetros son inválidos (la vista responde 400)."""
+    try:
+        limit, cursor = parse_page_args(request.args)
+        return comment_service.get_comments_page_version(post_id, limit, cursor)
+    except ValueError:
+        return None
 
 
 class PostCommentsAPI(MethodView):
     """Endpoints para /api/posts/<id>/comments"""
 
+    @conditional(_comments_page_version, validate_last_modified=False)
     def get(self, post_id):
-        """Listar comentarios de un post (público)"""
-        comments = comment_service.get_comments_by_post(post_id)
-        return jsonify([comment.to_dict() for comment in comments]), 200
+        """
+        Listar comentarios de un post (público), del más viejo al más nuevo,
+        paginados por cursor. Query params: limit, cursor y fields como en /api/posts.
+        """
+        try:
+            limit, cursor = parse_page_args(request.args)
+            fields = parse_fields(request.args, CommentSchema)
+            comments, next_cursor = comment_service.get_comments_page(post_id, limit, cursor, fields=fields)
+        except ValueError as err:
+            return jsonify({"error": "Parámetros inválidos", "details": str(err)}), 400
+
+        return jsonify({"items": compiled(CommentSchema, fields).many(comments), "next_cursor": next_cursor}), 200
 
     @roles_required("user", "moderator", "admin")
     @active_user_required
@@ -26,8 +54,23 @@ class PostCommentsAPI(MethodView):
         except Exception as err:
             return jsonify({"error": "Datos inválidos", "details": str(err)}), 400
 
+        if "comment_ingestor" in current_app.extensions:
+            return self._enqueue(post_id, valid_data)
+
         nuevo_comment = comment_service.create_comment(post_id, valid_data)
-        return jsonify(nuevo_comment.to_dict()), 201
+        return jsonify(CommentSchema().dump(nuevo_comment)), 201
+
+    def _enqueue(self, post_id, valid_data):
+        """Modo buffered: valida el post y encola; responde 202 con un id provisorio."""
+        if post_service.get_post_version(post_id) is None:
+            return jsonify({"error": "Post no encontrado"}), 404
+        try:
+            provisional_id = comment_service.enqueue_comment(post_id, current_principal().id, valid_data)
+        except IngestQueueFull as e:
+            response = jsonify({"error": str(e)})
+            response.headers["Retry-After"] = "1"
+            return response, 503
+        return jsonify({"provisional_id": provisional_id, "status": "queued"}), 202
 
 
 class CommentDeleteAPI(MethodView):
@@ -41,14 +84,8 @@ class CommentDeleteAPI(MethodView):
             return jsonify({"error": "Comentario no encontrado"}), 404
 
         # Solo autor, moderator o admin
-        if not (check_ownership_or_role(comment.usuario_id) or
-                self._is_moderator_or_admin()):
+        if not check_ownership_or_role(comment.usuario_id, roles=("moderator", "admin")):
             return jsonify({"error": "No tienes permiso"}), 403
 
         comment_service.delete_comment(comment)
-        return jsonify({"message": "Comentario eliminado correctamente"}), 200
-
-    def _is_moderator_or_admin(self):
-        from flask_jwt_extended import get_jwt
-        role = get_jwt().get("role")
-        return role in ("moderator", "admin")
\ No newline at end of file
+        return jsonify({"message": "Comentario eliminado correctamente"}), 200
\ No newline at end of file
@@ -0,0 +1,68 @@
+from flask import Response, current_app, jsonify, request, stream_with_context
+from flask.views import MethodView
+
+from decorators.auth_decorators import roles_required, active_user_required
+from schemas.comment_schemas import CommentSchema
+from schemas.compiled import compiled
+from schemas.post_schemas import PostSchema
+from services.comment_service import CommentService
+from services.post_service import PostService
+
+post_service = PostService()
+comment_service = CommentService()
+
+
+def _ndjson_response(query, schema_cls):
+    """
+    Respuesta streaming en JSON delimitado por líneas (un objeto por línea).
+    Las filas se serializan a medida que llegan del cursor, así que la memoria
+    no depende del tamaño de la tabla y los primeros bytes salen enseguida.
+    query es un callable: la consulta se ejecuta dentro del generador, con la
+    sesión que vive mientras dura el streaming (la de la vista se cierra al
+    devolver la respuesta).
+    """
+    def generate():
+        dumps = current_app.json.dumps
+        serialize = compiled(schema_cls).one
+        for row in query():
+            yield dumps(serialize(row)) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+def _export_args():
+    """Lee after_id (para retomar una exportación cortada); lanza ValueError si es inválido."""
+    after_id = request.args.get("after_id", 0, type=int)
+    if after_id < 0:
+        raise ValueError("after_id debe ser mayor o igual a 0")
+    return after_id, current_app.config["EXPORT_BATCH_SIZE"]
+
+
+class ExportPostsAPI(MethodView):
+    """Endpoints para /api/export/posts"""
+
+    @roles_required("admin")
+    @active_user_required
+    def get(self):
+        """Exporta todos los posts en NDJSON, ordenados por id (solo admin)"""
+        try:
+            after_id, batch_size = _export_args()
+        except ValueError as err:
+            return jsonify({"error": "Parámetros inválidos", "details": str(err)}), 400
+        return _ndjson_response(
+            lambda: post_service.iter_all_posts(after_id=after_id, batch_size=batch_size), PostSchema)
+
+
+class ExportCommentsAPI(MethodView):
+    """Endpoints para /api/export/comments"""
+
+    @roles_required("admin")
+    @active_user_required
+    def get(self):
+        """Exporta todos los comentarios en NDJSON, ordenados por id (solo admin)"""
+        try:
+            after_id, batch_size = _export_args()
+        except ValueError as err:
+            return jsonify({"error": "Parámetros inválidos", "details": str(err)}), 400
+        return _ndjson_response(
+            lambda: comment_service.iter_all_comments(after_id=after_id, batch_size=batch_size), CommentSchema)
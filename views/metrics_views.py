@@ -0,0 +1,17 @@
+from flask import Response, abort, current_app
+from flask.views import MethodView
+from decorators.auth_decorators import roles_required, active_user_required
+
+
+class MetricsAPI(MethodView):
+    """Endpoint para /api/metrics (formato de texto de Prometheus)"""
+
+    @roles_required("admin")
+    @active_user_required
+    def get(self):
+        """Latencia, consultas SQL, serialización y tamaño de respuesta por endpoint"""
+        registry = current_app.extensions.get("metrics")
+        if registry is None:
+            abort(404, description="Las métricas están desactivadas (METRICS_ENABLED)")
+        return Response(registry.render(current_app.extensions),
+                        mimetype="text/plain; version=0.0.4; charset=utf-8")
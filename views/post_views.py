@@ -1,21 +1,72 @@
-from flask import request, jsonify
+from flask import request, jsonify, current_app
 from flask.views import MethodView
+from marshmallow import ValidationError
 
 from services.post_service import PostService
-from schemas.post_schemas import PostCreateSchema, PostUpdateSchema, PostSchema
-from decorators.auth_decorators import roles_required, active_user_required
+from services.category_service import CategoryService
+from services.comment_service import CommentService
+from schemas.post_schemas import PostCreateSchema, PostUpdateSchema, PostSchema, AutorSchema
+from schemas.comment_schemas import CommentSchema
+from schemas.compiled import compiled
+from schemas.sparse import parse_fields, parse_include
+from decorators.auth_decorators import roles_required, active_user_required, current_principal
+from decorators.conditional import conditional
+from repositories.pagination import parse_page_args
 
 post_service = PostService()
+category_service = CategoryService()
+comment_service = CommentService()
+
+# Valores admitidos en GET /api/posts/<id>?include=
+POST_INCLUDES = frozenset(("comments", "categories", "autor"))
+
+
+def _categoria_filter():
+    """
+    Id de la categoría de ?categoria=<id|nombre>, o None si no se filtra.
+    Lanza LookupError si la categoría no existe.
+    """
+    ref = request.args.get("categoria")
+    if not ref:
+        return None
+    categoria_id = category_service.resolve_category_id(ref)
+    if categoria_id is None:
+        raise LookupError(f"Categoría no encontrada: {ref}")
+    return categoria_id
+
+
+def _posts_page_version():
+    """Versión de la página pedida; None si los parámetros son inválidos (la vista responde 400/404)."""
+    try:
+        limit, cursor = parse_page_args(request.args)
+        return post_service.get_public_posts_page_version(limit, cursor, categoria_id=_categoria_filter())
+    except (ValueError, LookupError):
+        return None
 
 
 class PostsAPI(MethodView):
     """Endpoints para /api/posts"""
 
+    @conditional(_posts_page_version, validate_last_modified=False)
     def get(self):
-        """Listar todos los posts públicos"""
-        posts = post_service.get_public_posts()
-        schema = PostSchema(many=True)
-        return jsonify(schema.dump(posts)), 200
+        """
+        Listar posts públicos paginados por cursor.
+        Query params: limit (default 20, máx 100), cursor (next_cursor de la página
+        anterior), categoria (id o nombre) para filtrar por categoría y fields
+        (campos a devolver separados por coma, p. ej. id,titulo,excerpt).
+        """
+        try:
+            limit, cursor = parse_page_args(request.args)
+            fields = parse_fields(request.args, PostSchema)
+            categoria_id = _categoria_filter()
+            posts, next_cursor = post_service.get_public_posts_page(limit, cursor, categoria_id=categoria_id,
+                                                                    fields=fields)
+        except ValueError as err:
+            return jsonify({"error": "Parámetros inválidos", "details": str(err)}), 400
+        except LookupError as err:
+            return jsonify({"error": str(err)}), 404
+
+        return jsonify({"items": compiled(PostSchema, fields).many(posts), "next_cursor": next_cursor}), 200
 
     @roles_required("user", "moderator", "admin")
     @active_user_required
@@ -28,25 +79,125 @@ class PostsAPI(MethodView):
         except Exception as err:
             return jsonify({"error": "Datos inválidos", "details": str(err)}), 400
 
+        valid_data["usuario_id"] = current_principal().id
         nuevo_post = post_service.create_post(valid_data)
         return jsonify(PostSchema().dump(nuevo_post)), 201
 
 
+class PostBulkAPI(MethodView):
+    """Endpoints para /api/posts/bulk"""
+
+    @roles_required("user", "moderator", "admin")
+    @active_user_required
+    def post(self):
+        """
+        Crear muchos posts en una sola transacción (importaciones).
+        Recibe una lista de posts con el formato de POST /api/posts y responde
+        los ids creados y los errores por índice:
+        201 si se crearon todos, 207 si hubo errores parciales, 400 si no se creó ninguno.
+        """
+        data = request.get_json()
+        if not isinstance(data, list) or not data:
+            return jsonify({"error": "Datos inválidos", "details": "Se espera una lista de posts"}), 400
+        max_items = current_app.config["POSTS_BULK_MAX_ITEMS"]
+        if len(data) > max_items:
+            return jsonify({"error": "Datos inválidos",
+                            "details": f"Se aceptan hasta {max_items} posts por pedido"}), 400
+
+        schema = PostCreateSchema(many=True)
+        try:
+            loaded, errors = schema.load(data), {}
+        except ValidationError as err:
+            loaded, errors = err.valid_data, err.messages
+
+        usuario_id = current_principal().id
+        valid = {}
+        for index, item in enumerate(loaded):
+            if index not in errors:
+                item["usuario_id"] = usuario_id
+                valid[index] = item
+
+        created, category_errors = post_service.create_posts_bulk(valid)
+        errors.update(category_errors)
+
+        status = 201 if not errors else (207 if created else 400)
+        return jsonify({
+            "created": [{"index": i, "id": post_id} for i, post_id in sorted(created.items())],
+            "errors": [{"index": i, "details": errors[i]} for i in sorted(errors)]
+        }), status
+
+
+class PostSearchAPI(MethodView):
+    """Endpoints para /api/posts/search"""
+
+    def get(self):
+        """
+        Buscar posts públicos por texto en título y contenido (público).
+        Query params: q (obligatorio), limit, cursor y fields como en /api/posts.
+        """
+        query = (request.args.get("q") or "").strip()
+        if not query:
+            return jsonify({"error": "Parámetros inválidos", "details": "q es obligatorio"}), 400
+        try:
+            limit, cursor = parse_page_args(request.args)
+            fields = parse_fields(request.args, PostSchema)
+            posts, next_cursor = post_service.search_posts(query, limit, cursor, fields=fields)
+        except ValueError as err:
+            return jsonify({"error": "Parámetros inválidos", "details": str(err)}), 400
+
+        return jsonify({"items": compiled(PostSchema, fields).many(posts), "next_cursor": next_cursor}), 200
+
+
 class PostDetailAPI(MethodView):
     """Endpoints para /api/posts/<id>"""
 
+    # La versión del post también cubre ?include=comments: cada alta, baja u
+    # ocultamiento de un comentario sube Post.version. Se valida solo con el
+    # ETag: esos cambios no mueven fecha_actualizacion
+    @conditional(lambda post_id: post_service.get_post_version(post_id), validate_last_modified=False)
     def get(self, post_id):
-        """Obtener un post específico"""
-        post = post_service.get_post_by_id(post_id)
+        """
+        Obtener un post específico. Query params opcionales:
+        - fields: como en /api/posts.
+        - include: recursos a embeber, separados por coma:
+          comments (los primeros POST_INCLUDE_COMMENTS_LIMIT, con next_cursor
+          para seguir en /api/posts/<id>/comments), categories (ya vienen sin
+          fields; con fields se agregan) y autor ({id, username}).
+        Las relaciones se cargan con una cantidad fija de consultas: el post
+        con autor y categorías en un SELECT y los comentarios en otro.
+        """
+        try:
+            fields = parse_fields(request.args, PostSchema)
+            include = parse_include(request.args, POST_INCLUDES)
+        except ValueError as err:
+            return jsonify({"error": "Parámetros inválidos", "details": str(err)}), 400
+
+        # Con fields se cargan solo esas columnas: se suman las relaciones incluidas
+        load_fields = fields
+        if fields is not None:
+            if "categories" in include:
+                fields = load_fields = fields | {"categorias"}
+            if "autor" in include:
+                load_fields = load_fields | {"autor_username"}
+
+        post = post_service.get_post_by_id(post_id, profile="detail", fields=load_fields)
         if not post:
             return jsonify({"error": "Post no encontrado"}), 404
-        return jsonify(PostSchema().dump(post)), 200
+
+        data = PostSchema(only=fields).dump(post)
+        if "autor" in include:
+            data["autor"] = AutorSchema().dump(post.autor) if post.autor else None
+        if "comments" in include:
+            comments, next_cursor = comment_service.get_comments_page(
+                post_id, current_app.config["POST_INCLUDE_COMMENTS_LIMIT"])
+            data["comments"] = {"items": compiled(CommentSchema).many(comments), "next_cursor": next_cursor}
+        return jsonify(data), 200
 
     @roles_required("user", "moderator", "admin")
     @active_user_required
     def put(self, post_id):
         """Actualizar un post (solo autor o admin)"""
-        post = post_service.get_post_by_id(post_id)
+        post = post_service.get_post_by_id(post_id, profile="detail")
         if not post:
             return jsonify({"error": "Post no encontrado"}), 404
 
@@ -3,9 +3,14 @@ from flask.views import MethodView
 from decorators.auth_decorators import roles_required, active_user_required
 from services.user_service import UserService
 from marshmallow import Schema, fields, validate
+from schemas.compiled import compiled
+from repositories.pagination import parse_page_args
 
 user_service = UserService()
 
+ROLES = ("user", "moderator", "admin")
+_BOOLEANS = {"true": True, "1": True, "false": False, "0": False}
+
 # ==================== Schemas ====================
 class UserSchema(Schema):
     id = fields.Int(dump_only=True)
@@ -19,17 +24,45 @@ class UserSchema(Schema):
 
 
 class UserRoleUpdateSchema(Schema):
-    role = fields.Str(required=True, validate=validate.OneOf(["user", "moderator", "admin"]))
+    role = fields.Str(required=True, validate=validate.OneOf(ROLES))
+
+
+def _user_filters(args) -> dict:
+    """Filtros del listado de usuarios; lanza ValueError si alguno es inválido."""
+    filters = {
+        "username": args.get("username") or None,
+        "email": args.get("email") or None,
+        "role": args.get("role") or None,
+        "is_active": None,
+    }
+    if filters["role"] is not None and filters["role"] not in ROLES:
+        raise ValueError(f"role debe ser uno de: {', '.join(ROLES)}")
+    raw_active = args.get("is_active")
+    if raw_active:
+        if raw_active.lower() not in _BOOLEANS:
+            raise ValueError("is_active debe ser true o false")
+        filters["is_active"] = _BOOLEANS[raw_active.lower()]
+    return filters
 
 
 # ==================== Views ====================
 class UsersAPI(MethodView):
-    """Listar todos los usuarios"""
+    """Listar usuarios"""
     @roles_required("admin")
     @active_user_required
     def get(self):
-        users = user_service.get_all_users()
-        return jsonify(UserSchema(many=True).dump(users)), 200
+        """
+        Usuarios ordenados por username (por email si se filtra solo por
+        email, por id si se filtra por role sin prefijos), paginados por cursor.
+        Query params: limit y cursor como en /api/posts; username y email
+        (prefijos), role e is_active (true/false).
+        """
+        try:
+            limit, cursor = parse_page_args(request.args)
+            users, next_cursor = user_service.get_users_page(limit, cursor, **_user_filters(request.args))
+        except ValueError as err:
+            return jsonify({"error": "Parámetros inválidos", "details": str(err)}), 400
+        return jsonify({"items": compiled(UserSchema).many(users), "next_cursor": next_cursor}), 200
 
 
 class UserDetailAPI(MethodView):